@@ -0,0 +1,100 @@
+"""
+Report threads and memory used by 1, 10 and 50 blur backdrops: one Tk root and thread per backdrop
+(previous BlurSlaveWindow) against the single BlurHost. Master windows are fake handles
+(z-ordering after them just fails), no real windows are needed. Windows only. Each variant runs in its own process:
+python -m benchmarks.blur_bench          (before)
+python -m benchmarks.blur_bench host     (after)
+"""
+
+from modules.position import Rect
+from modules.blur import BlurHost
+from modules import settings
+
+from BlurWindow.blurWindow import blur
+from types import SimpleNamespace
+from ctypes import wintypes
+from tkinter import Tk
+import threading
+import ctypes
+import time
+import sys
+
+COUNTS = (1, 10, 50)
+SETTLE = 1.0
+
+
+class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+    _fields_ = [
+        ("cb", wintypes.DWORD),
+        ("PageFaultCount", wintypes.DWORD),
+        ("PeakWorkingSetSize", ctypes.c_size_t),
+        ("WorkingSetSize", ctypes.c_size_t),
+        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+        ("PagefileUsage", ctypes.c_size_t),
+        ("PeakPagefileUsage", ctypes.c_size_t),
+    ]
+
+
+def rss_mb() -> float:
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb)
+    return counters.WorkingSetSize / 1024 / 1024
+
+
+def fake_windows(count: int) -> list[SimpleNamespace]:
+    return [SimpleNamespace(hwnd=0x10000 + i, rect=Rect(i * 10, i * 10, i * 10 + 400, i * 10 + 300)) for i in range(count)]
+
+
+class LegacyBlur:
+    """ Previous implementation: own thread, Tk root and mainloop per backdrop. """
+
+    def __init__(self, window: SimpleNamespace) -> None:
+        self.window = window
+        self.ready = threading.Event()
+        threading.Thread(target=self.run, daemon=True).start()
+        self.ready.wait()
+
+    def run(self) -> None:
+        self.root = Tk()
+        self.root.config(bg='green')
+        self.root.wm_attributes("-transparent", 'green')
+        self.root.geometry(self.window.rect.geometry())
+        self.root.overrideredirect(True)
+        self.root.update()
+
+        blur(ctypes.windll.user32.GetParent(self.root.winfo_id()), Acrylic=False, Dark=False)
+        self.ready.set()
+        self.root.mainloop()
+
+
+def run(label: str, attach) -> None:
+    """ Backdrops are never destroyed, so each row adds backdrops to the previous one. """
+
+    windows = fake_windows(max(COUNTS))
+    created = 0
+
+    print(f"{'':<8} {'backdrops':>10} {'threads':>8} {'rss MB':>8}")
+    print(f"{'base':<8} {0:>10} {threading.active_count():>8} {rss_mb():>8.1f}")
+
+    for count in COUNTS:
+        for window in windows[created:count]:
+            attach(window)
+
+        created = count
+        time.sleep(SETTLE)
+        print(f"{label:<8} {count:>10} {threading.active_count():>8} {rss_mb():>8.1f}")
+
+
+def main() -> None:
+    if "host" in sys.argv[1:]:
+        run("after", BlurHost(settings.BLUR_FRAME_INTERVAL).attach)
+    else:
+        run("before", LegacyBlur)
+
+
+if __name__ == "__main__":
+    main()
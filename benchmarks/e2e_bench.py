@@ -0,0 +1,259 @@
+"""
+End-to-end scenarios scripted against the simulated desktop (no Windows needed): onboarding of many windows,
+shifting windows across monitors, resize bursts and focus cycling. Every operation is measured from the trigger
+(hotkey handler, listener poll) until the desktop settles: all window events are delivered, the layout thread
+applied every queued command and no window is being onboarded.
+Reports p50/p99 latency, backend (OS) calls per operation, thread count and peak RSS.
+Run from the repository root:
+python -m benchmarks.e2e_bench [--windows 50] [--monitors 3] [--output results.json] [--compare previous.json]
+"""
+
+from modules.simulated import SimulatedDesktop
+from modules.position import Rect
+from modules import settings
+from modules import system
+
+from collections.abc import Callable
+import statistics
+import threading
+import argparse
+import platform
+import tempfile
+import json
+import time
+import sys
+import os
+
+# Regressions above this ratio are reported when comparing runs.
+REGRESSION_THRESHOLD = 1.10
+SETTLE_TIMEOUT = 5.0
+
+
+def rss_mb() -> float:
+    """ Peak resident set size of this process. """
+
+    try:
+        import resource
+
+    except ImportError:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD), ("PeakWorkingSetSize", ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize / 1024 / 1024
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Bench:
+    """ Simulated desktop with the whole manager loaded on top of it. """
+
+    def __init__(self, monitors: int) -> None:
+        self.desktop = system.install(SimulatedDesktop.side_by_side(monitors))
+
+        # Keep benchmark runs away from the real probe cache.
+        settings.PROBE_CACHE_PATH = os.path.join(tempfile.mkdtemp(prefix="wingman-bench-"), "probes.json")
+
+        from modules import windows, hotkeys, events, logs
+
+        logs.logger.set_levels(console_level=logs.OFF, ring_level=logs.OFF)
+        windows.start()
+        self.windows = windows
+        self.keys = hotkeys.bindings()
+        self.listener = events.EventsListener(start=False)
+        self.results: dict[str, dict[str, float]] = {}
+
+    def barrier(self) -> None:
+        """ Wait until the layout thread applied everything queued so far. """
+
+        applied = threading.Event()
+        self.windows.layout_actor.call(applied.set)
+        applied.wait(SETTLE_TIMEOUT)
+
+    def settle(self) -> None:
+        """ Wait until events, layout commands and onboarding are all done. """
+
+        deadline = time.perf_counter() + SETTLE_TIMEOUT
+
+        while time.perf_counter() < deadline:
+            self.desktop.pump()
+            self.barrier()
+
+            # Onboarding hands attached batches over to the layout thread.
+            self.windows.onboarding_pipeline.wait_idle(SETTLE_TIMEOUT)
+            self.barrier()
+
+            if not self.desktop.events.pending:
+                return
+
+    def measure(self, name: str, operation: Callable[[int], None], count: int) -> None:
+        samples = []
+        calls_before = self.desktop.total_calls()
+
+        for i in range(count):
+            started_at = time.perf_counter()
+            operation(i)
+            self.settle()
+            samples.append(time.perf_counter() - started_at)
+
+        self.results[name] = {
+            "operations": count,
+            "p50_ms": percentile(samples, 0.5) * 1000,
+            "p99_ms": percentile(samples, 0.99) * 1000,
+            "mean_ms": statistics.fmean(samples) * 1000,
+            "os_calls_per_op": (self.desktop.total_calls() - calls_before) / count,
+            "threads": threading.active_count(),
+            "peak_rss_mb": rss_mb(),
+        }
+
+    # Scenarios.
+
+    def open_windows(self, count: int) -> None:
+        """ Open windows one by one, spread over monitors. Every 10th window is hung (probed physically). """
+
+        monitors = self.desktop.monitor_list
+
+        def open_window(i: int) -> None:
+            work_area = monitors[i % len(monitors)].work_area
+            rect = Rect.from_xywh(work_area.left + 50 + i * 5, work_area.top + 50 + i * 5, 900, 700)
+            self.desktop.open_window(f"Window {i}", rect, min_w=250 + (i % 4) * 25, executable=f"C:/apps/app{i % 7}.exe", hung=i % 10 == 9)
+            self.listener.poll(max_age=0)
+
+        self.measure("open_windows", open_window, count)
+
+    def make_room(self) -> None:
+        """ Close windows until every group has a free slot, so windows can travel between monitors. """
+
+        for screen in self.windows.monitor.screens:
+            group = screen.group
+            while len(group.windows) >= settings.MAX_WINS_IN_GROUP or not group.can_fit_window(group.windows[-1]):
+                self.desktop.close_window(group.windows[0].hwnd)
+                self.listener.poll(max_age=0)
+                self.settle()
+
+    def shift_across_monitors(self, count: int) -> None:
+        """ Win+Right / Win+Left on the focused window, travelling through groups and monitors back and forth. """
+
+        self.make_room()
+        self.desktop.focus(self.windows.monitor.leftmost_screen().group.windows[0].hwnd)
+        direction = "Right"
+
+        def shift(i: int) -> None:
+            nonlocal direction
+
+            window = self.windows.get_focused_window()
+            if direction == "Right" and window.screen.right_monitor is None and window.screen.group.is_rightmost(window):
+                direction = "Left"
+            elif direction == "Left" and window.screen.left_monitor is None and window.screen.group.is_leftmost(window):
+                direction = "Right"
+
+            self.keys[f"{settings.PUSH_KEY}{direction}"]()
+
+        self.measure("shift_across_monitors", shift, count)
+
+    def resize_bursts(self, count: int, burst: int = 10) -> None:
+        """ Bursts of Win+Alt+Left/Right (one operation = whole burst). """
+
+        def resize_burst(i: int) -> None:
+            key = f"{settings.RESIZE_KEY}{'Left' if i % 2 else 'Right'}"
+            for _ in range(burst):
+                self.keys[key]()
+
+        self.measure("resize_bursts", resize_burst, count)
+
+    def focus_cycling(self, count: int) -> None:
+        """ Win+Shift+Right through all windows of the desktop. """
+
+        key = f"{settings.FOCUS_KEY}Right"
+        self.measure("focus_cycling", lambda i: self.keys[key](), count)
+
+    def rearrange(self, count: int) -> None:
+        """ Full rearrange of every group. """
+
+        def rearrange_all(i: int) -> None:
+            for screen in self.windows.monitor.screens:
+                self.windows.layout_actor.call(screen.group.rearrange)
+
+        self.measure("rearrange", rearrange_all, count)
+
+
+def compare(current: dict, previous: dict) -> list[str]:
+    """ Scenarios slower (or calling the system more) than the previous run. """
+
+    regressions = []
+
+    for name, result in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+
+        for metric in ("p50_ms", "p99_ms", "os_calls_per_op"):
+            if before[metric] and result[metric] / before[metric] > REGRESSION_THRESHOLD:
+                regressions.append(f"{name}.{metric}: {before[metric]:.2f} -> {result[metric]:.2f}")
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--windows", type=int, default=50)
+    parser.add_argument("--monitors", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    args = parser.parse_args()
+
+    bench = Bench(args.monitors)
+    bench.open_windows(args.windows)
+    bench.shift_across_monitors(args.rounds)
+    bench.resize_bursts(args.rounds)
+    bench.focus_cycling(args.rounds)
+    bench.rearrange(args.rounds)
+
+    print(f"{'':<24} {'ops':>5} {'p50 ms':>8} {'p99 ms':>8} {'calls/op':>9} {'threads':>8} {'rss MB':>8}")
+    for name, result in bench.results.items():
+        print(
+            f"{name:<24} {result['operations']:>5} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+            f"{result['os_calls_per_op']:>9.1f} {result['threads']:>8} {result['peak_rss_mb']:>8.1f}"
+        )
+
+    report = {
+        "meta": {
+            "windows": args.windows,
+            "monitors": args.monitors,
+            "rounds": args.rounds,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": time.time(),
+        },
+        "scenarios": bench.results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            regressions = compare(report, json.load(file))
+
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Measure native layer calls per second against stub DLLs (no system calls, measures marshalling overhead only).
+Compares bound prototypes with preallocated buffers against per-call structure creation used before.
+(Stubs can't show the cost of WinDLL("dwmapi") lookups the legacy scan also did for every window.)
+Run from the repository root: python -m benchmarks.native_bench
+"""
+
+from modules.native import NativeApi, TITLEBARINFO
+
+from types import SimpleNamespace
+import ctypes
+import time
+
+WINDOWS = 40
+ROUNDS = 500
+
+
+CALLS = 0
+
+
+def _counted(fn):
+    def wrapper(*args):
+        global CALLS
+        CALLS += 1
+        return fn(*args)
+    return wrapper
+
+
+def _write(ref, **values) -> int:
+    for name, value in values.items():
+        setattr(ref._obj, name, value)
+    return 1
+
+
+def _dwm_attribute(hwnd, attribute, ref, size) -> int:
+    if attribute == 9:
+        _write(ref, left=hwnd, top=0, right=hwnd + 800, bottom=600)
+    else:
+        ctypes.cast(ref, ctypes.POINTER(ctypes.c_int)).contents.value = 0
+    return 0
+
+
+def _enum_windows(callback, lparam) -> int:
+    for hwnd in range(1, WINDOWS + 1):
+        callback(hwnd, lparam)
+    return 1
+
+
+def _unused(*args) -> int:
+    raise AssertionError("not expected in the benchmark")
+
+
+def stub_dlls() -> tuple[SimpleNamespace, SimpleNamespace]:
+    user32 = SimpleNamespace(
+        GetWindowRect=_counted(lambda hwnd, ref: _write(ref, left=hwnd, top=0, right=hwnd + 800, bottom=600)),
+        GetTitleBarInfo=_counted(lambda hwnd, ref: 1),
+        GetWindowTextLengthW=_counted(lambda hwnd: 5),
+        IsIconic=_counted(lambda hwnd: 0),
+        IsWindowVisible=_counted(lambda hwnd: 1),
+        EnumWindows=_counted(_enum_windows),
+        # Bound by NativeApi but not measured here.
+        **{name: _unused for name in (
+            "IsZoomed", "MoveWindow", "BeginDeferWindowPos", "DeferWindowPos", "EndDeferWindowPos",
+            "GetWindowLongW", "SetWindowLongW", "GetLayeredWindowAttributes", "SetLayeredWindowAttributes",
+            "SendMessageTimeoutW", "GetClassNameW", "GetDpiForWindow", "GetWindowThreadProcessId"
+        )}
+    )
+    dwmapi = SimpleNamespace(DwmGetWindowAttribute=_counted(_dwm_attribute))
+    return user32, dwmapi
+
+
+def legacy_scan(user32, dwmapi) -> list[int]:
+    """ Previous approach: structures created for every window on every scan. """
+
+    visible = []
+
+    def callback(hwnd, _):
+        title_info = TITLEBARINFO()
+        title_info.cbSize = ctypes.sizeof(title_info)
+        user32.GetTitleBarInfo(hwnd, ctypes.byref(title_info))
+
+        is_cloaked = ctypes.c_int(0)
+        dwmapi.DwmGetWindowAttribute(hwnd, 14, ctypes.byref(is_cloaked), ctypes.sizeof(is_cloaked))
+
+        if not user32.IsIconic(hwnd) and user32.IsWindowVisible(hwnd) and is_cloaked.value == 0:
+            if not (title_info.rgstate[0] & 0x00008000):
+                visible.append(hwnd)
+
+    user32.EnumWindows(callback, None)
+    return visible
+
+
+def measure(label: str, fn) -> None:
+    global CALLS
+    CALLS = 0
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn()
+    elapsed = time.perf_counter() - start
+
+    print(f"{label:<24} {CALLS / elapsed:>12,.0f} calls/s {ROUNDS / elapsed:>10,.0f} rounds/s ({WINDOWS} windows)")
+
+
+def main() -> None:
+    user32, dwmapi = stub_dlls()
+    api = NativeApi(user32, dwmapi)
+    hwnds = list(range(1, WINDOWS + 1))
+
+    measure("legacy scan", lambda: legacy_scan(user32, dwmapi))
+    measure("native visible_hwnds", api.visible_hwnds)
+    measure("native query_windows", lambda: api.query_windows(hwnds))
+    measure("native window_rect", lambda: [api.window_rect(hwnd) for hwnd in hwnds])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compare Rect constructions and comparisons per second with the previous dataclass implementation.
+Run from the repository root: python -m benchmarks.rect_bench
+"""
+
+from modules.position import Rect
+
+from dataclasses import dataclass
+from typing import Any
+from math import dist
+import time
+
+ROUNDS = 200_000
+
+
+@dataclass
+class LegacyRect:
+    """ Previous implementation: mutable dataclass recalculating derived fields on every assignment. """
+
+    left: int
+    top: int
+    right: int
+    bottom: int
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+
+        if name in ["left", "top", "right", "bottom"]:
+            self.__recalc()
+
+    def __post_init__(self) -> None:
+        self.__recalc()
+
+    def __recalc(self) -> None:
+        if hasattr(self, 'left') and hasattr(self, 'right') and hasattr(self, 'top') and hasattr(self, 'bottom'):
+            self.w = int(dist([self.left], [self.right]))
+            self.h = int(dist([self.top], [self.bottom]))
+            self.raw = (self.left, self.top, self.right, self.bottom)
+
+
+def rate(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return ROUNDS / (time.perf_counter() - start)
+
+
+def measure(cls) -> tuple[float, float, float]:
+    first, second = cls(0, 0, 1920, 1080), cls(0, 0, 1920, 1080)
+
+    def construct():
+        for i in range(ROUNDS):
+            cls(i, 0, i + 800, 600)
+
+    def compare():
+        for _ in range(ROUNDS):
+            first == second
+
+    def width():
+        for _ in range(ROUNDS):
+            first.w
+
+    return rate(construct), rate(compare), rate(width)
+
+
+def main() -> None:
+    print(f"{'':<12} {'constructions/s':>16} {'comparisons/s':>16} {'.w reads/s':>16}")
+
+    for label, cls in (("before", LegacyRect), ("after", Rect)):
+        construct, compare, width = measure(cls)
+        print(f"{label:<12} {construct:>16,.0f} {compare:>16,.0f} {width:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
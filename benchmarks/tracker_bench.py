@@ -0,0 +1,46 @@
+"""
+Measure WindowTracker dispatch throughput using scripted in-memory events source.
+Run from the repository root: python -m benchmarks.tracker_bench
+"""
+
+from modules.tracker import WindowTracker, ScriptedEventSource, EventKind
+from modules.position import Rect
+
+import time
+
+WINDOWS = 40
+BATCHES = 2000
+MOVES_PER_BATCH = 8
+
+
+def main() -> None:
+    source = ScriptedEventSource()
+    tracker = WindowTracker(source, lambda hwnd: Rect(hwnd, 0, hwnd + 100, 100))
+    updates = 0
+
+    def on_pos_changed(_rect: Rect) -> None:
+        nonlocal updates
+        updates += 1
+
+    for hwnd in range(1, WINDOWS + 1):
+        tracker.subscribe(hwnd, on_pos_changed, lambda: None)
+
+    tracker.start()
+    start = time.perf_counter()
+
+    for step in range(BATCHES):
+        for hwnd in range(1, WINDOWS + 1):
+            for offset in range(MOVES_PER_BATCH):
+                source.push(EventKind.LOCATION, hwnd, Rect(step, offset, step + 100, offset + 100))
+
+        source.flush()
+
+    elapsed = time.perf_counter() - start
+    events = BATCHES * WINDOWS * MOVES_PER_BATCH
+
+    print(f"windows: {WINDOWS}, events: {events}, callbacks: {updates}")
+    print(f"{events / elapsed:,.0f} events/s, {elapsed / BATCHES * 1e6:.1f} us per batch")
+
+
+if __name__ == "__main__":
+    main()
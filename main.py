@@ -1,50 +1,61 @@
-from modules import settings
-from modules import windows
 from modules import startup
-from modules import events
-from modules import logs
 
-from ahk import AHK
-import time
-import sys
+with startup.profile.phase("imports"):
+    from modules import windows
+    from modules import arrange
+    from modules import hotkeys
+    from modules import events
+    from modules import tracing
+    from modules import logs
+
+    from ahk import AHK
+    from functools import partial
+    import threading
+    import time
+    import sys
+
+
+def onboard_existing_windows() -> None:
+    """
+    Discover windows opened before the start, probes and attaching continue on the onboarding pipeline.
+    If there is a saved layout, groups are not arranged until it's restored, so every window moves only once.
+    """
+
+    saved = windows.layout_store.load()
+    if saved:
+        windows.layout_actor.call(arrange.hold)
+
+    with startup.profile.phase("discovery"):
+        windows.load_visible_windows()
+        events.init_listener()
+
+    with startup.profile.phase("onboarding"):
+        windows.onboarding_pipeline.wait_idle()
+
+    # Order, shifts, opacity and blur from the previous session, applied as one layout batch.
+    windows.layout_actor.call(partial(windows.restore_layout, saved))
+    if saved:
+        windows.layout_actor.call(arrange.release)
+
+    startup.profile.report()
+
 
 startup.execute_flags()
-windows.load_visible_windows()
-events.init_listener()
-
-ahk = AHK()
-
-if not settings.BLUR_MODE_ONLY:
-
-    # Move window.
-    ahk.add_hotkey(f"{settings.PUSH_KEY}Right", lambda: windows.get_focused_window().shift_right())  # Win + RIGHT
-    ahk.add_hotkey(f"{settings.PUSH_KEY}Left", lambda: windows.get_focused_window().shift_left())    # Win + LEFT
-    ahk.add_hotkey(f"{settings.PUSH_KEY}Up", lambda: windows.get_focused_window().maximize())        # Win + UP
-    ahk.add_hotkey(f"{settings.PUSH_KEY}Down", lambda: windows.get_focused_window().unmaximize())    # Win + DOWN
-
-    # Resize windows in groups.
-    ahk.add_hotkey(f"{settings.RESIZE_KEY}Left", lambda: windows.get_focused_window().resize_left())    # Win + Alt + LEFT
-    ahk.add_hotkey(f"{settings.RESIZE_KEY}Right", lambda: windows.get_focused_window().resize_right())  # Win + Alt + RIGHT
-
-    # Change focus.
-    ahk.add_hotkey(f"{settings.FOCUS_KEY}Left", lambda: windows.shift_focus_left())    # Win + Shift + Left
-    ahk.add_hotkey(f"{settings.FOCUS_KEY}Right", lambda: windows.shift_focus_right())  # Win + Shift + Right
-
-    # (Supress windows shortcuts)
-    ahk.add_hotkey("#+Up", lambda: None)
-    ahk.add_hotkey("#+Down", lambda: None)
-    
-    # Restore window.
-    ahk.add_hotkey(f"{settings.RESTORE_SHORTCUT}", lambda: windows.get_focused_window().draw_in_rect(restore=True))  # Win + Ctrl + R
-    
-# Change opacity.
-ahk.add_hotkey(f"{settings.OPACITY_KEY}WheelUp", lambda: windows.get_focused_window().increase_opacity())    # Ctrl + Shift + MouseWheelUp
-ahk.add_hotkey(f"{settings.OPACITY_KEY}WheelDown", lambda: windows.get_focused_window().decrease_opacity())  # Ctrl + Shift + MouseWheelDown
-
-# Toogle blur.
-ahk.add_hotkey(f"{settings.BLUR_TOOGLE_SHORTCUT}", lambda: windows.get_focused_window().toogle_blur())  # Win + shift + b
-
-ahk.start_hotkeys()
+tracing.start()
+
+# Hotkeys are alive before any window is touched.
+with startup.profile.phase("hotkeys"):
+    ahk = AHK()
+
+    for hotkey, handler in hotkeys.bindings().items():
+        ahk.add_hotkey(hotkey, handler)
+
+    ahk.start_hotkeys()
+
+with startup.profile.phase("monitors"):
+    windows.start()
+
+threading.Thread(target=onboard_existing_windows, daemon=True, name="wingman-startup").start()
 logs.system_log("Started mainloop...")
 
 while 1:
@@ -57,7 +68,6 @@ while 1:
 
 # mouse drag and drop window to group
 # if cannot fit window to other group when shifting, replace windows
-# check window's opacity and dont assume its 255
 # wide window recovery dont animate, use 1 step
 
 # wide window might replace std window when more than 2 wins in group.
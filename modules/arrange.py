@@ -1,9 +1,13 @@
 from modules.position import Rect, Direction
+from modules import attributes
 from modules import settings
+from modules import layout
+from modules import tracing
+from modules import moves
 from modules import logs
 
 from typing import TYPE_CHECKING, Generator
-from math import ceil
+from contextlib import contextmanager
 
 if TYPE_CHECKING:
     from modules.windows import Window
@@ -17,10 +21,13 @@ class Group:
     """ Contain, arrange and manage windows on the screen. """
 
     all_groups: list["Group"] = []
+    _batch_depth = 0
+    revision = 0  # Bumped whenever membership or order of any group changes or windows are moved.
 
     def __init__(self, screen_rect: Rect) -> None:
         self.screen_rect = screen_rect
         self.windows: list["Window"] = []
+        self._needs_rearrange = False
         Group.all_groups.append(self)
 
     def __win_index(self, window: "Window") -> int:
@@ -29,20 +36,10 @@ class Group:
         assert window in self.windows, f"Cannot find index of window: {window} in the group as it is not registered."
         return self.windows.index(window)
 
-    def __window_pairs(self) -> Generator[tuple["Window", "Window | None"], None, None]:
-        """ Stream all windows from this group paired with the next one. (wins[n], wins[n + 1]) """
-
-        for next_i, win in enumerate(self.windows, 1):
-            if len(self.windows) - 1 < next_i:
-                yield (win, None)
-
-            else:
-                yield (win, self.windows[next_i])
-
     def attach_window(self, window: "Window", from_direction: Direction) -> bool:
         """ Append new window from selected side. Returns False if maximum windows in group. """
         if len(self.windows) >= settings.MAX_WINS_IN_GROUP:
-            logs.system_log(f"Cannot add window: {window.text} to group (group is full)")
+            window.log("Cannot add window to group (group is full).")
             return False
 
         if not self.can_fit_window(window):
@@ -57,7 +54,8 @@ class Group:
         if from_direction == Direction.RIGHT:
             self.windows.append(window)
 
-        logs.system_log(f"Added {len(self.windows)} window {window.text} to group.")
+        Group.revision += 1
+        window.log("Added to group ({} windows).", len(self.windows))
         self.rearrange()
 
         return True
@@ -67,9 +65,20 @@ class Group:
 
         if window in self.windows:
             self.windows.remove(window)
-            logs.system_log(f"Removed window: {window.text} from group.")
+            Group.revision += 1
+            window.log("Removed from group.")
+            self.rearrange()
 
-        self.rearrange()
+    def dispose(self) -> list["Window"]:
+        """ Unregister group of disconnected screen. Returns windows it contained. """
+
+        if self in Group.all_groups:
+            Group.all_groups.remove(self)
+
+        windows, self.windows = self.windows, []
+        self._needs_rearrange = False
+        Group.revision += 1
+        return windows
 
     def can_fit_window(self, window: "Window") -> bool:
         """ Check if group's rect can fit another window by checking all window's min width. """
@@ -82,44 +91,36 @@ class Group:
 
         return True
 
-    def rearrange(self, _fix_call: bool = False) -> None:
-        """ Arrange windows in group respecting border shifts. """
-        if not self.windows:
+    @tracing.traced("rearrange")
+    def rearrange(self) -> None:
+        """ Arrange windows in group respecting border shifts. Final rects are solved up-front and only applied here. """
+        if Group._batch_depth:
+            self._needs_rearrange = True
             return
 
-        TOP = self.screen_rect.top + settings.MARGIN_PX
-        BOTTOM = self.screen_rect.bottom - settings.MARGIN_PX
-        WIN_WIDTH = ceil(self.screen_rect.w / len(self.windows))
-        prev_rect = Rect(self.screen_rect.left, self.screen_rect.top, self.screen_rect.left, self.screen_rect.bottom)
-
-        for win, next_win in self.__window_pairs():
-            if not win.is_visible:
-                continue
+        visible = [win for win in self.windows if win.is_visible]
+        if not visible:
+            return
 
-            new_left = prev_rect.right + settings.MARGIN_PX
-            new_right = new_left + WIN_WIDTH - settings.MARGIN_PX - win.l_shift
+        placements = layout.solve(self.screen_rect, settings.MARGIN_PX, [win.layout_item() for win in visible])
+        stats = move_windows([(win, placement.frame) for win, placement in zip(visible, placements)])
 
-            if next_win is not None:
-                new_right += next_win.l_shift
-                if (new_right - new_left) < settings.WINDOW_MIN_W:
-                    new_right = new_left + settings.WINDOW_MIN_W
+        if stats.moved:
+            Group.revision += 1
 
-            if self.is_rightmost(win):
-                new_right = self.screen_rect.right - settings.MARGIN_PX
+        tracing.count("rearranges")
+        tracing.count("windows_moved", stats.moved)
+        tracing.count("windows_skipped", stats.skipped)
 
-            rect = Rect(
-                new_left, TOP, new_right, BOTTOM
-            )
+        if stats.skipped:
+            logs.system_log("Rearranged group: {} moved, {} unchanged, saved {} system calls.", stats.moved, stats.skipped, stats.saved_calls, level=logs.DEBUG)
 
-            prev_rect = win.draw_in_rect(rect)
-         
-        if not self.validate_arrangement():
-            if _fix_call:
-                return self.resize_window(self.get_neighbour(self.windows[-1], Direction.LEFT), Direction.LEFT, _fix_call=True)
+    def solved_widths(self) -> dict[int, int]:
+        """ Widths of visible windows (by handle) resulting from current border shifts (even if not applied yet). """
 
-            self.reset_shifts()
-            self.rearrange(_fix_call=True)
-        
+        visible = [win for win in self.windows if win.is_visible]
+        placements = layout.solve(self.screen_rect, settings.MARGIN_PX, [win.layout_item() for win in visible])
+        return {win.hwnd: placement.frame.w for win, placement in zip(visible, placements)}
 
     def reset_shifts(self) -> None:
         """ Reset border shift value in all windows in this group. """
@@ -141,7 +142,7 @@ class Group:
         """ Update windows order in this group by shifting selected window in given direction. """
 
         if window not in self.windows:
-            window.log(f"Tried to shift window which is not registered in group. (Registering...)")
+            window.log("Tried to shift window which is not registered in group. (Registering...)")
 
             if self.attach_window(window, Direction.LEFT):
                 self.rearrange()
@@ -185,6 +186,7 @@ class Group:
         if shifted_neighbour:
             swap_window_shifts(window, shifted_neighbour)
 
+        Group.revision += 1
         self.rearrange()
 
     def get_neighbour(self, window: "Window", direction: Direction) -> "Window | None":
@@ -210,7 +212,8 @@ class Group:
 
         return self.windows[self.__win_index(window) + 1:]
 
-    def resize_window(self, window: "Window", direction: Direction, _fix_call: bool = False) -> None:
+    @tracing.traced("resize_window")
+    def resize_window(self, window: "Window", direction: Direction) -> None:
         """ Try to update selected window's size. It may update other windows to make space for selected one. """
 
         if self.is_leftmost(window) and self.is_rightmost(window):
@@ -218,10 +221,10 @@ class Group:
 
         # If shrinking border window, expand neighbour instead.
         if self.is_leftmost(window) and direction == Direction.LEFT:
-            return self.resize_window(self.get_neighbour(window, Direction.RIGHT), direction, _fix_call)
+            return self.resize_window(self.get_neighbour(window, Direction.RIGHT), direction)
 
         if self.is_rightmost(window) and direction == Direction.RIGHT:
-            return self.resize_window(self.get_neighbour(window, Direction.LEFT), direction, _fix_call)
+            return self.resize_window(self.get_neighbour(window, Direction.LEFT), direction)
 
         # When the window is expanded, decrease it's border shift instead of finding other strategy.
         if direction == Direction.RIGHT and window.l_shift < 0:
@@ -229,11 +232,13 @@ class Group:
             self.rearrange()
             return
 
+        # Coalesced steps run before the group is rearranged, so shrinkability is checked against solved widths.
+        widths = self.solved_widths()
         next_windows = self.windows_on_left(window)[::-1] if direction == Direction.LEFT else self.windows_on_right(window)
         unshrinkable_wins: list["Window"] = []
 
         for next_win in next_windows:
-            if not next_win.can_shrink():
+            if not next_win.can_shrink(widths.get(next_win.hwnd)):
                 unshrinkable_wins.append(next_win)
                 continue
 
@@ -250,14 +255,67 @@ class Group:
                     for skipped_win in unshrinkable_wins:
                         skipped_win.l_shift += settings.MARGIN_PX
 
-            return self.rearrange(_fix_call=_fix_call)
+            return self.rearrange()
 
         window.log("Cannot stretch this window.")
 
-    def validate_arrangement(self) -> bool:
-        """ Check if the last window in the group is not overflowing from the screen. (No need to check the first window.) """
-        
-        return self.windows[-1].rect.right < self.screen_rect.right
+
+@tracing.traced("move_windows")
+def move_windows(targets: list[tuple["Window", Rect]]) -> moves.PlanStats:
+    """ Move windows to given frame rects in a single transaction, skipping windows that are already in place. """
+
+    owners = {win.hwnd: win for win, _ in targets}
+    requests = [
+        moves.MoveRequest(win.hwnd, layout.window_rect(frame, win._bounding_error), win.last_move_rect, win.attributes.peek(attributes.RECT))
+        for win, frame in targets
+    ]
+
+    plan = moves.planner.plan(requests)
+
+    for hwnd in plan.restore:
+        owners[hwnd].restore_normal()
+
+    transaction = moves.transaction()
+    for request in plan.moves:
+        transaction.add(request.hwnd, request.target)
+
+    frames = transaction.commit()
+
+    for request in plan.moves:
+        owners[request.hwnd].on_moved(request.target, frames.get(request.hwnd))
+
+    return plan.stats
+
+
+def hold() -> None:
+    """ Defer arranging groups until release(), eg. while windows are onboarded before restoring the saved layout. """
+
+    Group._batch_depth += 1
+
+
+def release() -> None:
+    """ End hold(). Once nothing holds groups anymore, every changed group is rearranged once. """
+
+    Group._batch_depth -= 1
+
+    if not Group._batch_depth:
+        for group in Group.all_groups:
+            if group._needs_rearrange:
+                group._needs_rearrange = False
+                group.rearrange()
+
+
+@contextmanager
+def batch() -> Generator[None, None, None]:
+    """ Defer arranging groups until the end of the block. Every changed group is rearranged only once. """
+
+    hold()
+
+    try:
+        yield
+
+    finally:
+        release()
 
 
 def attach_to_any_group(window: "Window") -> bool:
@@ -0,0 +1,72 @@
+from collections.abc import Callable
+from typing import Any
+
+RECT = "rect"
+TITLE = "title"
+PLACEMENT = "placement"
+VISIBLE = "visible"
+FRAME = "frame"
+EXECUTABLE = "executable"
+CLASS_NAME = "class_name"
+
+_MISSING = object()
+
+
+class AttributeCache:
+    """
+    Cached window attributes. Values are loaded on the first access and kept until invalidated
+    by window's events (or by own actions changing them). Hit and miss counters are kept
+    per cache and globally for all windows.
+    """
+
+    total_hits = 0
+    total_misses = 0
+
+    def __init__(self, loaders: dict[str, Callable[[], Any]]) -> None:
+        self.__loaders = loaders
+        self.__values: dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, force: bool = False) -> Any:
+        """ Returns cached value, loads it if it's missing or force refresh is requested. """
+
+        if not force:
+            value = self.__values.get(name, _MISSING)
+
+            if value is not _MISSING:
+                self.hits += 1
+                AttributeCache.total_hits += 1
+                return value
+
+        self.misses += 1
+        AttributeCache.total_misses += 1
+
+        value = self.__values[name] = self.__loaders[name]()
+        return value
+
+    def peek(self, name: str, default: Any = None) -> Any:
+        """ Returns cached value without loading it (and without touching counters). """
+
+        return self.__values.get(name, default)
+
+    def set(self, name: str, value: Any) -> None:
+        """ Store value that is already known (eg. delivered with an event). """
+
+        self.__values[name] = value
+
+    def invalidate(self, *names: str) -> None:
+        """ Drop selected values (all values if none selected), they will be loaded again on the next access. """
+
+        if not names:
+            self.__values.clear()
+            return
+
+        for name in names:
+            self.__values.pop(name, None)
+
+
+def stats() -> dict[str, int]:
+    """ Global hit/miss counters of all window attribute caches. """
+
+    return {"hits": AttributeCache.total_hits, "misses": AttributeCache.total_misses}
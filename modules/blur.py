@@ -1,52 +1,308 @@
-from BlurWindow.blurWindow import blur
-from ctypes import windll
-from tkinter import Tk
+from modules import settings
+from modules import system
+
+import traceback
 import threading
-import win32gui
-import win32con
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from modules.windows import Window
 
+# DWMWA_SYSTEMBACKDROP_TYPE values.
+DWMSBT_AUTO = 0
+DWMSBT_TRANSIENTWINDOW = 3
 
-class BlurSlaveWindow:
-    """ Create blur window behind master's window. """
+# WCA_ACCENT_POLICY states.
+ACCENT_DISABLED = 0
+ACCENT_ENABLE_BLURBEHIND = 3
 
-    def __init__(self, window: "Window") -> None:
-        self.__figure_window = window
-        self.__handler = threading.Thread(target=self.__start_handler, daemon=True)
-        self.__handler.start()
 
-    def __start_handler(self) -> None:
-        """ Create slave window. """
+class BlurEffect:
+    """ Blur applied to a single window. """
 
-        self.root = Tk()
-        self.root.config(bg='green')
+    def resize_to_window(self) -> None:
+        """ Follow master's rect change. """
 
-        self.root.wm_attributes("-transparent", 'green')
-        self.root.geometry(self.__figure_window.rect.geometry())
-        self.root.overrideredirect(True)
+    def destroy(self) -> None:
+        raise NotImplementedError
 
-        self.root.update()
 
-        hwnd = windll.user32.GetParent(self.root.winfo_id())
-        blur(hwnd, Acrylic=False, Dark=False)
-        win32gui.SetWindowPos(hwnd, self.__figure_window.hwnd, 0, 0, 0, 0, win32con.SWP_NOMOVE | win32con.SWP_NOSIZE)
+class BlurBackdrop(BlurEffect):
+    """ Blur window behind master's window. Owned by the BlurHost, all calls only post requests to it. """
 
-        self.root.mainloop()
+    def __init__(self, host: "BlurHost", window: "Window") -> None:
+        self.__host = host
+        self.window = window
 
     def resize_to_window(self) -> None:
-        """ Update slave's rect to master's one. """
+        """ Update backdrop's rect to master's one (applied with the host's next frame). """
+
+        self.__host.post_geometry(self.window)
 
-        master_rect = self.__figure_window.rect
-        self.root.geometry(master_rect.geometry())
-        self.root.update()
-        
     def destroy(self) -> None:
-        """ Exit slave window. """
+        """ Remove backdrop. """
+
+        self.__host.detach(self.window)
+
+
+class BlurHost:
+    """
+    Single UI thread owning all blur backdrops. One hidden Tk root runs the message loop,
+    each backdrop is its Toplevel. Other threads never touch Tk: they post requests which are
+    picked up once per frame, geometry updates of the same window are coalesced to the latest one.
+    Frames are only scheduled while there are backdrops or pending requests, attaching a window
+    to an idle host wakes it up (the only call made from other threads, Tcl passes it to the host thread).
+    Tkinter, the blur library and pywin32 are imported on the first attached window.
+    """
+
+    def __init__(self, frame_interval: float) -> None:
+        self.frame_interval = frame_interval
+        self.__lock = threading.Lock()
+        self.__ready = threading.Event()
+        self.__thread: threading.Thread | None = None
+        self.__root = None
+        self.__scheduled = False  # Next frame is scheduled (or will be by the starting thread).
+
+        # Pending requests, applied by the host thread.
+        self.__attach: dict[int, "Window"] = {}
+        self.__detach: set[int] = set()
+        self.__geometry: dict[int, str] = {}
+
+        # hwnd -> Toplevel. Accessed only by the host thread.
+        self.__backdrops: dict[int, Any] = {}
+
+        self.posted_geometries = 0
+        self.applied_geometries = 0
+
+    def attach(self, window: "Window") -> BlurBackdrop:
+        with self.__lock:
+            self.__detach.discard(window.hwnd)
+            self.__attach[window.hwnd] = window
+            self.__geometry[window.hwnd] = window.rect.geometry()
+
+            wake = self.__thread is not None and not self.__scheduled
+            self.__scheduled = True
+
+        self.__start()
+        if wake:
+            self.__root.after(0, self.__frame)
+
+        return BlurBackdrop(self, window)
+
+    def detach(self, window: "Window") -> None:
+        with self.__lock:
+            self.__attach.pop(window.hwnd, None)
+            self.__geometry.pop(window.hwnd, None)
+            self.__detach.add(window.hwnd)
+
+    def post_geometry(self, window: "Window") -> None:
+        with self.__lock:
+            self.posted_geometries += 1
+            self.__geometry[window.hwnd] = window.rect.geometry()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "backdrops": len(self.__backdrops),
+            "posted_geometries": self.posted_geometries,
+            "applied_geometries": self.applied_geometries,
+        }
+
+    def __start(self) -> None:
+        with self.__lock:
+            if self.__thread is not None:
+                return
+
+            self.__thread = threading.Thread(target=self.__run, daemon=True, name="wingman-blur")
+            self.__thread.start()
+
+        self.__ready.wait()
+
+    def __run(self) -> None:
+        from tkinter import Tk
+
+        self.__root = Tk()
+        self.__root.withdraw()
+        self.__ready.set()
+
+        self.__root.after(0, self.__frame)
+        self.__root.mainloop()
+
+    def __frame(self) -> None:
+        """ Apply all requests posted since the previous frame. """
+
+        with self.__lock:
+            attach, self.__attach = self.__attach, {}
+            detach, self.__detach = self.__detach, set()
+            geometry, self.__geometry = self.__geometry, {}
+
+        for hwnd in detach:
+            backdrop = self.__backdrops.pop(hwnd, None)
+            if backdrop is not None:
+                backdrop.destroy()
+
+        for hwnd, window in attach.items():
+            if hwnd in self.__backdrops:
+                continue
+
+            try:
+                self.__backdrops[hwnd] = self.__create(window)
+            except Exception:
+                traceback.print_exc()
+
+        for hwnd, rect in geometry.items():
+            backdrop = self.__backdrops.get(hwnd)
+            if backdrop is None:
+                continue
+
+            try:
+                backdrop.geometry(rect)
+                self.applied_geometries += 1
+            except Exception:
+                traceback.print_exc()
+
+        with self.__lock:
+            # Nothing to apply until the next attach wakes the host up.
+            if not (self.__backdrops or self.__attach or self.__detach or self.__geometry):
+                self.__scheduled = False
+                return
+
+        self.__root.after(max(1, int(self.frame_interval * 1000)), self.__frame)
+
+    def __create(self, window: "Window") -> Any:
+        from BlurWindow.blurWindow import blur
+        from tkinter import Toplevel
+        from ctypes import windll
+        import win32gui
+        import win32con
+
+        backdrop = Toplevel(self.__root)
+        backdrop.config(bg='green')
+
+        backdrop.wm_attributes("-transparent", 'green')
+        backdrop.overrideredirect(True)
+
+        backdrop.update_idletasks()
+
+        hwnd = windll.user32.GetParent(backdrop.winfo_id())
+        blur(hwnd, Acrylic=False, Dark=False)
+        win32gui.SetWindowPos(hwnd, window.hwnd, 0, 0, 0, 0, win32con.SWP_NOMOVE | win32con.SWP_NOSIZE)
+
+        return backdrop
+
+
+class DwmLayer:
+    """ Composition calls used by the native blur. Each returns False if the system doesn't support it. """
+
+    def set_system_backdrop(self, hwnd: int, kind: int) -> bool:
+        raise NotImplementedError
+
+    def set_accent(self, hwnd: int, state: int) -> bool:
+        raise NotImplementedError
+
+
+class FakeDwm(DwmLayer):
+    """ In-memory DWM. Records every call, `failing` handles reject both attributes. """
+
+    def __init__(self, backdrop: bool = True, accent: bool = True, failing: set[int] | None = None) -> None:
+        self.backdrop = backdrop
+        self.accent = accent
+        self.failing = failing or set()
+        self.backdrops: dict[int, int] = {}
+        self.accents: dict[int, int] = {}
+        self.calls: list[tuple[str, int, int]] = []
+
+    def set_system_backdrop(self, hwnd: int, kind: int) -> bool:
+        self.calls.append(("set_system_backdrop", hwnd, kind))
+        if not self.backdrop or hwnd in self.failing:
+            return False
+
+        self.backdrops[hwnd] = kind
+        return True
+
+    def set_accent(self, hwnd: int, state: int) -> bool:
+        self.calls.append(("set_accent", hwnd, state))
+        if not self.accent or hwnd in self.failing:
+            return False
+
+        self.accents[hwnd] = state
+        return True
+
+
+class NativeBlur(BlurEffect):
+    """ Blur applied by DWM to the window itself. Nothing to follow on rect changes. """
+
+    def __init__(self, dwm: DwmLayer, hwnd: int, backdrop: bool) -> None:
+        self.__dwm = dwm
+        self.hwnd = hwnd
+        self.backdrop = backdrop  # System backdrop (Windows 11) or accent policy.
+
+    def destroy(self) -> None:
+        if self.backdrop:
+            self.__dwm.set_system_backdrop(self.hwnd, DWMSBT_AUTO)
+        else:
+            self.__dwm.set_accent(self.hwnd, ACCENT_DISABLED)
+
+
+class NativeBlurBackend:
+    """ No companion window: system backdrop if supported, blur-behind accent otherwise. """
+
+    name = "native"
+
+    def __init__(self, dwm: DwmLayer) -> None:
+        self.dwm = dwm
+
+    def attach(self, window: "Window") -> NativeBlur | None:
+        if self.dwm.set_system_backdrop(window.hwnd, DWMSBT_TRANSIENTWINDOW):
+            return NativeBlur(self.dwm, window.hwnd, backdrop=True)
+
+        if self.dwm.set_accent(window.hwnd, ACCENT_ENABLE_BLURBEHIND):
+            return NativeBlur(self.dwm, window.hwnd, backdrop=False)
+
+        return None
+
+
+class CompanionBlurBackend:
+    """ Blur window placed behind the master, works for every window. """
+
+    name = "companion"
+
+    def __init__(self, host: BlurHost) -> None:
+        self.host = host
+
+    def attach(self, window: "Window") -> BlurBackdrop:
+        return self.host.attach(window)
+
+
+def select_backends(preferred: str, native_backend: NativeBlurBackend, companion_backend: CompanionBlurBackend) -> list:
+    """
+    Backends tried in order for every window. "native" tries DWM first and falls back to the companion window
+    for windows it rejects. "auto" uses the companion window only: DWM accepts system backdrop of other
+    process' windows, but nothing is visible unless that process extended it's frame into the client area.
+    """
+
+    if preferred == NativeBlurBackend.name:
+        return [native_backend, companion_backend]
+
+    return [companion_backend]
+
+
+def apply(window: "Window", backends: list) -> BlurEffect | None:
+    """ Blur window with the first backend that accepts it. """
+
+    for backend in backends:
+        effect = backend.attach(window)
+        if effect is not None:
+            return effect
+
+    return None
+
+
+host = BlurHost(settings.BLUR_FRAME_INTERVAL)
+backends: list = []
+
+
+def start() -> None:
+    """ Select configured backends, native one uses DWM of the active system backend. """
 
-        self.root.quit()
-        self.root.update()
-        self.__handler.join()
+    backends[:] = select_backends(settings.BLUR_BACKEND, NativeBlurBackend(system.get()), CompanionBlurBackend(host))
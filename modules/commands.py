@@ -0,0 +1,146 @@
+from modules.onboarding import StageStats
+from modules import tracing
+
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field
+from collections.abc import Callable
+from typing import Any
+import traceback
+import threading
+import queue
+import time
+
+RESIZE = "resize"
+CALL = "call"
+
+# Consecutive commands of these kinds targeting the same window in the same direction are merged.
+COALESCABLE = (RESIZE,)
+
+
+@dataclass
+class Command:
+    kind: str
+    target: Any = None
+    direction: int | None = None
+    steps: int = 1
+    action: Callable[[], None] | None = None
+    created_at: list[float] = field(default_factory=lambda: [time.perf_counter()])
+
+
+def coalesce(commands: list[Command]) -> list[Command]:
+    """ Merge compatible consecutive commands, eg. five resizes of the same window become one resize by five steps. """
+
+    merged: list[Command] = []
+
+    for command in commands:
+        last = merged[-1] if merged else None
+
+        if last is not None and \
+           command.kind in COALESCABLE and \
+           command.kind == last.kind and \
+           command.target is last.target and \
+           command.direction == last.direction:
+            last.steps += command.steps
+            last.created_at.extend(command.created_at)
+            continue
+
+        merged.append(command)
+
+    return merged
+
+
+class LayoutActor:
+    """
+    The only writer of groups' state. Hotkeys, listeners and onboarding submit commands to the queue,
+    a single thread drains it, coalesces compatible commands and applies them inside one arrange batch
+    so every affected group is rearranged once per drain. Latency from submit to commit is recorded per kind.
+    """
+
+    def __init__(self, batch: Callable[[], AbstractContextManager] = nullcontext, on_applied: Callable[[], None] | None = None) -> None:
+        self.__batch = batch
+        self.__on_applied = on_applied
+        self.__handlers: dict[str, Callable[[Command], None]] = {CALL: lambda command: command.action()}
+        self.__queue: queue.Queue[Command] = queue.Queue()
+        self.__thread: threading.Thread | None = None
+
+        self.latency: dict[str, StageStats] = {}
+        self.submitted = 0
+        self.applied = 0
+
+    def register(self, kind: str, handler: Callable[[Command], None]) -> None:
+        self.__handlers[kind] = handler
+
+    def start(self) -> None:
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__loop, daemon=True, name="wingman-layout")
+            self.__thread.start()
+
+    def submit(self, command: Command) -> None:
+        self.submitted += 1
+        self.__queue.put(command)
+
+    def call(self, action: Callable[[], None]) -> None:
+        """ Run any layout mutation on the actor's thread. """
+
+        self.submit(Command(CALL, action=action))
+
+    def drain(self) -> int:
+        """ Apply all queued commands on the calling thread. Returns number of applied (coalesced) commands. """
+
+        pending = []
+
+        try:
+            while 1:
+                pending.append(self.__queue.get_nowait())
+
+        except queue.Empty:
+            pass
+
+        return self.__apply(pending)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {kind: stats.as_dict() for kind, stats in self.latency.items()}
+
+    def __loop(self) -> None:
+        while 1:
+            pending = [self.__queue.get()]
+
+            try:
+                while 1:
+                    pending.append(self.__queue.get_nowait())
+
+            except queue.Empty:
+                pass
+
+            self.__apply(pending)
+
+    def __apply(self, pending: list[Command]) -> int:
+        if not pending:
+            return 0
+
+        commands = coalesce(pending)
+
+        with tracing.span("layout_pass"), self.__batch():
+            for command in commands:
+                handler = self.__handlers.get(command.kind)
+                if handler is None:
+                    continue
+
+                try:
+                    handler(command)
+                except Exception:
+                    traceback.print_exc()
+
+        committed_at = time.perf_counter()
+
+        for command in commands:
+            stats = self.latency.setdefault(command.kind, StageStats())
+            for created_at in command.created_at:
+                stats.add(committed_at - created_at)
+
+        self.applied += len(commands)
+
+        if self.__on_applied is not None:
+            self.__on_applied()
+
+        return len(commands)
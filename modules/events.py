@@ -1,82 +1,51 @@
+from modules import snapshot
+from modules import settings
 from modules import windows
-from modules import arrange
+from modules import monitor
+from modules import tracing
+from modules import system
 
+from functools import partial
 import threading
-import win32gui
-import ctypes
 import time
 
 
-class _EventsListener:
+class EventsListener:
     """ Detect uncatched changes in displayed windows. """
 
-    def __init__(self):
+    def __init__(self, start: bool = True):
         self.CHECK_FREQ = 0.1
-        self.buffer = self.__load_visible_hwnds()
-        self.listener_thread = threading.Thread(target=self.__listen, daemon=True)
-        self.listener_thread.start()
+        self.snapshot = windows.desktop.latest()
 
-    def __load_visible_hwnds(self) -> list[int]:
-        """ Get list of currently visible window's handles. """
+        if start:
+            self.listener_thread = threading.Thread(target=self.__listen, daemon=True, name="wingman-listener")
+            self.listener_thread.start()
 
-        class TITLEBARINFO(ctypes.Structure):
-            _fields_ = [
-                ("cbSize", ctypes.wintypes.DWORD),
-                ("rcTitleBar", ctypes.wintypes.RECT),
-                ("rgstate", ctypes.wintypes.DWORD * 6)
-            ]
+    @tracing.traced("poll")
+    def poll(self, max_age: float | None = None) -> snapshot.SnapshotDelta:
+        """ Compare desktop with the previous snapshot and report changes to the screen's groups as a single batch. """
 
-        visible_windows: list[int] = []
+        tracing.count("poll_ticks")
 
-        def callback(hwnd: int, _):
-            title_info = TITLEBARINFO()
-            title_info.cbSize = ctypes.sizeof(title_info)
-            ctypes.windll.user32.GetTitleBarInfo(hwnd, ctypes.byref(title_info))
+        current = windows.desktop.latest(max_age=max_age)
+        delta = snapshot.diff(self.snapshot, current)
+        self.snapshot = current
 
-            is_cloaked = ctypes.c_int(0)
-            ctypes.WinDLL("dwmapi").DwmGetWindowAttribute(hwnd, 14, ctypes.byref(is_cloaked), ctypes.sizeof(is_cloaked))
+        if delta.added or delta.removed:
+            windows.layout_actor.call(partial(windows.apply_visible_delta, delta))
 
-            if all((
-                not win32gui.IsIconic(hwnd),
-                win32gui.IsWindowVisible(hwnd),
-                win32gui.GetWindowText(hwnd) != '',
-                is_cloaked.value == 0,
-                not (title_info.rgstate[0] & 0x00008000)
-            )):
-                visible_windows.append(hwnd)
-
-        win32gui.EnumWindows(callback, None)
-
-        return visible_windows
+        return delta
 
     def __listen(self) -> None:
-        """ Detect changes and report them to the screen's groups. """
-
         while 1:
             time.sleep(self.CHECK_FREQ)
 
-            active_hwnds = self.__load_visible_hwnds()
-
-            for hwnd in active_hwnds:
-                if hwnd not in self.buffer:
-                    win = windows.load_window_hwnd(hwnd, force_reinit=True)
-
-                    if win and win.screen:
-                        win.screen.group.rearrange()
-
-            for hwnd in self.buffer:
-                if hwnd not in active_hwnds:
-                    win = windows._windows_cache.get(hwnd)
-
-                    if win is not None:
-                        # win.screen might be lost due to minimized rect.
-                        for group in arrange.Group.all_groups:
-                            group.remove_window(win)
-
-            self.buffer = active_hwnds
+            # Reuse desktop scan made by other consumer in the meantime.
+            self.poll(max_age=self.CHECK_FREQ / 2)
 
 
 def init_listener():
-    """ Start background changes listener. """
+    """ Start background changes listeners. """
 
-    _EventsListener()
+    EventsListener()
+    system.get().watch_displays(lambda: windows.layout_actor.call(monitor.topology.rebuild), settings.DISPLAY_CHANGE_DELAY)
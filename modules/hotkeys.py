@@ -0,0 +1,50 @@
+from modules.position import Direction
+from modules import settings
+from modules import windows
+from modules import profiler
+from modules import logs
+from modules import tracing
+
+from collections.abc import Callable
+
+
+def bindings() -> dict[str, Callable[[], None]]:
+    """ Hotkeys (in AutoHotkey notation) and their handlers. Handlers don't depend on the hotkeys library. """
+
+    hotkeys = {}
+
+    if not settings.BLUR_MODE_ONLY:
+
+        # Move window.
+        hotkeys[f"{settings.PUSH_KEY}Right"] = lambda: windows.submit_for_focused(windows.Window.shift_right)  # Win + RIGHT
+        hotkeys[f"{settings.PUSH_KEY}Left"] = lambda: windows.submit_for_focused(windows.Window.shift_left)    # Win + LEFT
+        hotkeys[f"{settings.PUSH_KEY}Up"] = lambda: windows.submit_for_focused(windows.Window.maximize)        # Win + UP
+        hotkeys[f"{settings.PUSH_KEY}Down"] = lambda: windows.submit_for_focused(windows.Window.unmaximize)    # Win + DOWN
+
+        # Resize windows in groups.
+        hotkeys[f"{settings.RESIZE_KEY}Left"] = lambda: windows.submit_resize(Direction.LEFT)    # Win + Alt + LEFT
+        hotkeys[f"{settings.RESIZE_KEY}Right"] = lambda: windows.submit_resize(Direction.RIGHT)  # Win + Alt + RIGHT
+
+        # Change focus.
+        hotkeys[f"{settings.FOCUS_KEY}Left"] = lambda: windows.shift_focus(Direction.LEFT)    # Win + Shift + Left
+        hotkeys[f"{settings.FOCUS_KEY}Right"] = lambda: windows.shift_focus(Direction.RIGHT)  # Win + Shift + Right
+        hotkeys[f"{settings.FOCUS_KEY}Up"] = lambda: windows.shift_focus(Direction.UP)        # Win + Shift + Up
+        hotkeys[f"{settings.FOCUS_KEY}Down"] = lambda: windows.shift_focus(Direction.DOWN)    # Win + Shift + Down
+
+        # Restore window.
+        hotkeys[f"{settings.RESTORE_SHORTCUT}"] = lambda: windows.submit_for_focused(lambda win: win.draw_in_rect(restore=True))  # Win + Ctrl + R
+
+    # Change opacity.
+    hotkeys[f"{settings.OPACITY_KEY}WheelUp"] = lambda: windows.for_focused(windows.Window.increase_opacity)    # Ctrl + Shift + MouseWheelUp
+    hotkeys[f"{settings.OPACITY_KEY}WheelDown"] = lambda: windows.for_focused(windows.Window.decrease_opacity)  # Ctrl + Shift + MouseWheelDown
+
+    # Toogle blur.
+    hotkeys[f"{settings.BLUR_TOOGLE_SHORTCUT}"] = lambda: windows.for_focused(windows.Window.toogle_blur)  # Win + shift + b
+
+    # Start / stop sampling profiler.
+    hotkeys[f"{settings.PROFILER_SHORTCUT}"] = profiler.sampler.toggle  # Win + Ctrl + P
+
+    # Dump latest log records.
+    hotkeys[f"{settings.LOG_DUMP_SHORTCUT}"] = logs.dump  # Win + Ctrl + L
+
+    return {hotkey: tracing.traced(f"hotkey {hotkey}")(handler) for hotkey, handler in hotkeys.items()}
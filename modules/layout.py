@@ -0,0 +1,70 @@
+from modules.position import Rect
+
+from typing import NamedTuple
+from math import ceil
+
+
+class LayoutItem(NamedTuple):
+    min_w: int
+    l_shift: int = 0
+    bounding_error: tuple[int, int, int, int] = (0, 0, 0, 0)
+
+
+class Placement(NamedTuple):
+    frame: Rect   # Visible rect the window should occupy.
+    window: Rect  # Rect to pass to the system (frame corrected with window's bounding error).
+
+
+def window_rect(frame: Rect, bounding_error: tuple[int, int, int, int]) -> Rect:
+    """ Convert visible frame rect to the rect that has to be requested from the system to achieve it. """
+
+    diff_x, diff_y, diff_w, diff_h = bounding_error
+
+    return Rect.from_xywh(
+        frame.left - diff_x,
+        frame.top - diff_y,
+        frame.w - diff_w,
+        frame.h - diff_h
+    )
+
+
+def solve(screen_rect: Rect, margin: int, items: list[LayoutItem]) -> list[Placement]:
+    """
+    Compute final placement of all windows in a group in a single deterministic pass.
+    Every window gets an equal share of the screen modified by it's own and next window's border shift.
+    Widths never go below window's minimum width unless the remaining windows wouldn't fit,
+    the last window always ends at the screen's right border so the group never overflows.
+    """
+
+    if not items:
+        return []
+
+    top = screen_rect.top + margin
+    bottom = screen_rect.bottom - margin
+    screen_right = screen_rect.right - margin
+    share = ceil(screen_rect.w / len(items))
+
+    # Space required by all windows after n-th one: reserved[n] = sum(min_w + margin for items[n + 1:]).
+    reserved = [0] * len(items)
+    for index in range(len(items) - 2, -1, -1):
+        reserved[index] = reserved[index + 1] + items[index + 1].min_w + margin
+
+    placements: list[Placement] = []
+    prev_right = screen_rect.left
+
+    for index, item in enumerate(items):
+        left = prev_right + margin
+
+        if index == len(items) - 1:
+            right = screen_right
+
+        else:
+            right = left + share - margin - item.l_shift + items[index + 1].l_shift
+            right = max(right, left + item.min_w)
+            right = min(right, screen_right - reserved[index])
+
+        frame = Rect(left, top, right, bottom)
+        placements.append(Placement(frame, window_rect(frame, item.bounding_error)))
+        prev_right = right
+
+    return placements
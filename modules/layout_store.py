@@ -0,0 +1,148 @@
+from collections.abc import Callable
+from dataclasses import dataclass, asdict
+from typing import Any, TypeVar
+import threading
+import json
+import time
+import os
+
+_VERSION = 1
+
+T = TypeVar("T")
+
+
+@dataclass
+class WindowState:
+    executable: str
+    class_name: str
+    title: str
+    l_shift: int
+    opacity: int
+    blur: bool
+
+
+@dataclass
+class ScreenState:
+    rect: tuple[int, int, int, int]  # Monitor's rect (handles are not stable between sessions).
+    windows: list[WindowState]  # Group's order.
+
+
+def match_windows(states: list[WindowState], candidates: list[T], identity: Callable[[T], tuple[str, str, str]]) -> list[tuple[WindowState, T]]:
+    """
+    Pair saved states with live windows by (executable, class, title). Remaining states are paired
+    by (executable, class) only, as titles often change between sessions. Each window is used once.
+    """
+
+    remaining = list(candidates)
+    pairs: dict[int, tuple[WindowState, T]] = {}
+
+    for exact in (True, False):
+        for i, state in enumerate(states):
+            if i in pairs:
+                continue
+
+            for candidate in remaining:
+                executable, class_name, title = identity(candidate)
+
+                if executable.lower() == state.executable.lower() and class_name == state.class_name and (not exact or title == state.title):
+                    pairs[i] = (state, candidate)
+                    remaining.remove(candidate)
+                    break
+
+    return [pairs[i] for i in sorted(pairs)]
+
+
+class LayoutStore:
+    """
+    On-disk snapshot of the groups: order of windows per screen, their border shifts, opacity and blur.
+    Changes are captured (by `run`, eg. on the layout actor's thread) and written at most once per delay,
+    atomically, so a crash never leaves a broken file. Saving starts once the previous snapshot was restored.
+    """
+
+    def __init__(self, path: str, delay: float, capture: Callable[[], list[ScreenState]], run: Callable[[Callable[[], None]], None]) -> None:
+        self.path = path
+        self.delay = delay
+        self.armed = False
+        self.saves = 0
+
+        self.__capture = capture
+        self.__run = run
+        self.__timer: threading.Timer | None = None
+        self.__lock = threading.Lock()
+
+    def load(self) -> list[ScreenState]:
+        try:
+            with open(self.path, "r") as file:
+                content = json.load(file)
+
+        except (OSError, ValueError):
+            return []
+
+        if not isinstance(content, dict) or content.get("version") != _VERSION:
+            return []
+
+        screens = []
+
+        for raw in content.get("screens", []):
+            try:
+                screens.append(ScreenState(tuple(raw["rect"]), [WindowState(**window) for window in raw["windows"]]))
+            except (KeyError, TypeError, ValueError):
+                continue
+
+        return screens
+
+    def save(self, screens: list[ScreenState]) -> None:
+        """ Write the snapshot to a temporary file and swap it in. """
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        content: dict[str, Any] = {
+            "version": _VERSION,
+            "saved_at": time.time(),
+            "screens": [asdict(screen) for screen in screens],
+        }
+
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(content, file, separators=(",", ":"))
+
+        os.replace(temp_path, self.path)
+        self.saves += 1
+
+    def changed(self) -> None:
+        """ Schedule saving of the current layout (bursts of changes are written once). """
+
+        if not self.armed:
+            return
+
+        with self.__lock:
+            if self.__timer is not None:
+                return
+
+            self.__timer = threading.Timer(self.delay, self.__flush)
+            self.__timer.daemon = True
+            self.__timer.name = "wingman-layout-store"
+            self.__timer.start()
+
+    def __flush(self) -> None:
+        with self.__lock:
+            self.__timer = None
+
+        captured: list[list[ScreenState]] = []
+        done = threading.Event()
+
+        def capture() -> None:
+            try:
+                captured.append(self.__capture())
+            finally:
+                done.set()
+
+        self.__run(capture)
+
+        if done.wait(self.delay * 10) and captured:
+            try:
+                self.save(captured[0])
+            except OSError:
+                pass
@@ -1,32 +1,232 @@
-from colorama import Fore, Style, init as colorama_init
-from typing import TYPE_CHECKING
+from modules import settings
+
+from typing import TYPE_CHECKING, Any
+from collections import deque
+import threading
+import atexit
+import queue
+import time
 import sys
+import os
 
 if TYPE_CHECKING:
     from modules.windows import Window
 
 
-colorama_init()
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
 
-SUPRESS_LOGS = "-s" in sys.argv or "--supress" in sys.argv
+LEVEL_NAMES = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "ERROR": ERROR, "OFF": OFF}
+
+# ANSI codes (translated for older consoles by colorama, imported by the writer thread).
+BLUE = "\033[34m"
+CYAN = "\033[36m"
+YELLOW = "\033[33m"
+RED = "\033[31m"
+DIM = "\033[2m"
 ITALIC = "\033[3m"
-RESET = Fore.RESET + Style.RESET_ALL
+RESET = "\033[39m\033[0m"
+
+LEVEL_COLORS = {DEBUG: DIM, INFO: "", WARNING: YELLOW, ERROR: RED}
+
+SUPRESS_LOGS = "-s" in sys.argv or "--supress" in sys.argv
+
+
+class LogRecord:
+    """ Log event queued by the caller and formatted by the writer thread. """
+
+    __slots__ = ("created_at", "level", "window", "message", "args", "thread", "suppressed")
+
+    def __init__(self, level: int, window: "Window | None", message: str, args: tuple) -> None:
+        self.created_at = time.time()
+        self.level = level
+        self.window = window
+        self.message = message
+        self.args = args
+        self.thread = threading.current_thread().name
+        self.suppressed = 0
+
+    def text(self) -> str:
+        content = self.message.format(*self.args) if self.args else self.message
+
+        if self.suppressed:
+            content += f" (suppressed {self.suppressed} similar)"
+
+        return content
+
+    def render(self, colors: bool = True) -> str:
+        content = self.text()
+
+        if self.window is None:
+            return f"{BLUE}{LEVEL_COLORS[self.level]}{content}{RESET}" if colors else content
+
+        # Title from the window's cache - formatting must not call the system.
+        title = self.window.label()
+
+        if not colors:
+            return f"[{title} @{self.window.hwnd}] - {content}"
+
+        win_info = f"[{CYAN}{title}{RESET} {ITALIC}{DIM}@{self.window.hwnd}{RESET}]"
+        return f"{win_info} - {LEVEL_COLORS[self.level]}{content}{RESET}"
+
+    def dump_line(self) -> str:
+        stamp = time.strftime("%H:%M:%S", time.localtime(self.created_at)) + f".{int(self.created_at * 1000) % 1000:03d}"
+        level = next(name for name, value in LEVEL_NAMES.items() if value == self.level)
+        return f"{stamp} {level:<7} {self.thread:<20} {self.render(colors=False)}"
+
+
+class RateLimiter:
+    """ Token bucket per message template: at most `burst` records at once, refilled by `rate` records per second. """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.__buckets: dict[str, list[float]] = {}
+        self.__lock = threading.Lock()
+
+    def allow(self, key: str) -> tuple[bool, int]:
+        """ Returns if the record may pass and how many records were dropped since the last passed one. """
+
+        now = time.perf_counter()
+
+        with self.__lock:
+            bucket = self.__buckets.get(key)
+            if bucket is None:
+                bucket = self.__buckets[key] = [float(self.burst), now, 0]
+
+            tokens, updated_at, dropped = bucket
+            tokens = min(float(self.burst), tokens + (now - updated_at) * self.rate)
+
+            if tokens < 1:
+                bucket[:] = [tokens, now, dropped + 1]
+                return False, 0
+
+            bucket[:] = [tokens - 1, now, 0]
+            return True, int(dropped)
+
+
+class Logger:
+    """
+    Records are filtered (by level and rate) on the calling thread, then queued for a single writer thread
+    printing them to the console. Formatting happens on the writer, only for records that are printed or dumped.
+    The latest records are kept in a ring buffer which can be dumped to a file.
+    """
+
+    def __init__(self, console_level: int, ring_level: int, ring_size: int, limiter: RateLimiter) -> None:
+        self.console_level = console_level
+        self.ring_level = ring_level
+        self.threshold = min(console_level, ring_level)
+        self.ring: deque[LogRecord] = deque(maxlen=ring_size)
+        self.limiter = limiter
+
+        self.__queue: queue.SimpleQueue[LogRecord | threading.Event] = queue.SimpleQueue()
+        self.__thread: threading.Thread | None = None
+        self.__lock = threading.Lock()
+
+    def set_levels(self, console_level: int | None = None, ring_level: int | None = None) -> None:
+        if console_level is not None:
+            self.console_level = console_level
+
+        if ring_level is not None:
+            self.ring_level = ring_level
+
+        self.threshold = min(self.console_level, self.ring_level)
+
+    def log(self, level: int, window: "Window | None", message: str, args: tuple) -> None:
+        if level < self.threshold:
+            return
+
+        allowed, dropped = self.limiter.allow(message)
+        if not allowed:
+            return
+
+        record = LogRecord(level, window, message, args)
+        record.suppressed = dropped
+
+        if level >= self.ring_level:
+            self.ring.append(record)
+
+        if level >= self.console_level:
+            self.__ensure_writer()
+            self.__queue.put(record)
+
+    def flush(self) -> None:
+        """ Wait until queued records are printed. """
+
+        if self.__thread is None:
+            return
+
+        done = threading.Event()
+        self.__queue.put(done)
+        done.wait(1.0)
+
+    def dump(self, directory: str) -> str:
+        """ Write records from the ring buffer to a file. Returns it's path. """
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"ring-{time.strftime('%Y%m%d-%H%M%S')}.log")
+
+        with open(path, "w", encoding="utf-8") as file:
+            for record in list(self.ring):
+                file.write(record.dump_line() + "\n")
+
+        return path
+
+    def __ensure_writer(self) -> None:
+        if self.__thread is not None:
+            return
+
+        with self.__lock:
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__write_loop, daemon=True, name="wingman-logs")
+                self.__thread.start()
+                atexit.register(self.flush)
+
+    def __write_loop(self) -> None:
+        from colorama import init as colorama_init
+
+        colorama_init()
+
+        while 1:
+            record = self.__queue.get()
+
+            if isinstance(record, threading.Event):
+                sys.stdout.flush()
+                record.set()
+                continue
+
+            try:
+                print(record.render())
+            except Exception:
+                pass
+
+
+logger = Logger(
+    OFF if SUPRESS_LOGS else LEVEL_NAMES[settings.LOG_LEVEL],
+    LEVEL_NAMES[settings.LOG_RING_LEVEL],
+    settings.LOG_RING_SIZE,
+    RateLimiter(settings.LOG_RATE_LIMIT, settings.LOG_RATE_BURST),
+)
+
 
+def window_log(window: "Window", content: str, *args: Any, level: int = INFO) -> None:
+    """ Queue window's log record. `content` is formatted with `args` (str.format) only if the record is written. """
 
-def window_log(window: "Window", content: str) -> None:
-    """ Write window's log content if logs are not suppressed. """
+    logger.log(level, window, content, args)
 
-    if SUPRESS_LOGS:
-        return
 
-    win_info = f"[{Fore.CYAN}{window.text}{RESET} {ITALIC}{Style.DIM}@{window.hwnd}{RESET}]"
-    print(f"{win_info} - {content}")
+def system_log(content: str, *args: Any, level: int = INFO) -> None:
+    """ Queue system's log record. `content` is formatted with `args` (str.format) only if the record is written. """
 
+    logger.log(level, None, content, args)
 
-def system_log(content: str) -> None:
-    """ Write system's log content if logs are not suppressed. """
 
-    if SUPRESS_LOGS:
-        return
+def dump() -> str:
+    """ Write the ring buffer of latest records next to other logs. """
 
-    print(f"{Fore.BLUE}{content}{RESET}")
+    path = logger.dump(settings.LOG_DIR)
+    system_log("Dumped {} log records to: {}", len(logger.ring), path)
+    return path
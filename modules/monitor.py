@@ -1,8 +1,12 @@
 from modules.position import Rect, Direction
+from modules.topology import adjacency
+from modules import settings
 from modules import arrange
+from modules import system
+from modules import logs
 
 from typing import TYPE_CHECKING
-import win32api
+import threading
 
 if TYPE_CHECKING:
     from modules.windows import Window
@@ -11,35 +15,38 @@ if TYPE_CHECKING:
 class Screen:
     """ Represents display monitor. """
 
-    def __init__(self, monitor_data) -> None:
-        self.hMonitor, *_ = monitor_data
-
-        monitor_info = win32api.GetMonitorInfo(self.hMonitor)
-        work_area = monitor_info.get("Work")
-        real_rect = monitor_info.get("Monitor")
-
-        self.x = work_area[0]
-        self.y = work_area[1]
-        self.w = abs(work_area[2] - work_area[0])
-        self.h = abs(work_area[3] - work_area[1])
-        self.rect = Rect.from_list(real_rect)
-        self.group = arrange.Group(Rect.from_list(work_area))
+    def __init__(self, hMonitor: int, rect: Rect, work_area: Rect, dpi: int) -> None:
+        self.hMonitor = hMonitor
+        self.group = arrange.Group(work_area)
+        self.dpi = dpi
+        self.update(rect, work_area, dpi)
 
         self.right_monitor = None
         self.left_monitor = None
+        self.up_monitor = None
+        self.down_monitor = None
+
+    def update(self, rect: Rect, work_area: Rect, dpi: int) -> None:
+        """ Apply monitor's current geometry and scale. Windows are rearranged if anything changed. """
+
+        self.x = work_area.left
+        self.y = work_area.top
+        self.w = work_area.w
+        self.h = work_area.h
+        self.rect = rect
 
-    def arrange_bounding_monitors(self, all_screens: list["Screen"]) -> None:
-        """ Check other display screen's positions and find neighbours. """
+        changed = self.group.screen_rect != work_area
+        self.group.screen_rect = work_area
 
-        for screen in all_screens:
-            if screen == self:
-                continue
+        if dpi != self.dpi:
+            for window in self.group.windows:
+                window.rescale(dpi / self.dpi)
 
-            if screen.rect.right == self.rect.left:
-                self.left_monitor = screen
+            self.dpi = dpi
+            changed = True
 
-            elif screen.rect.left == self.rect.right:
-                self.right_monitor = screen
+        if changed:
+            self.group.rearrange()
 
     def attach_window(self, window: "Window", from_direction: Direction = Direction.LEFT) -> bool:
         """ Attach window to this screen's group. """
@@ -52,34 +59,99 @@ class Screen:
         self.group.remove_window(window)
 
 
-screens = [Screen(monitor_data) for monitor_data in win32api.EnumDisplayMonitors()]
-for screen in screens:
-    screen.arrange_bounding_monitors(screens)
+class Topology:
+    """
+    Connected monitors keyed by their handles. Rebuilt on display changes: screens of still connected
+    monitors are updated in place, new monitors get new screens, windows of removed monitors are moved
+    to remaining screens in a single layout batch. Neighbours are linked in all four directions.
+    """
+
+    def __init__(self, tolerance: int) -> None:
+        self.tolerance = tolerance
+        self.screens: dict[int, Screen] = {}
+        self.loaded = False
+        self.__load_lock = threading.Lock()
+
+    def ensure_loaded(self) -> None:
+        """ Build screens on the first use, monitors are not enumerated at import. """
+
+        if self.loaded:
+            return
+
+        with self.__load_lock:
+            if not self.loaded:
+                self.rebuild()
+
+    def rebuild(self) -> None:
+        """ Synchronize screens with connected monitors. (Mutates groups - run on the layout thread.) """
+
+        monitors = {info.handle: info for info in system.get().monitors()}
+        removed = [screen for key, screen in self.screens.items() if key not in monitors]
+
+        with arrange.batch():
+            for key, info in monitors.items():
+                screen = self.screens.get(key)
+
+                if screen is None:
+                    self.screens[key] = Screen(info.handle, info.rect, info.work_area, info.dpi)
+                    logs.system_log("Connected monitor: {}", info.rect.geometry())
+                else:
+                    screen.update(info.rect, info.work_area, info.dpi)
+
+            for screen in removed:
+                self.screens.pop(screen.hMonitor)
+                logs.system_log("Disconnected monitor: {}", screen.rect.geometry())
+
+            self.__link()
+            screens[:] = sorted(self.screens.values(), key=lambda screen: (screen.rect.left, screen.rect.top))
+
+            for screen in removed:
+                self.__migrate(screen)
+
+        self.loaded = True
+
+    def __link(self) -> None:
+        graph = adjacency({key: screen.rect for key, screen in self.screens.items()}, self.tolerance)
+
+        for key, screen in self.screens.items():
+            neighbours = graph[key]
+            screen.left_monitor = self.screens.get(neighbours.get(Direction.LEFT))
+            screen.right_monitor = self.screens.get(neighbours.get(Direction.RIGHT))
+            screen.up_monitor = self.screens.get(neighbours.get(Direction.UP))
+            screen.down_monitor = self.screens.get(neighbours.get(Direction.DOWN))
+
+    def __migrate(self, screen: Screen) -> None:
+        """ Move windows of removed monitor's group to the remaining screens. """
+
+        orphans = screen.group.dispose()
+
+        for window in orphans:
+            window.reattach()
+
+            if not any(window in group.windows for group in arrange.Group.all_groups):
+                arrange.attach_to_any_group(window)
+
+
+screens: list[Screen] = []
+topology = Topology(settings.MONITOR_EDGE_TOLERANCE)
 
 
 def get_screen(handle) -> Screen | None:
-    """ Get initialized screen by it's monitor handle. (For use with win32api) """
+    """ Get initialized screen by it's monitor handle. """
 
-    for screen in screens:
-        if handle == screen.hMonitor:
-            return screen
+    topology.ensure_loaded()
+    return topology.screens.get(handle)
 
 
 def leftmost_screen() -> Screen:
     """ Get first monitor from the left. """
 
-    screen = screens[0]
-    while screen.left_monitor is not None:
-        screen = screen.left_monitor
-
-    return screen
+    topology.ensure_loaded()
+    return min(screens, key=lambda screen: screen.rect.left)
 
 
 def rightmost_screen() -> Screen:
     """ Get the last monitor. """
 
-    screen = screens[0]
-    while screen.right_monitor is not None:
-        screen = screen.right_monitor
-
-    return screen
+    topology.ensure_loaded()
+    return max(screens, key=lambda screen: screen.rect.right)
@@ -0,0 +1,230 @@
+from modules.position import Rect
+from modules import system
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import NamedTuple
+
+
+class MoveBackend:
+    """ System calls used by move transactions. """
+
+    def begin(self, count: int) -> int | None:
+        raise NotImplementedError
+
+    def defer(self, handle: int, hwnd: int, rect: Rect) -> int | None:
+        raise NotImplementedError
+
+    def end(self, handle: int) -> bool:
+        raise NotImplementedError
+
+    def move(self, hwnd: int, rect: Rect) -> None:
+        raise NotImplementedError
+
+    def frame_bounds(self, hwnds: list[int]) -> dict[int, Rect]:
+        raise NotImplementedError
+
+
+class SystemMoveBackend(MoveBackend):
+    """ Deferred window positioning (BeginDeferWindowPos / DeferWindowPos / EndDeferWindowPos) of the system backend. """
+
+    def __init__(self, api: system.SystemBackend) -> None:
+        self.api = api
+
+    def begin(self, count: int) -> int | None:
+        return self.api.begin_defer(count)
+
+    def defer(self, handle: int, hwnd: int, rect: Rect) -> int | None:
+        return self.api.defer_move(handle, hwnd, rect)
+
+    def end(self, handle: int) -> bool:
+        return self.api.end_defer(handle)
+
+    def move(self, hwnd: int, rect: Rect) -> None:
+        self.api.move_window(hwnd, rect)
+
+    def frame_bounds(self, hwnds: list[int]) -> dict[int, Rect]:
+        return self.api.frame_bounds_many(hwnds)
+
+
+class RecordingMoveBackend(MoveBackend):
+    """
+    Fake backend recording every call. Windows end up exactly in the requested rect
+    unless `frame_offsets` describe the difference between requested rect and real frame.
+    Handles listed in `failing` make DeferWindowPos fail.
+    """
+
+    def __init__(self) -> None:
+        self.calls: list[tuple] = []
+        self.rects: dict[int, Rect] = {}
+        self.frame_offsets: dict[int, tuple[int, int, int, int]] = {}
+        self.failing: set[int] = set()
+        self.__pending: dict[int, Rect] = {}
+        self.__next_handle = 1
+
+    def begin(self, count: int) -> int | None:
+        self.calls.append(("begin", count))
+        self.__pending = {}
+        return self.__next_handle
+
+    def defer(self, handle: int, hwnd: int, rect: Rect) -> int | None:
+        self.calls.append(("defer", hwnd, rect))
+
+        if hwnd in self.failing:
+            return None
+
+        self.__pending[hwnd] = rect
+        self.__next_handle += 1
+        return self.__next_handle
+
+    def end(self, handle: int) -> bool:
+        self.calls.append(("end",))
+        self.rects.update(self.__pending)
+        self.__pending = {}
+        return True
+
+    def move(self, hwnd: int, rect: Rect) -> None:
+        self.calls.append(("move", hwnd, rect))
+        self.rects[hwnd] = rect
+
+    def frame_bounds(self, hwnds: list[int]) -> dict[int, Rect]:
+        self.calls.append(("frame_bounds", tuple(hwnds)))
+        frames = {}
+
+        for hwnd in hwnds:
+            rect = self.rects.get(hwnd)
+            if rect is None:
+                continue
+
+            diff_x, diff_y, diff_w, diff_h = self.frame_offsets.get(hwnd, (0, 0, 0, 0))
+            frames[hwnd] = Rect.from_xywh(rect.left + diff_x, rect.top + diff_y, rect.w + diff_w, rect.h + diff_h)
+
+        return frames
+
+
+class MoveTransaction:
+    """
+    Collect target rects of multiple windows and apply them at once, so the desktop is repainted only once.
+    When the deferred batch can't be created (eg. one of the windows is gone), windows are moved one by one.
+    """
+
+    def __init__(self, backend: MoveBackend) -> None:
+        self.backend = backend
+        self.moves: dict[int, Rect] = {}
+        self.committed = False
+
+    def add(self, hwnd: int, rect: Rect) -> None:
+        """ Schedule window's move. Later move of the same window replaces the previous one. """
+
+        self.moves[hwnd] = rect
+
+    def commit(self) -> dict[int, Rect]:
+        """ Apply all moves and return real frame bounds of moved windows. """
+
+        assert not self.committed, "Move transaction has already been committed."
+        self.committed = True
+
+        if not self.moves:
+            return {}
+
+        handle = self.backend.begin(len(self.moves))
+
+        for hwnd, rect in self.moves.items():
+            if not handle:
+                break
+
+            handle = self.backend.defer(handle, hwnd, rect)
+
+        if not handle or not self.backend.end(handle):
+            for hwnd, rect in self.moves.items():
+                self.backend.move(hwnd, rect)
+
+        return self.backend.frame_bounds(list(self.moves))
+
+
+class MoveRequest(NamedTuple):
+    hwnd: int
+    target: Rect                # Rect that should be requested from the system.
+    last_requested: Rect | None # Rect requested from the system by the previous move.
+    current: Rect | None        # Cached window's rect (updated by the tracker).
+
+
+@dataclass
+class PlanStats:
+    """
+    Counters of a single (or accumulated) planning.
+    Skipped move saves: restore check, DeferWindowPos and frame bounds readback,
+    together with ShowWindow and GetWindowRect calls that were made before every move.
+    Window that is moved but is not maximized saves ShowWindow and GetWindowRect, but costs IsZoomed check.
+    """
+
+    SKIPPED_MOVE_CALLS = 5
+    NOT_RESTORED_CALLS = 1
+
+    moved: int = 0
+    skipped: int = 0
+    restored: int = 0
+
+    @property
+    def saved_calls(self) -> int:
+        return self.skipped * self.SKIPPED_MOVE_CALLS + (self.moved - self.restored) * self.NOT_RESTORED_CALLS
+
+    def add(self, other: "PlanStats") -> None:
+        self.moved += other.moved
+        self.skipped += other.skipped
+        self.restored += other.restored
+
+
+@dataclass
+class MovePlan:
+    moves: list[MoveRequest] = field(default_factory=list)
+    restore: list[int] = field(default_factory=list)
+    stats: PlanStats = field(default_factory=PlanStats)
+
+
+class MovePlanner:
+    """
+    Drop moves that wouldn't change anything: target rect equals the rect requested previously
+    and the window hasn't been moved since. Only windows that are actually maximized are scheduled for restore.
+    """
+
+    def __init__(self, is_maximized: Callable[[int], bool]) -> None:
+        self.is_maximized = is_maximized
+        self.total = PlanStats()
+
+    def plan(self, requests: list[MoveRequest]) -> MovePlan:
+        plan = MovePlan()
+
+        for request in requests:
+            if request.last_requested is not None and request.target == request.last_requested == request.current:
+                plan.stats.skipped += 1
+                continue
+
+            plan.moves.append(request)
+            plan.stats.moved += 1
+
+            if self.is_maximized(request.hwnd):
+                plan.restore.append(request.hwnd)
+                plan.stats.restored += 1
+
+        self.total.add(plan.stats)
+        return plan
+
+
+backend: MoveBackend | None = None
+planner: MovePlanner | None = None
+
+
+def start() -> None:
+    """ Bind moves to the active system backend. """
+
+    global backend, planner
+
+    backend = SystemMoveBackend(system.get())
+    planner = MovePlanner(system.get().is_maximized)
+
+
+def transaction() -> MoveTransaction:
+    """ Start new move transaction using the active backend. """
+
+    return MoveTransaction(backend)
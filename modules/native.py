@@ -0,0 +1,382 @@
+from modules.position import Rect
+
+from typing import NamedTuple
+from ctypes import wintypes
+import threading
+import ctypes
+
+DWMWA_EXTENDED_FRAME_BOUNDS = 9
+DWMWA_CLOAKED = 14
+DWMWA_SYSTEMBACKDROP_TYPE = 38
+WCA_ACCENT_POLICY = 19
+STATE_SYSTEM_INVISIBLE = 0x00008000
+SWP_NOZORDER = 0x0004
+SWP_NOACTIVATE = 0x0010
+SWP_NOOWNERZORDER = 0x0200
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+WM_GETMINMAXINFO = 0x0024
+GWL_EXSTYLE = -20
+WS_EX_LAYERED = 0x00080000
+LWA_ALPHA = 0x00000002
+SMTO_BLOCK = 0x0001
+SMTO_ABORTIFHUNG = 0x0002
+
+WINFUNCTYPE = getattr(ctypes, "WINFUNCTYPE", ctypes.CFUNCTYPE)
+WNDENUMPROC = WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+
+
+class RECT(ctypes.Structure):
+    _fields_ = [
+        ("left", ctypes.c_long),
+        ("top", ctypes.c_long),
+        ("right", ctypes.c_long),
+        ("bottom", ctypes.c_long),
+    ]
+
+
+class TITLEBARINFO(ctypes.Structure):
+    _fields_ = [
+        ("cbSize", wintypes.DWORD),
+        ("rcTitleBar", RECT),
+        ("rgstate", wintypes.DWORD * 6)
+    ]
+
+
+class MINMAXINFO(ctypes.Structure):
+    _fields_ = [
+        ("ptReserved", wintypes.POINT),
+        ("ptMaxSize", wintypes.POINT),
+        ("ptMaxPosition", wintypes.POINT),
+        ("ptMinTrackSize", wintypes.POINT),
+        ("ptMaxTrackSize", wintypes.POINT),
+    ]
+
+
+class ACCENT_POLICY(ctypes.Structure):
+    _fields_ = [
+        ("AccentState", wintypes.DWORD),
+        ("AccentFlags", wintypes.DWORD),
+        ("GradientColor", wintypes.DWORD),
+        ("AnimationId", wintypes.DWORD),
+    ]
+
+
+class WINDOWCOMPOSITIONATTRIBDATA(ctypes.Structure):
+    _fields_ = [
+        ("Attribute", wintypes.DWORD),
+        ("Data", ctypes.c_void_p),
+        ("SizeOfData", ctypes.c_size_t),
+    ]
+
+
+class WindowInfo(NamedTuple):
+    hwnd: int
+    rect: Rect | None
+    cloaked: bool
+    titlebar_invisible: bool
+
+
+class _Buffers(threading.local):
+    """ Structures preallocated once per thread and reused by every call. """
+
+    def __init__(self) -> None:
+        self.rect = RECT()
+        self.frame = RECT()
+        self.cloaked = ctypes.c_int(0)
+        self.title_info = TITLEBARINFO()
+        self.title_info.cbSize = ctypes.sizeof(TITLEBARINFO)
+
+        self.rect_ref = ctypes.byref(self.rect)
+        self.frame_ref = ctypes.byref(self.frame)
+        self.cloaked_ref = ctypes.byref(self.cloaked)
+        self.title_info_ref = ctypes.byref(self.title_info)
+
+
+class NativeApi:
+    """
+    Typed bindings to user32 and dwmapi functions used on hot paths.
+    DLLs are loaded and prototypes bound only once, calls reuse per-thread preallocated structures.
+    Any objects exposing the same functions can be passed as DLLs (eg. stubs in benchmarks).
+    """
+
+    def __init__(self, user32, dwmapi, kernel32=None) -> None:
+        self.user32 = user32
+        self.dwmapi = dwmapi
+        self.kernel32 = kernel32
+        self.__buffers = _Buffers()
+
+        self._GetWindowRect = self.__bind(user32.GetWindowRect, wintypes.BOOL, [wintypes.HWND, ctypes.POINTER(RECT)])
+        self._GetTitleBarInfo = self.__bind(user32.GetTitleBarInfo, wintypes.BOOL, [wintypes.HWND, ctypes.POINTER(TITLEBARINFO)])
+        self._GetWindowTextLengthW = self.__bind(user32.GetWindowTextLengthW, ctypes.c_int, [wintypes.HWND])
+        self._IsIconic = self.__bind(user32.IsIconic, wintypes.BOOL, [wintypes.HWND])
+        self._IsWindowVisible = self.__bind(user32.IsWindowVisible, wintypes.BOOL, [wintypes.HWND])
+        self._IsZoomed = self.__bind(user32.IsZoomed, wintypes.BOOL, [wintypes.HWND])
+        self._EnumWindows = self.__bind(user32.EnumWindows, wintypes.BOOL, [WNDENUMPROC, wintypes.LPARAM])
+        self._MoveWindow = self.__bind(
+            user32.MoveWindow, wintypes.BOOL, [wintypes.HWND, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, wintypes.BOOL]
+        )
+        self._BeginDeferWindowPos = self.__bind(user32.BeginDeferWindowPos, wintypes.HANDLE, [ctypes.c_int])
+        self._DeferWindowPos = self.__bind(
+            user32.DeferWindowPos, wintypes.HANDLE,
+            [wintypes.HANDLE, wintypes.HWND, wintypes.HWND, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, wintypes.UINT]
+        )
+        self._EndDeferWindowPos = self.__bind(user32.EndDeferWindowPos, wintypes.BOOL, [wintypes.HANDLE])
+        self._GetWindowLongW = self.__bind(user32.GetWindowLongW, wintypes.LONG, [wintypes.HWND, ctypes.c_int])
+        self._SetWindowLongW = self.__bind(user32.SetWindowLongW, wintypes.LONG, [wintypes.HWND, ctypes.c_int, wintypes.LONG])
+        self._GetLayeredWindowAttributes = self.__bind(
+            user32.GetLayeredWindowAttributes, wintypes.BOOL,
+            [wintypes.HWND, ctypes.POINTER(wintypes.DWORD), ctypes.POINTER(ctypes.c_ubyte), ctypes.POINTER(wintypes.DWORD)]
+        )
+        self._SetLayeredWindowAttributes = self.__bind(
+            user32.SetLayeredWindowAttributes, wintypes.BOOL, [wintypes.HWND, wintypes.DWORD, ctypes.c_ubyte, wintypes.DWORD]
+        )
+        self._SendMessageTimeoutW = self.__bind(
+            user32.SendMessageTimeoutW, wintypes.LPARAM,
+            [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, ctypes.c_void_p, wintypes.UINT, wintypes.UINT, ctypes.POINTER(ctypes.c_size_t)]
+        )
+        self._GetClassNameW = self.__bind(user32.GetClassNameW, ctypes.c_int, [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int])
+        self._GetDpiForWindow = self.__bind(user32.GetDpiForWindow, wintypes.UINT, [wintypes.HWND])
+        self._GetWindowThreadProcessId = self.__bind(
+            user32.GetWindowThreadProcessId, wintypes.DWORD, [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+        )
+
+        # Process image name only (the native layer can be built without kernel32, eg. in benchmarks).
+        if kernel32 is not None:
+            self._OpenProcess = self.__bind(kernel32.OpenProcess, wintypes.HANDLE, [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD])
+            self._CloseHandle = self.__bind(kernel32.CloseHandle, wintypes.BOOL, [wintypes.HANDLE])
+            self._QueryFullProcessImageNameW = self.__bind(
+                kernel32.QueryFullProcessImageNameW, wintypes.BOOL,
+                [wintypes.HANDLE, wintypes.DWORD, wintypes.LPWSTR, ctypes.POINTER(wintypes.DWORD)]
+            )
+        self._DwmGetWindowAttribute = self.__bind(
+            dwmapi.DwmGetWindowAttribute, ctypes.c_long, [wintypes.HWND, wintypes.DWORD, ctypes.c_void_p, wintypes.DWORD]
+        )
+
+        # Missing on older systems (SetWindowCompositionAttribute is undocumented) and in stub DLLs.
+        self._DwmSetWindowAttribute = self.__bind_optional(
+            dwmapi, "DwmSetWindowAttribute", ctypes.c_long, [wintypes.HWND, wintypes.DWORD, ctypes.c_void_p, wintypes.DWORD]
+        )
+        self._SetWindowCompositionAttribute = self.__bind_optional(
+            user32, "SetWindowCompositionAttribute", wintypes.BOOL, [wintypes.HWND, ctypes.POINTER(WINDOWCOMPOSITIONATTRIBDATA)]
+        )
+
+    @staticmethod
+    def __bind(function, restype, argtypes):
+        function.restype = restype
+        function.argtypes = argtypes
+        return function
+
+    @classmethod
+    def __bind_optional(cls, dll, name, restype, argtypes):
+        function = getattr(dll, name, None)
+        return None if function is None else cls.__bind(function, restype, argtypes)
+
+    def window_rect(self, hwnd: int) -> Rect | None:
+        """ GetWindowRect, returns None if the window doesn't exist. """
+
+        buffers = self.__buffers
+        if not self._GetWindowRect(hwnd, buffers.rect_ref):
+            return None
+
+        rect = buffers.rect
+        return Rect(rect.left, rect.top, rect.right, rect.bottom)
+
+    def frame_bounds(self, hwnd: int) -> Rect:
+        """ Real window's rect (including shadows etc.) reported by DWM. """
+
+        buffers = self.__buffers
+        self._DwmGetWindowAttribute(hwnd, DWMWA_EXTENDED_FRAME_BOUNDS, buffers.frame_ref, ctypes.sizeof(RECT))
+
+        frame = buffers.frame
+        return Rect(frame.left, frame.top, frame.right, frame.bottom)
+
+    def frame_bounds_many(self, hwnds: list[int]) -> dict[int, Rect]:
+        """ Batched extended frame bounds lookup. """
+
+        return {hwnd: self.frame_bounds(hwnd) for hwnd in hwnds}
+
+    def move_window(self, hwnd: int, rect: Rect, repaint: bool = True) -> bool:
+        return bool(self._MoveWindow(hwnd, rect.left, rect.top, rect.w, rect.h, repaint))
+
+    def begin_defer(self, count: int) -> int | None:
+        return self._BeginDeferWindowPos(count)
+
+    def defer_move(self, handle: int, hwnd: int, rect: Rect) -> int | None:
+        """ Add window's move to the deferred positions structure, returns updated handle (None on failure). """
+
+        flags = SWP_NOZORDER | SWP_NOACTIVATE | SWP_NOOWNERZORDER
+        return self._DeferWindowPos(handle, hwnd, None, rect.left, rect.top, rect.w, rect.h, flags)
+
+    def end_defer(self, handle: int) -> bool:
+        return bool(self._EndDeferWindowPos(handle))
+
+    def class_name(self, hwnd: int) -> str:
+        buffer = ctypes.create_unicode_buffer(256)
+        self._GetClassNameW(hwnd, buffer, len(buffer))
+        return buffer.value
+
+    def dpi(self, hwnd: int) -> int:
+        """ DPI of the monitor the window is displayed on. """
+
+        return self._GetDpiForWindow(hwnd) or 96
+
+    def process_id(self, hwnd: int) -> int:
+        pid = wintypes.DWORD(0)
+        self._GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        return pid.value
+
+    def process_executable(self, hwnd: int) -> str:
+        """ Full path of the executable owning the window (empty if the process can't be queried). """
+
+        if self.kernel32 is None:
+            return ""
+
+        process = self._OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, self.process_id(hwnd))
+        if not process:
+            return ""
+
+        try:
+            buffer = ctypes.create_unicode_buffer(1024)
+            size = wintypes.DWORD(len(buffer))
+
+            if not self._QueryFullProcessImageNameW(process, 0, buffer, ctypes.byref(size)):
+                return ""
+
+            return buffer.value
+
+        finally:
+            self._CloseHandle(process)
+
+    def min_track_size(self, hwnd: int, timeout_ms: int) -> tuple[int, int] | None:
+        """ Ask the window for it's minimum tracking size with WM_GETMINMAXINFO. None if it didn't answer in time. """
+
+        info = MINMAXINFO()
+        result = ctypes.c_size_t(0)
+        flags = SMTO_BLOCK | SMTO_ABORTIFHUNG
+
+        if not self._SendMessageTimeoutW(hwnd, WM_GETMINMAXINFO, 0, ctypes.byref(info), flags, timeout_ms, ctypes.byref(result)):
+            return None
+
+        return info.ptMinTrackSize.x, info.ptMinTrackSize.y
+
+    def get_ex_style(self, hwnd: int) -> int:
+        return self._GetWindowLongW(hwnd, GWL_EXSTYLE)
+
+    def set_ex_style(self, hwnd: int, style: int) -> None:
+        self._SetWindowLongW(hwnd, GWL_EXSTYLE, style)
+
+    def get_alpha(self, hwnd: int) -> int | None:
+        """ Current alpha of layered window, None if the window has no alpha set. """
+
+        key = wintypes.DWORD(0)
+        alpha = ctypes.c_ubyte(0)
+        flags = wintypes.DWORD(0)
+
+        if not self._GetLayeredWindowAttributes(hwnd, ctypes.byref(key), ctypes.byref(alpha), ctypes.byref(flags)):
+            return None
+
+        if not flags.value & LWA_ALPHA:
+            return None
+
+        return alpha.value
+
+    def set_alpha(self, hwnd: int, alpha: int) -> None:
+        self._SetLayeredWindowAttributes(hwnd, 0, alpha, LWA_ALPHA)
+
+    def set_system_backdrop(self, hwnd: int, kind: int) -> bool:
+        """ Set DWM system backdrop (DWMSBT_*) of the window. False if not supported by the system. """
+
+        if self._DwmSetWindowAttribute is None:
+            return False
+
+        value = ctypes.c_int(kind)
+        return self._DwmSetWindowAttribute(hwnd, DWMWA_SYSTEMBACKDROP_TYPE, ctypes.byref(value), ctypes.sizeof(value)) == 0
+
+    def set_accent(self, hwnd: int, state: int, gradient: int = 0) -> bool:
+        """ Set composition accent (ACCENT_*) of the window. False if not supported by the system. """
+
+        if self._SetWindowCompositionAttribute is None:
+            return False
+
+        policy = ACCENT_POLICY(state, 0, gradient, 0)
+        data = WINDOWCOMPOSITIONATTRIBDATA(WCA_ACCENT_POLICY, ctypes.cast(ctypes.byref(policy), ctypes.c_void_p), ctypes.sizeof(policy))
+        return bool(self._SetWindowCompositionAttribute(hwnd, ctypes.byref(data)))
+
+    def is_maximized(self, hwnd: int) -> bool:
+        return bool(self._IsZoomed(hwnd))
+
+    def is_cloaked(self, hwnd: int) -> bool:
+        buffers = self.__buffers
+        buffers.cloaked.value = 0
+        self._DwmGetWindowAttribute(hwnd, DWMWA_CLOAKED, buffers.cloaked_ref, ctypes.sizeof(ctypes.c_int))
+
+        return buffers.cloaked.value != 0
+
+    def is_titlebar_invisible(self, hwnd: int) -> bool:
+        buffers = self.__buffers
+        buffers.title_info.rgstate[0] = 0
+        self._GetTitleBarInfo(hwnd, buffers.title_info_ref)
+
+        return bool(buffers.title_info.rgstate[0] & STATE_SYSTEM_INVISIBLE)
+
+    def enum_windows(self) -> list[int]:
+        """ Handles of all top-level windows in Z-order. """
+
+        hwnds: list[int] = []
+        append = hwnds.append
+
+        def callback(hwnd, _):
+            append(hwnd)
+            return True
+
+        self._EnumWindows(WNDENUMPROC(callback), 0)
+        return hwnds
+
+    def query_windows(self, hwnds: list[int]) -> list[WindowInfo]:
+        """ Batched rect, cloak state and titlebar state lookup. """
+
+        return [
+            WindowInfo(hwnd, self.window_rect(hwnd), self.is_cloaked(hwnd), self.is_titlebar_invisible(hwnd))
+            for hwnd in hwnds
+        ]
+
+    def visible_hwnds(self) -> list[int]:
+        """ Handles of windows that are actually displayed: visible, titled, not minimized, not cloaked and with visible titlebar. """
+
+        buffers = self.__buffers
+        cloaked, cloaked_ref = buffers.cloaked, buffers.cloaked_ref
+        rgstate, title_info_ref = buffers.title_info.rgstate, buffers.title_info_ref
+
+        is_iconic = self._IsIconic
+        is_visible = self._IsWindowVisible
+        text_length = self._GetWindowTextLengthW
+        get_title_bar_info = self._GetTitleBarInfo
+        get_attribute = self._DwmGetWindowAttribute
+        cloaked_size = ctypes.sizeof(cloaked)
+
+        visible: list[int] = []
+
+        for hwnd in self.enum_windows():
+            if not is_visible(hwnd) or is_iconic(hwnd) or text_length(hwnd) == 0:
+                continue
+
+            cloaked.value = 0
+            get_attribute(hwnd, DWMWA_CLOAKED, cloaked_ref, cloaked_size)
+            if cloaked.value:
+                continue
+
+            rgstate[0] = 0
+            get_title_bar_info(hwnd, title_info_ref)
+            if rgstate[0] & STATE_SYSTEM_INVISIBLE:
+                continue
+
+            visible.append(hwnd)
+
+        return visible
+
+
+def load() -> NativeApi:
+    """ Load system DLLs and bind prototypes. """
+
+    return NativeApi(ctypes.WinDLL("user32"), ctypes.WinDLL("dwmapi"), ctypes.WinDLL("kernel32"))
+
@@ -0,0 +1,233 @@
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import AbstractContextManager
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+import traceback
+import threading
+import queue
+import time
+
+STAGES = ("classify", "probe", "attach", "arrange")
+
+
+class StageStats:
+    """ Latency counters of a single pipeline stage. """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.worst = max(self.worst, seconds)
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "worst_ms": self.worst * 1000,
+        }
+
+
+class _Pending:
+    __slots__ = ("item", "deadline", "started_at")
+
+    def __init__(self, item: Any, deadline: float, started_at: float) -> None:
+        self.item = item
+        self.deadline = deadline
+        self.started_at = started_at
+
+
+class OnboardingPipeline:
+    """
+    Staged onboarding of newly discovered windows: discover -> classify -> probe -> attach -> arrange.
+    Classification is done by the caller, probes run on a bounded worker pool, so one slow application
+    doesn't block others. Windows with finished (or timed out) probes are attached by a single thread
+    in batches, every affected group is arranged once per batch. Batches are executed by `run`
+    (eg. the layout actor's thread). Probe results are only applied there, results of probes that
+    finished after the timeout are applied later on their own.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[Any], Any],
+        apply: Callable[[Any, Any], None],
+        attach: Callable[[Any], None],
+        on_timeout: Callable[[Any], None],
+        batch: Callable[[], AbstractContextManager],
+        run: Callable[[Callable[[], None]], None],
+        workers: int,
+        probe_timeout: float,
+        prepare: Callable[[Any], None] | None = None
+    ) -> None:
+        self.__probe = probe
+        self.__prepare = prepare
+        self.__apply = apply
+        self.__attach = attach
+        self.__on_timeout = on_timeout
+        self.__batch = batch
+        self.__run = run
+        self.probe_timeout = probe_timeout
+
+        self.__pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wingman-probe")
+        self.__pending: dict[int, _Pending] = {}
+        self.__ready: queue.Queue = queue.Queue()
+        self.__lock = threading.Lock()
+        self.__idle = threading.Event()
+        self.__idle.set()
+        self.__batches = 0  # Handed over to `run`, not applied yet.
+
+        self.stages = {stage: StageStats() for stage in STAGES}
+        threading.Thread(target=self.__attach_loop, daemon=True, name="wingman-onboarding").start()
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.stages[stage].add(seconds)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """ Per-stage latency summary. """
+
+        return {stage: stats.as_dict() for stage, stats in self.stages.items()}
+
+    def submit(self, item: Any) -> None:
+        """ Start probing classified item. It will be attached once probes finish or time out. """
+
+        now = time.perf_counter()
+
+        with self.__lock:
+            if id(item) in self.__pending:
+                return
+
+            self.__pending[id(item)] = _Pending(item, now + self.probe_timeout, now)
+            self.__idle.clear()
+
+        # Probes only measure, anything that changes the item (eg. restoring a maximized window) is done by `run` first.
+        if self.__prepare is None:
+            self.__start_probe(item)
+        else:
+            self.__run(partial(self.__prepared_probe, item))
+
+    def __prepared_probe(self, item: Any) -> None:
+        try:
+            self.__prepare(item)
+        finally:
+            self.__start_probe(item)
+
+    def __start_probe(self, item: Any) -> None:
+        future = self.__pool.submit(self.__probe, item)
+        future.add_done_callback(lambda future: self.__on_probed(item, future))
+
+        # Wake the attach loop so it accounts for the new deadline.
+        self.__ready.put(None)
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """ Wait until all submitted items are attached (batches were applied by `run`, not just queued). """
+
+        return self.__idle.wait(timeout)
+
+    def __on_probed(self, item: Any, future: Future) -> None:
+        failed = future.exception() is not None
+
+        with self.__lock:
+            pending = self.__pending.pop(id(item), None)
+
+            # Failed probe means the window most likely died, wake the loop without attaching it.
+            if pending is not None:
+                self.__ready.put(None if failed else (item, future.result()))
+
+        # Already attached with defaults after the timeout.
+        if pending is None:
+            if not failed:
+                self.__run(partial(self.__apply_late, item, future.result()))
+            return
+
+        self.record("probe", time.perf_counter() - pending.started_at)
+
+    def __expire(self) -> list[tuple[Any, Any]]:
+        """ Give up waiting for probes that exceeded the timeout. """
+
+        now = time.perf_counter()
+        expired = []
+
+        with self.__lock:
+            for key, pending in list(self.__pending.items()):
+                if pending.deadline <= now:
+                    self.__pending.pop(key)
+                    expired.append(pending.item)
+
+        for item in expired:
+            self.record("probe", self.probe_timeout)
+            self.__on_timeout(item)
+
+        return [(item, None) for item in expired]
+
+    def __next_deadline(self) -> float | None:
+        with self.__lock:
+            if not self.__pending:
+                return None
+
+            return max(0.0, min(pending.deadline for pending in self.__pending.values()) - time.perf_counter())
+
+    def __attach_loop(self) -> None:
+        while 1:
+            ready = []
+
+            try:
+                ready.append(self.__ready.get(timeout=self.__next_deadline()))
+                while 1:
+                    ready.append(self.__ready.get_nowait())
+
+            except queue.Empty:
+                pass
+
+            ready = [item for item in ready if item is not None] + self.__expire()
+
+            if ready:
+                with self.__lock:
+                    self.__batches += 1
+
+                self.__run(partial(self.__attach_batch, ready))
+
+            self.__update_idle()
+
+    def __update_idle(self) -> None:
+        with self.__lock:
+            if not self.__pending and not self.__batches and self.__ready.empty():
+                self.__idle.set()
+
+    def __attach_batch(self, items: list[tuple[Any, Any]]) -> None:
+        try:
+            self.__attach_items(items)
+
+        finally:
+            with self.__lock:
+                self.__batches -= 1
+
+            self.__update_idle()
+
+    def __attach_items(self, items: list[tuple[Any, Any]]) -> None:
+        with self.__batch():
+            started_at = time.perf_counter()
+
+            for item, result in items:
+                try:
+                    if result is not None:
+                        self.__apply(item, result)
+                    self.__attach(item)
+                except Exception:
+                    traceback.print_exc()
+
+            attached_at = time.perf_counter()
+            self.record("attach", (attached_at - started_at) / len(items))
+            arrange_started_at = attached_at
+
+        self.record("arrange", time.perf_counter() - arrange_started_at)
+
+    def __apply_late(self, item: Any, result: Any) -> None:
+        with self.__batch():
+            try:
+                self.__apply(item, result)
+            except Exception:
+                traceback.print_exc()
@@ -0,0 +1,197 @@
+from modules.native import WS_EX_LAYERED
+
+from collections.abc import Callable
+import traceback
+import threading
+import heapq
+import time
+
+MIN_OPACITY = 75
+MAX_OPACITY = 255
+
+
+class OpacityBackend:
+    """ System calls used to change window's transparency. """
+
+    def get_ex_style(self, hwnd: int) -> int:
+        raise NotImplementedError
+
+    def set_ex_style(self, hwnd: int, style: int) -> None:
+        raise NotImplementedError
+
+    def get_alpha(self, hwnd: int) -> int | None:
+        """ Current alpha of layered window. None if the window has no alpha set. """
+
+        raise NotImplementedError
+
+    def set_alpha(self, hwnd: int, alpha: int) -> None:
+        raise NotImplementedError
+
+
+class FakeOpacityBackend(OpacityBackend):
+    """ In-memory backend. Records every call. """
+
+    def __init__(self, styles: dict[int, int] | None = None, alphas: dict[int, int] | None = None) -> None:
+        self.styles = styles or {}
+        self.alphas = alphas or {}
+        self.calls: list[tuple[str, int]] = []
+
+    def get_ex_style(self, hwnd: int) -> int:
+        self.calls.append(("get_ex_style", hwnd))
+        return self.styles.get(hwnd, 0)
+
+    def set_ex_style(self, hwnd: int, style: int) -> None:
+        self.calls.append(("set_ex_style", hwnd))
+        self.styles[hwnd] = style
+
+    def get_alpha(self, hwnd: int) -> int | None:
+        self.calls.append(("get_alpha", hwnd))
+        return self.alphas.get(hwnd)
+
+    def set_alpha(self, hwnd: int, alpha: int) -> None:
+        self.calls.append(("set_alpha", hwnd))
+        self.alphas[hwnd] = alpha
+
+
+class FrameScheduler:
+    """ Single thread running delayed callbacks. Started on the first scheduled callback. """
+
+    def __init__(self) -> None:
+        self.__queue: list[tuple[float, int, Callable[[], None]]] = []
+        self.__condition = threading.Condition()
+        self.__counter = 0
+        self.__thread: threading.Thread | None = None
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> None:
+        with self.__condition:
+            self.__counter += 1
+            heapq.heappush(self.__queue, (time.perf_counter() + delay, self.__counter, callback))
+
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__loop, daemon=True, name="wingman-opacity")
+                self.__thread.start()
+
+            self.__condition.notify()
+
+    def __loop(self) -> None:
+        while 1:
+            with self.__condition:
+                while not self.__queue or self.__queue[0][0] > time.perf_counter():
+                    self.__condition.wait(self.__queue[0][0] - time.perf_counter() if self.__queue else None)
+
+                _, _, callback = heapq.heappop(self.__queue)
+
+            try:
+                callback()
+            except Exception:
+                traceback.print_exc()
+
+
+class OpacityController:
+    """
+    Opacity of a single window. Wheel notches only move the target value, the window itself is updated
+    at most once per frame interval: the first notch of a burst is applied immediately, the rest is
+    gathered and applied by a single delayed flush. WS_EX_LAYERED is set only once, the starting alpha
+    is read from the window instead of assuming it's opaque.
+    """
+
+    def __init__(
+        self,
+        hwnd: int,
+        backend: OpacityBackend,
+        frame_interval: float,
+        schedule: Callable[[float, Callable[[], None]], None],
+        on_applied: Callable[[int], None] | None = None,
+        clock: Callable[[], float] = time.perf_counter
+    ) -> None:
+        self.hwnd = hwnd
+        self.frame_interval = frame_interval
+        self.__backend = backend
+        self.__schedule = schedule
+        self.__on_applied = on_applied
+        self.__clock = clock
+        self.__lock = threading.RLock()
+
+        self.__style: int | None = None
+        self.__alpha: int | None = None
+        self.__target: int | None = None
+        self.__scheduled = False
+        self.__applied_at = float("-inf")
+
+        self.requested = 0
+        self.applied = 0
+
+    @property
+    def alpha(self) -> int:
+        """ Last applied alpha (read from the window on the first access). """
+
+        with self.__lock:
+            if self.__alpha is None:
+                self.__alpha = MAX_OPACITY
+
+                if self.__ex_style() & WS_EX_LAYERED:
+                    alpha = self.__backend.get_alpha(self.hwnd)
+                    if alpha is not None:
+                        self.__alpha = alpha
+
+            return self.__alpha
+
+    def nudge(self, delta: int) -> None:
+        """ Move the target opacity by delta. """
+
+        with self.__lock:
+            base = self.__target if self.__target is not None else self.alpha
+            self.__request(base + delta)
+
+    def set(self, alpha: int) -> None:
+        """ Set the target opacity. """
+
+        with self.__lock:
+            self.__request(alpha)
+
+    def flush(self) -> None:
+        """ Apply the target opacity now. """
+
+        with self.__lock:
+            self.__scheduled = False
+            target, self.__target = self.__target, None
+
+            if target is None or target == self.alpha:
+                return
+
+            style = self.__ex_style()
+            if not style & WS_EX_LAYERED:
+                self.__style = style | WS_EX_LAYERED
+                self.__backend.set_ex_style(self.hwnd, self.__style)
+
+            self.__backend.set_alpha(self.hwnd, target)
+            self.__alpha = target
+            self.__applied_at = self.__clock()
+            self.applied += 1
+
+        if self.__on_applied is not None:
+            self.__on_applied(target)
+
+    def __request(self, alpha: int) -> None:
+        self.requested += 1
+        self.__target = max(MIN_OPACITY, min(MAX_OPACITY, alpha))
+
+        if self.__scheduled:
+            return
+
+        wait = self.__applied_at + self.frame_interval - self.__clock()
+        if wait > 0:
+            self.__scheduled = True
+            self.__schedule(wait, self.flush)
+            return
+
+        self.flush()
+
+    def __ex_style(self) -> int:
+        if self.__style is None:
+            self.__style = self.__backend.get_ex_style(self.hwnd)
+
+        return self.__style
+
+
+scheduler = FrameScheduler()
@@ -1,14 +1,30 @@
-from dataclasses import dataclass
-from typing import Any
-from math import dist
+from operator import itemgetter
 
 
-@dataclass
-class Rect:
-    left: int
-    top: int
-    right: int
-    bottom: int
+class Rect(tuple):
+    """
+    Immutable rectangle: (left, top, right, bottom).
+    Width, height and raw tuple are computed once on construction and stored with the coordinates.
+    """
+
+    __slots__ = ()
+
+    left: int = property(itemgetter(0))
+    top: int = property(itemgetter(1))
+    right: int = property(itemgetter(2))
+    bottom: int = property(itemgetter(3))
+    w: int = property(itemgetter(4))
+    h: int = property(itemgetter(5))
+    raw: tuple[int, int, int, int] = property(itemgetter(6))
+
+    def __new__(cls, left: int, top: int, right: int, bottom: int) -> "Rect":
+        return tuple.__new__(cls, (left, top, right, bottom, abs(right - left), abs(bottom - top), (left, top, right, bottom)))
+
+    def __getnewargs__(self) -> tuple[int, int, int, int]:
+        return self[6]
+
+    def __repr__(self) -> str:
+        return f"Rect(left={self[0]}, top={self[1]}, right={self[2]}, bottom={self[3]})"
 
     @staticmethod
     def from_list(rect: list[int, int, int, int]) -> "Rect":
@@ -20,42 +36,53 @@ class Rect:
     def from_xywh(x: int, y: int, w: int, h: int) -> "Rect":
         """ Create Rect object from provided left, top, width and height values. """
 
-        left = x
-        top = y
-        right = left + w
-        bottom = top + h
-
-        return Rect(
-            left, top, right, bottom
-        )
+        return Rect(x, y, x + w, y + h)
 
     @staticmethod
     def from_RECT(rect) -> "Rect":
         """ Convert dwmapi RECT C-like structure to Rect. """
 
-        return Rect.from_list([rect.left, rect.top, rect.right, rect.bottom])
+        return Rect(rect.left, rect.top, rect.right, rect.bottom)
+
+    def intersection(self, other: "Rect") -> "Rect | None":
+        """ Common part of both rectangles or None if they don't overlap. """
+
+        left = max(self[0], other[0])
+        top = max(self[1], other[1])
+        right = min(self[2], other[2])
+        bottom = min(self[3], other[3])
+
+        if left >= right or top >= bottom:
+            return None
+
+        return Rect(left, top, right, bottom)
+
+    def union(self, other: "Rect") -> "Rect":
+        """ Smallest rectangle containing both rectangles. """
+
+        return Rect(min(self[0], other[0]), min(self[1], other[1]), max(self[2], other[2]), max(self[3], other[3]))
+
+    def contains(self, other: "Rect") -> bool:
+        """ Check if other rectangle lies entirely within this one. """
 
-    def __setattr__(self, name: str, value: Any) -> None:
-        object.__setattr__(self, name, value)
+        return self[0] <= other[0] and self[1] <= other[1] and other[2] <= self[2] and other[3] <= self[3]
 
-        if name in ["left", "top", "right", "bottom"]:
-            self.__recalc()
+    def contains_point(self, x: int, y: int) -> bool:
+        return self[0] <= x < self[2] and self[1] <= y < self[3]
 
-    def __post_init__(self) -> None:
-        self.__recalc()
+    def translate(self, dx: int, dy: int) -> "Rect":
+        """ Same rectangle moved by given offset. """
 
-    def __recalc(self) -> None:
-        if hasattr(self, 'left') and hasattr(self, 'right') and hasattr(self, 'top') and hasattr(self, 'bottom'):
-            self.w = int(dist([self.left], [self.right]))
-            self.h = int(dist([self.top], [self.bottom]))
-            self.raw = (self.left, self.top, self.right, self.bottom)
+        return Rect(self[0] + dx, self[1] + dy, self[2] + dx, self[3] + dy)
 
     def geometry(self) -> str:
         """ Return this rectangle in the Tkinter's geometry format. """
 
-        return f"{self.w}x{self.h}+{self.left}+{self.top}"
+        return f"{self[4]}x{self[5]}+{self[0]}+{self[1]}"
 
 
 class Direction:
     LEFT = 0
     RIGHT = 1
+    UP = 2
+    DOWN = 3
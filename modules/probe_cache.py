@@ -0,0 +1,129 @@
+from modules.probing import STRATEGY_PHYSICAL
+
+from dataclasses import dataclass, asdict
+import threading
+import json
+import time
+import os
+
+_VERSION = 2
+
+
+@dataclass
+class ProbeEntry:
+    min_w: int
+    bounding_error: tuple[int, int, int, int]
+    created_at: float
+    strategy: str = STRATEGY_PHYSICAL  # Probing strategy that measured min_w.
+
+
+def executable_version(executable: str) -> str:
+    """ Size and modification time of the executable, so updating the application invalidates it's entries. """
+
+    try:
+        stat = os.stat(executable)
+    except (OSError, ValueError):
+        return ""
+
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def make_key(executable: str, class_name: str, dpi: int, version: str = "") -> str:
+    """ Probe results are shared by all windows of the same application (version), window class and monitor DPI. """
+
+    return f"{executable.lower()}|{version}|{class_name}|{dpi}"
+
+
+class ProbeCache:
+    """
+    On-disk cache of window probing results (minimum width and bounding error).
+    The file is loaded on the first access and rewritten atomically after each change.
+    Entries older than ttl seconds are ignored and dropped.
+    """
+
+    def __init__(self, path: str, ttl: float) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.__entries: dict[str, ProbeEntry] | None = None
+        self.__lock = threading.Lock()
+
+    def get(self, key: str) -> ProbeEntry | None:
+        with self.__lock:
+            entries = self.__load()
+            entry = entries.get(key)
+
+            if entry is None:
+                return None
+
+            if time.time() - entry.created_at > self.ttl:
+                entries.pop(key)
+                self.__save()
+                return None
+
+            return entry
+
+    def put(self, key: str, min_w: int, bounding_error: tuple[int, int, int, int], strategy: str = STRATEGY_PHYSICAL) -> ProbeEntry:
+        entry = ProbeEntry(min_w, tuple(bounding_error), time.time(), strategy)
+
+        with self.__lock:
+            self.__load()[key] = entry
+            self.__save()
+
+        return entry
+
+    def invalidate(self, key: str | None = None) -> None:
+        """ Remove selected entry or all entries if no key is given. """
+
+        with self.__lock:
+            entries = self.__load()
+
+            if key is None:
+                entries.clear()
+            else:
+                entries.pop(key, None)
+
+            self.__save()
+
+    def __load(self) -> dict[str, ProbeEntry]:
+        if self.__entries is not None:
+            return self.__entries
+
+        self.__entries = {}
+
+        try:
+            with open(self.path, "r") as file:
+                content = json.load(file)
+
+        except (OSError, ValueError):
+            return self.__entries
+
+        if not isinstance(content, dict) or content.get("version") != _VERSION:
+            return self.__entries
+
+        for key, raw in content.get("entries", {}).items():
+            try:
+                self.__entries[key] = ProbeEntry(
+                    int(raw["min_w"]), tuple(raw["bounding_error"]), float(raw["created_at"]), str(raw.get("strategy", STRATEGY_PHYSICAL))
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+
+        return self.__entries
+
+    def __save(self) -> None:
+        """ Write the whole cache to a temporary file and swap it in, so a crash never leaves a broken file. """
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        content = {
+            "version": _VERSION,
+            "entries": {key: asdict(entry) for key, entry in self.__entries.items()}
+        }
+
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(content, file)
+
+        os.replace(temp_path, self.path)
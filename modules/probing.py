@@ -0,0 +1,59 @@
+from typing import NamedTuple
+
+STRATEGY_MINMAXINFO = "minmaxinfo"
+STRATEGY_PHYSICAL = "physical"
+
+
+class ProbeResult(NamedTuple):
+    min_w: int
+    strategy: str
+
+
+class ProbeBackend:
+    """ System calls used to find window's minimum width. """
+
+    def query_min_width(self, hwnd: int, timeout_ms: int) -> int | None:
+        """ Ask the window for it's minimum tracking width (WM_GETMINMAXINFO). None if the window didn't answer in time. """
+
+        raise NotImplementedError
+
+    def physical_min_width(self, hwnd: int) -> int:
+        """ Shrink the window and measure how small it actually got. """
+
+        raise NotImplementedError
+
+
+class FakeProbeBackend(ProbeBackend):
+    """
+    In-memory backend. `answers` maps handle to the width reported by WM_GETMINMAXINFO
+    (missing handle behaves like a hung window), `physical` maps handle to the measured width.
+    """
+
+    def __init__(self, answers: dict[int, int] | None = None, physical: dict[int, int] | None = None) -> None:
+        self.answers = answers or {}
+        self.physical = physical or {}
+        self.calls: list[tuple[str, int]] = []
+
+    def query_min_width(self, hwnd: int, timeout_ms: int) -> int | None:
+        self.calls.append((STRATEGY_MINMAXINFO, hwnd))
+        return self.answers.get(hwnd)
+
+    def physical_min_width(self, hwnd: int) -> int:
+        self.calls.append((STRATEGY_PHYSICAL, hwnd))
+        return self.physical.get(hwnd, 0)
+
+
+def probe_min_width(backend: ProbeBackend, hwnd: int, timeout_ms: int, floor: int = 0) -> ProbeResult:
+    """
+    Find window's minimum width without touching it if possible: ask for WM_GETMINMAXINFO first
+    and fall back to the physical probe (moving and shrinking the window) only if the window didn't answer.
+    Windows without custom limits answer 0 (the message is sent from outside, so the system doesn't fill
+    in it's defaults), such answers are raised to the floor.
+    """
+
+    answer = backend.query_min_width(hwnd, timeout_ms)
+
+    if answer is not None:
+        return ProbeResult(max(answer, floor), STRATEGY_MINMAXINFO)
+
+    return ProbeResult(backend.physical_min_width(hwnd), STRATEGY_PHYSICAL)
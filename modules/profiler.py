@@ -0,0 +1,136 @@
+from modules import settings
+from modules import logs
+
+from collections import Counter
+from types import FrameType
+import threading
+import time
+import sys
+import os
+
+# Threads started by wingman are named "wingman-<role>", hotkey callbacks run on threads of the AHK library.
+THREAD_PREFIX = "wingman-"
+HOTKEYS_FILE = os.path.join("modules", "hotkeys.py")
+
+
+def thread_role(thread: threading.Thread | None, frame: FrameType) -> str:
+    """ Role of the thread used as the root of its stacks (eg. "layout", "probe", "blur", "ahk"). """
+
+    if thread is None:
+        return "unknown"
+
+    if thread is threading.main_thread():
+        return "main"
+
+    if thread.name.startswith(THREAD_PREFIX):
+        return thread.name.removeprefix(THREAD_PREFIX).split("_")[0]
+
+    while frame is not None:
+        if frame.f_code.co_filename.endswith(HOTKEYS_FILE):
+            return "ahk"
+        frame = frame.f_back
+
+    return "other"
+
+
+def collapse(frame: FrameType) -> list[str]:
+    """ Frames of the stack from the outermost one. """
+
+    stack = []
+
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+
+    stack.reverse()
+    return stack
+
+
+class SamplingProfiler:
+    """
+    Periodically samples stacks of all threads (without instrumenting them) and writes them in the collapsed
+    format read by flamegraph tools: `role;frame;frame;... count` per line.
+    """
+
+    def __init__(self, interval: float, directory: str) -> None:
+        self.interval = interval
+        self.directory = directory
+        self.samples: Counter[str] = Counter()
+        self.ticks = 0
+
+        self.__lock = threading.Lock()
+        self.__stop: threading.Event | None = None
+        self.__thread: threading.Thread | None = None
+        self.__started_at = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self.__thread is not None
+
+    def start(self) -> None:
+        with self.__lock:
+            if self.__thread is not None:
+                return
+
+            self.samples = Counter()
+            self.ticks = 0
+            self.__started_at = time.time()
+            self.__stop = threading.Event()
+            self.__thread = threading.Thread(target=self.__loop, args=(self.__stop,), daemon=True, name="wingman-profiler")
+            self.__thread.start()
+
+        logs.system_log("Started sampling profiler (every {:.1f}ms).", self.interval * 1000)
+
+    def stop(self) -> str | None:
+        """ Stop sampling and write collected stacks. Returns path of the written profile. """
+
+        with self.__lock:
+            if self.__thread is None:
+                return None
+
+            self.__stop.set()
+            self.__thread.join()
+            self.__thread = None
+
+        path = self.write()
+        logs.system_log("Saved {} profiler samples to: {}", self.ticks, path)
+        return path
+
+    def toggle(self) -> None:
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    def sample(self) -> None:
+        """ Record current stack of every thread except the profiler's own one. """
+
+        own_ident = threading.get_ident()
+        threads = {thread.ident: thread for thread in threading.enumerate()}
+
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+
+            role = thread_role(threads.get(ident), frame)
+            self.samples[";".join([role, *collapse(frame)])] += 1
+
+        self.ticks += 1
+
+    def write(self) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"profile-{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.__started_at))}.folded")
+
+        with open(path, "w") as file:
+            for stack, amount in self.samples.most_common():
+                file.write(f"{stack} {amount}\n")
+
+        return path
+
+    def __loop(self, stop: threading.Event) -> None:
+        while not stop.wait(self.interval):
+            self.sample()
+
+
+sampler = SamplingProfiler(settings.PROFILER_INTERVAL, settings.PROFILE_DIR)
@@ -1,34 +1,19 @@
+from modules.probe_cache import ProbeCache, make_key, executable_version
 from modules.position import Rect
 from modules import settings
+from modules import probing
+from modules import system
 
-from ctypes import wintypes
 import threading
-import win32gui
-import ctypes
 
-dwmapi = ctypes.WinDLL("dwmapi")
 
+probe_cache = ProbeCache(settings.PROBE_CACHE_PATH, settings.PROBE_CACHE_TTL)
 
-class RECT(ctypes.Structure):
-    _fields_ = [
-        ("left", ctypes.c_long),
-        ("top", ctypes.c_long),
-        ("right", ctypes.c_long),
-        ("bottom", ctypes.c_long),
-    ]
 
-
-DwmGetWindowAttribute = dwmapi.DwmGetWindowAttribute
-DwmGetWindowAttribute.restype = ctypes.HRESULT
-DwmGetWindowAttribute.argtypes = [wintypes.HWND, wintypes.DWORD, ctypes.POINTER(RECT), ctypes.c_size_t]
-
-
-def get_extended_frame_bounds(hwnd: int) -> RECT:
+def get_extended_frame_bounds(hwnd: int) -> Rect:
     """ Returns real window's rect (including shadows etc.) """
 
-    rect = RECT()
-    DwmGetWindowAttribute(hwnd, 9, ctypes.byref(rect), ctypes.sizeof(rect))
-    return rect
+    return system.get().frame_bounds(hwnd)
 
 
 def set_window_rect(hwnd: int, rect: Rect) -> None:
@@ -39,16 +24,9 @@ def set_window_rect(hwnd: int, rect: Rect) -> None:
     to the move request. (Thanks Microsoft, good job.) 
     """
     
-    move_fn = lambda: win32gui.MoveWindow(
-        hwnd,
-        rect.left,
-        rect.top,
-        rect.w,
-        rect.h,
-        True
-    )
+    move_fn = lambda: system.get().move_window(hwnd, rect)
         
-    move_th = threading.Thread(target=move_fn, daemon=True)
+    move_th = threading.Thread(target=move_fn, daemon=True, name="wingman-probe-move")
     move_th.start()
     move_th.join(0.5)
 
@@ -59,7 +37,7 @@ def get_bounding_diff(hwnd: int) -> tuple[int, int, int, int]:
     Return format: (diff_x, diff_y, diff_w, diff_h)
     """
 
-    rect_x, rect_y, rect_r, rect_b = win32gui.GetWindowRect(hwnd)
+    rect_x, rect_y, rect_r, rect_b = system.get().window_rect(hwnd).raw
 
     extended_frame = get_extended_frame_bounds(hwnd)
     ext_frame_x = extended_frame.left
@@ -81,12 +59,60 @@ def get_window_min_width(hwnd: int) -> int:
     custom-set minimum width without checking how will they respond to shrinking request
     and what will be their actual size output that might not be what was expected.
     """
-    start_rect = Rect.from_list(win32gui.GetWindowRect(hwnd))
+    start_rect = system.get().window_rect(hwnd)
     test_rect = Rect.from_xywh(0, 0, settings.WINDOW_MIN_W, settings.WINDOW_MIN_W)
 
     set_window_rect(hwnd, test_rect)
-    minimum_width = Rect.from_RECT(get_extended_frame_bounds(hwnd)).w
+    minimum_width = get_extended_frame_bounds(hwnd).w
 
     set_window_rect(hwnd, start_rect)
 
     return minimum_width
+
+
+def probe_key(hwnd: int) -> str:
+    """ Cache key of window's probing results: process executable (and it's version), window class and monitor DPI. """
+
+    executable = system.get().process_executable(hwnd)
+    return make_key(executable, system.get().class_name(hwnd), system.get().dpi(hwnd), executable_version(executable))
+
+
+class SystemProbeBackend(probing.ProbeBackend):
+    """ Minimum width probing on the desktop of the system backend. """
+
+    def query_min_width(self, hwnd: int, timeout_ms: int) -> int | None:
+        size = system.get().min_track_size(hwnd, timeout_ms)
+        if size is None:
+            return None
+
+        # Tracking size includes invisible borders, minimum width is compared with visible frame.
+        window_rect = system.get().window_rect(hwnd)
+        if window_rect is None:
+            return None
+
+        frame_rect = get_extended_frame_bounds(hwnd)
+
+        return size[0] - (window_rect.w - frame_rect.w)
+
+    def physical_min_width(self, hwnd: int) -> int:
+        return get_window_min_width(hwnd)
+
+
+probe_backend = SystemProbeBackend()
+
+
+def probe_window(hwnd: int, force: bool = False) -> tuple[tuple[int, int, int, int], int]:
+    """
+    Returns window's bounding error and minimum width. Results are cached on disk per application
+    so the window doesn't have to be probed again (force flag ignores cached result).
+    Return format: (bounding_error, minimum_width)
+    """
+
+    key = probe_key(hwnd)
+    entry = None if force else probe_cache.get(key)
+
+    if entry is None:
+        result = probing.probe_min_width(probe_backend, hwnd, settings.MINMAXINFO_TIMEOUT_MS, settings.WINDOW_MIN_W)
+        entry = probe_cache.put(key, result.min_w, get_bounding_diff(hwnd), result.strategy)
+
+    return entry.bounding_error, entry.min_w
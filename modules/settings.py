@@ -6,6 +6,7 @@ MARGIN_PX = 16
 WINDOW_MIN_W = 480
 OPACITY_VALUE_STEP = 5
 DEFAULT_OPACITY_ON_BLUR = 225
+BLUR_BACKEND = "auto"  # "native" (blur applied by DWM to the window itself, companion as fallback), "companion" (blur window behind) or "auto" (companion, native backdrop is invisible on most windows).
 MAX_WINS_IN_GROUP = 4
 
 # Shortcuts.
@@ -21,6 +22,8 @@ FOCUS_KEY = "#+"
 OPACITY_KEY = "^+"
 RESTORE_SHORTCUT = "#^r"
 BLUR_TOOGLE_SHORTCUT = "#+b"
+PROFILER_SHORTCUT = "#^p"
+LOG_DUMP_SHORTCUT = "#^l"
 
 # Ignoring.
 IGNORE_WIN_TEXT = [
@@ -36,3 +39,36 @@ INGORE_CHILDREN = True
 
 # Other.
 OVERLAPPING_FOCUS_SHIFT = True
+MONITOR_EDGE_TOLERANCE = 8  # Max gap (px) between edges of monitors considered neighbours.
+
+# Performance.
+SNAPSHOT_FRESHNESS = 0.15  # Seconds for which visible windows scan result is shared between consumers.
+PROBE_CACHE_PATH = "./cache/probes.json"  # Measured minimum widths and frame offsets of applications.
+PROBE_CACHE_TTL = 7 * 24 * 60 * 60  # Seconds after which application is probed again.
+LAYOUT_SNAPSHOT_PATH = "./cache/layout.json"  # Groups' order, shifts, opacity and blur restored after restart.
+LAYOUT_SAVE_DELAY = 2.0  # Layout is saved at most once per this many seconds after it changed.
+MINMAXINFO_TIMEOUT_MS = 50  # Time given to window to report it's minimum size before it's probed physically.
+ONBOARDING_WORKERS = 4  # Amount of windows probed at the same time.
+ONBOARDING_PROBE_TIMEOUT = 2.0  # Seconds after which window is attached without waiting for it's probes.
+OPACITY_FRAME_INTERVAL = 1 / 60  # Opacity of a window is updated at most once per this many seconds.
+BLUR_FRAME_INTERVAL = 1 / 60  # Blur backdrops follow their windows at most once per this many seconds.
+DISPLAY_CHANGE_DELAY = 0.5  # Seconds to let a burst of display changes settle before monitors are rebuilt.
+
+# Logs.
+LOG_LEVEL = "INFO"  # Lowest level printed to the console: "DEBUG", "INFO", "WARNING", "ERROR" or "OFF" (same as --supress flag).
+LOG_RING_LEVEL = "INFO"  # Lowest level kept in the in-memory ring buffer (dumped with LOG_DUMP_SHORTCUT).
+LOG_RING_SIZE = 2000  # Amount of latest records kept in the ring buffer.
+LOG_RATE_LIMIT = 20.0  # Records of the same message per second (after a burst), the rest is dropped and counted.
+LOG_RATE_BURST = 50
+LOG_DIR = "./logs"  # Ring buffer dumps.
+
+# Tracing (enabled with --trace flag).
+TRACE_RECENT_SPANS = 2048  # Finished spans kept for the next export.
+TRACE_EXPORT_PATH = "./logs/trace.jsonl"  # Metrics snapshots (and recent spans) appended as JSON lines.
+TRACE_EXPORT_INTERVAL = 5.0  # Seconds between snapshots.
+TRACE_EXPORT_MAX_BYTES = 5 * 1024 * 1024  # Export file is rolled over to `.1` after reaching this size.
+TRACE_SOCKET_PORT = 0  # Local port serving current metrics as JSON (0 disables).
+
+# Profiling (toggled with PROFILER_SHORTCUT or started with --profile flag).
+PROFILER_INTERVAL = 0.005  # Seconds between samples of all threads' stacks.
+PROFILE_DIR = "./logs"  # Collapsed stacks are written here as `profile-<time>.folded`.
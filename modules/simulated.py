@@ -0,0 +1,434 @@
+from modules.system import SystemBackend, MonitorInfo, SW_HIDE, SW_NORMAL, SW_SHOWMINIMIZED, SW_MAXIMIZE, SW_MINIMIZE
+from modules.tracker import EventSource, EventKind, ScriptedEventSource
+from modules.native import WS_EX_LAYERED
+from modules.position import Rect
+
+from dataclasses import dataclass
+from collections.abc import Callable
+from collections import Counter
+import threading
+
+DEFAULT_DPI = 96
+
+
+@dataclass
+class SimulatedWindow:
+    hwnd: int
+    title: str
+    rect: Rect
+    min_w: int = 0                                           # Minimum width of the window rect (like ptMinTrackSize).
+    min_h: int = 0
+    frame_offset: tuple[int, int, int, int] = (7, 0, 7, 7)  # Invisible borders: left, top, right, bottom.
+    executable: str = "C:/Simulated/app.exe"
+    class_name: str = "SimulatedWindow"
+    owner: int = 0
+    hung: bool = False                                       # Doesn't answer messages and ignores moves.
+    visible: bool = True
+    minimized: bool = False
+    maximized: bool = False
+    cloaked: bool = False
+    ex_style: int = 0
+    alpha: int | None = None
+    backdrop: int = 0
+    accent: int = 0
+    normal_rect: Rect | None = None
+
+    @property
+    def frame(self) -> Rect:
+        left, top, right, bottom = self.frame_offset
+        return Rect(self.rect.left + left, self.rect.top + top, self.rect.right - right, self.rect.bottom - bottom)
+
+
+class SimulatedDesktop(SystemBackend):
+    """
+    In-memory desktop: windows with minimum sizes, invisible borders and hung windows on multiple monitors.
+    Every backend call is counted by name. Changes made through the backend (and by the scripting methods
+    simulating the user) produce window events delivered by `pump()`, or immediately with `auto_pump`.
+    """
+
+    def __init__(self, monitors: list[MonitorInfo], auto_pump: bool = False) -> None:
+        self.monitor_list = list(monitors)
+        self.auto_pump = auto_pump
+        self.windows: dict[int, SimulatedWindow] = {}
+        self.z_order: list[int] = []  # Topmost window first.
+        self.foreground = 0
+        self.supports_backdrop = True
+        self.supports_accent = True
+
+        self.calls: Counter[str] = Counter()
+        self.events = ScriptedEventSource()
+        self.__display_callbacks: list[Callable[[], None]] = []
+        self.__deferred: dict[int, dict[int, Rect]] = {}
+        self.__next_handle = 1
+        self.__next_hwnd = 0x10000
+        self.__lock = threading.RLock()
+
+    @classmethod
+    def default(cls) -> "SimulatedDesktop":
+        """ Single full HD monitor with a taskbar. """
+
+        return cls.side_by_side(1)
+
+    @classmethod
+    def side_by_side(cls, count: int, width: int = 1920, height: int = 1080, taskbar: int = 40, **kwargs) -> "SimulatedDesktop":
+        monitors = [
+            MonitorInfo(i + 1, Rect(i * width, 0, (i + 1) * width, height), Rect(i * width, 0, (i + 1) * width, height - taskbar), DEFAULT_DPI)
+            for i in range(count)
+        ]
+        return cls(monitors, **kwargs)
+
+    # Scripting (what the user and applications do).
+
+    def open_window(self, title: str, rect: Rect | None = None, **fields) -> int:
+        """ Create visible window and focus it. Returns it's handle. """
+
+        with self.__lock:
+            self.__next_hwnd += 4
+            hwnd = self.__next_hwnd
+
+            if rect is None:
+                work_area = self.monitor_list[0].work_area
+                rect = Rect.from_xywh(work_area.left + 100, work_area.top + 100, 800, 600)
+
+            window = SimulatedWindow(hwnd, title, rect, **fields)
+            window.rect = self.__constrain(window, rect)
+            self.windows[hwnd] = window
+            self.z_order.insert(0, hwnd)
+            self.foreground = hwnd
+
+        self.__emit(EventKind.SHOW, hwnd)
+        return hwnd
+
+    def close_window(self, hwnd: int) -> None:
+        with self.__lock:
+            self.windows.pop(hwnd, None)
+            if hwnd in self.z_order:
+                self.z_order.remove(hwnd)
+
+            if self.foreground == hwnd:
+                self.foreground = self.z_order[0] if self.z_order else 0
+
+        self.__emit(EventKind.DESTROY, hwnd)
+
+    def set_title(self, hwnd: int, title: str) -> None:
+        with self.__lock:
+            self.windows[hwnd].title = title
+
+        self.__emit(EventKind.NAME, hwnd)
+
+    def user_move(self, hwnd: int, rect: Rect) -> None:
+        """ Window dragged or resized by the user. """
+
+        with self.__lock:
+            window = self.windows[hwnd]
+            window.rect = self.__constrain(window, rect)
+
+        self.__emit(EventKind.LOCATION, hwnd)
+
+    def set_monitors(self, monitors: list[MonitorInfo]) -> None:
+        """ Plug, unplug or rearrange monitors. """
+
+        with self.__lock:
+            self.monitor_list = list(monitors)
+
+        for callback in self.__display_callbacks:
+            callback()
+
+    def pump(self) -> None:
+        """ Deliver pending window events to the tracker. """
+
+        self.events.flush()
+
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    # Windows.
+
+    def visible_hwnds(self) -> list[int]:
+        self.calls["visible_hwnds"] += 1
+
+        with self.__lock:
+            stacked = [self.windows[hwnd] for hwnd in self.z_order]
+            return [window.hwnd for window in stacked if window.visible and not window.minimized and not window.cloaked]
+
+    def window_rect(self, hwnd: int) -> Rect | None:
+        self.calls["window_rect"] += 1
+        window = self.windows.get(hwnd)
+        return None if window is None else window.rect
+
+    def frame_bounds(self, hwnd: int) -> Rect:
+        self.calls["frame_bounds"] += 1
+        window = self.windows.get(hwnd)
+        return Rect(0, 0, 0, 0) if window is None else window.frame
+
+    def window_text(self, hwnd: int) -> str:
+        self.calls["window_text"] += 1
+        window = self.windows.get(hwnd)
+        return "" if window is None else window.title
+
+    def placement(self, hwnd: int) -> tuple:
+        self.calls["placement"] += 1
+        window = self.windows.get(hwnd)
+        if window is None:
+            return (0, SW_HIDE, (-1, -1), (-1, -1), (0, 0, 0, 0))
+
+        if window.minimized:
+            show = SW_SHOWMINIMIZED
+        elif window.maximized:
+            show = SW_MAXIMIZE
+        else:
+            show = SW_NORMAL
+
+        return (0, show, (-1, -1), (-1, -1), (window.normal_rect or window.rect).raw)
+
+    def is_iconic(self, hwnd: int) -> bool:
+        self.calls["is_iconic"] += 1
+        window = self.windows.get(hwnd)
+        return window is not None and window.minimized
+
+    def is_window_visible(self, hwnd: int) -> bool:
+        self.calls["is_window_visible"] += 1
+        window = self.windows.get(hwnd)
+        return window is not None and window.visible
+
+    def is_maximized(self, hwnd: int) -> bool:
+        self.calls["is_maximized"] += 1
+        window = self.windows.get(hwnd)
+        return window is not None and window.maximized
+
+    def owner(self, hwnd: int) -> int:
+        self.calls["owner"] += 1
+        window = self.windows.get(hwnd)
+        return 0 if window is None else window.owner
+
+    def foreground_window(self) -> int:
+        self.calls["foreground_window"] += 1
+        return self.foreground
+
+    # Actions.
+
+    def show_window(self, hwnd: int, command: int) -> None:
+        self.calls["show_window"] += 1
+        events = []
+
+        with self.__lock:
+            window = self.windows.get(hwnd)
+            if window is None:
+                return
+
+            if command in (SW_MINIMIZE, SW_SHOWMINIMIZED) and not window.minimized:
+                window.minimized = True
+                events.append(EventKind.MINIMIZE)
+
+            elif command == SW_MAXIMIZE:
+                if window.minimized:
+                    window.minimized = False
+                    events.append(EventKind.RESTORE)
+
+                if not window.maximized:
+                    window.normal_rect = window.rect
+                    window.maximized = True
+                    window.rect = self.__maximized_rect(window)
+                    events.append(EventKind.LOCATION)
+
+            elif command == SW_NORMAL:
+                if window.minimized:
+                    window.minimized = False
+                    events.append(EventKind.RESTORE)
+
+                if window.maximized:
+                    window.maximized = False
+                    window.rect = window.normal_rect or window.rect
+                    events.append(EventKind.LOCATION)
+
+                if not window.visible:
+                    window.visible = True
+                    events.append(EventKind.SHOW)
+
+            elif command == SW_HIDE and window.visible:
+                window.visible = False
+                events.append(EventKind.HIDE)
+
+        for kind in events:
+            self.__emit(kind, hwnd)
+
+    def focus(self, hwnd: int) -> None:
+        self.calls["focus"] += 1
+
+        with self.__lock:
+            if hwnd in self.windows:
+                self.z_order.remove(hwnd)
+                self.z_order.insert(0, hwnd)
+                self.foreground = hwnd
+
+    def move_window(self, hwnd: int, rect: Rect, repaint: bool = True) -> bool:
+        self.calls["move_window"] += 1
+        return self.__move(hwnd, rect)
+
+    def begin_defer(self, count: int) -> int | None:
+        self.calls["begin_defer"] += 1
+
+        with self.__lock:
+            self.__next_handle += 1
+            self.__deferred[self.__next_handle] = {}
+            return self.__next_handle
+
+    def defer_move(self, handle: int, hwnd: int, rect: Rect) -> int | None:
+        self.calls["defer_move"] += 1
+
+        with self.__lock:
+            moves = self.__deferred.pop(handle, None)
+            if moves is None or hwnd not in self.windows:
+                return None
+
+            moves[hwnd] = rect
+            self.__next_handle += 1
+            self.__deferred[self.__next_handle] = moves
+            return self.__next_handle
+
+    def end_defer(self, handle: int) -> bool:
+        self.calls["end_defer"] += 1
+
+        with self.__lock:
+            moves = self.__deferred.pop(handle, None)
+
+        if moves is None:
+            return False
+
+        for hwnd, rect in moves.items():
+            self.__move(hwnd, rect)
+
+        return True
+
+    # Probing.
+
+    def class_name(self, hwnd: int) -> str:
+        self.calls["class_name"] += 1
+        window = self.windows.get(hwnd)
+        return "" if window is None else window.class_name
+
+    def process_executable(self, hwnd: int) -> str:
+        self.calls["process_executable"] += 1
+        window = self.windows.get(hwnd)
+        return "" if window is None else window.executable
+
+    def dpi(self, hwnd: int) -> int:
+        self.calls["dpi"] += 1
+        window = self.windows.get(hwnd)
+        monitor = None if window is None else self.__monitor_of(window.rect)
+        return DEFAULT_DPI if monitor is None else monitor.dpi
+
+    def min_track_size(self, hwnd: int, timeout_ms: int) -> tuple[int, int] | None:
+        self.calls["min_track_size"] += 1
+        window = self.windows.get(hwnd)
+        if window is None or window.hung:
+            return None
+
+        return window.min_w, window.min_h
+
+    # Opacity.
+
+    def get_ex_style(self, hwnd: int) -> int:
+        self.calls["get_ex_style"] += 1
+        window = self.windows.get(hwnd)
+        return 0 if window is None else window.ex_style
+
+    def set_ex_style(self, hwnd: int, style: int) -> None:
+        self.calls["set_ex_style"] += 1
+        window = self.windows.get(hwnd)
+        if window is not None:
+            window.ex_style = style
+
+    def get_alpha(self, hwnd: int) -> int | None:
+        self.calls["get_alpha"] += 1
+        window = self.windows.get(hwnd)
+        return None if window is None else window.alpha
+
+    def set_alpha(self, hwnd: int, alpha: int) -> None:
+        self.calls["set_alpha"] += 1
+        window = self.windows.get(hwnd)
+        if window is not None and window.ex_style & WS_EX_LAYERED:
+            window.alpha = alpha
+
+    # DWM.
+
+    def set_system_backdrop(self, hwnd: int, kind: int) -> bool:
+        self.calls["set_system_backdrop"] += 1
+        window = self.windows.get(hwnd)
+        if window is None or not self.supports_backdrop:
+            return False
+
+        window.backdrop = kind
+        return True
+
+    def set_accent(self, hwnd: int, state: int) -> bool:
+        self.calls["set_accent"] += 1
+        window = self.windows.get(hwnd)
+        if window is None or not self.supports_accent:
+            return False
+
+        window.accent = state
+        return True
+
+    # Monitors.
+
+    def monitors(self) -> list[MonitorInfo]:
+        self.calls["monitors"] += 1
+        return list(self.monitor_list)
+
+    def monitor_from_rect(self, rect: Rect) -> int | None:
+        self.calls["monitor_from_rect"] += 1
+        monitor = self.__monitor_of(rect)
+        return None if monitor is None else monitor.handle
+
+    # Events.
+
+    def event_source(self) -> EventSource:
+        return self.events
+
+    def watch_displays(self, on_change: Callable[[], None], delay: float) -> None:
+        self.__display_callbacks.append(on_change)
+
+    def __move(self, hwnd: int, rect: Rect) -> bool:
+        with self.__lock:
+            window = self.windows.get(hwnd)
+            if window is None or window.hung:
+                return False
+
+            rect = self.__constrain(window, rect)
+            if rect == window.rect and not window.maximized:
+                return True
+
+            window.rect = rect
+            window.maximized = False
+
+        self.__emit(EventKind.LOCATION, hwnd)
+        return True
+
+    def __emit(self, kind: int, hwnd: int) -> None:
+        self.events.push(kind, hwnd)
+
+        if self.auto_pump:
+            self.pump()
+
+    @staticmethod
+    def __constrain(window: SimulatedWindow, rect: Rect) -> Rect:
+        return Rect.from_xywh(rect.left, rect.top, max(rect.w, window.min_w), max(rect.h, window.min_h))
+
+    def __maximized_rect(self, window: SimulatedWindow) -> Rect:
+        monitor = self.__monitor_of(window.rect) or self.monitor_list[0]
+        left, top, right, bottom = window.frame_offset
+        work_area = monitor.work_area
+        return Rect(work_area.left - left, work_area.top - top, work_area.right + right, work_area.bottom + bottom)
+
+    def __monitor_of(self, rect: Rect) -> MonitorInfo | None:
+        best, best_area = None, 0
+
+        for monitor in self.monitor_list:
+            width = min(rect.right, monitor.rect.right) - max(rect.left, monitor.rect.left)
+            height = min(rect.bottom, monitor.rect.bottom) - max(rect.top, monitor.rect.top)
+
+            if width > 0 and height > 0 and width * height > best_area:
+                best, best_area = monitor, width * height
+
+        return best
@@ -0,0 +1,115 @@
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import threading
+import time
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """ Result of a single visible windows enumeration pass. """
+
+    generation: int
+    hwnds: tuple[int, ...]
+    taken_at: float
+    _members: frozenset[int] = field(default=frozenset(), repr=False, compare=False)
+
+    def __contains__(self, hwnd: int) -> bool:
+        return hwnd in self._members
+
+    def __iter__(self):
+        return iter(self.hwnds)
+
+    def __len__(self) -> int:
+        return len(self.hwnds)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.taken_at
+
+
+class DesktopSnapshots:
+    """
+    Owns visible windows enumeration. Every scan produces a new Snapshot tagged with increasing generation.
+    Consumers reuse the latest snapshot as long as it is younger than the freshness window.
+    Concurrent requests for a new scan wait for the one in progress instead of starting another.
+    """
+
+    def __init__(self, enumerate_hwnds: Callable[[], list[int]], freshness: float) -> None:
+        self.freshness = freshness
+        self.__enumerate_hwnds = enumerate_hwnds
+        self.__lock = threading.Lock()
+        self.__latest: Snapshot | None = None
+
+        self.scans = 0
+        self.reuses = 0
+
+    def latest(self, max_age: float | None = None) -> Snapshot:
+        """ Returns the latest snapshot if it's not older than max_age (defaults to freshness window), otherwise scans. """
+
+        if max_age is None:
+            max_age = self.freshness
+
+        snapshot = self.__latest
+        if snapshot is not None and snapshot.age <= max_age:
+            self.reuses += 1
+            return snapshot
+
+        requested_at = time.monotonic()
+
+        with self.__lock:
+            # Other thread might have finished a scan while this one was waiting.
+            snapshot = self.__latest
+            if snapshot is not None and snapshot.taken_at >= requested_at:
+                self.reuses += 1
+                return snapshot
+
+            return self.__scan()
+
+    def refresh(self) -> Snapshot:
+        """ Always perform a new scan. """
+
+        with self.__lock:
+            return self.__scan()
+
+    def invalidate(self) -> None:
+        """ Force the next consumer to perform a new scan. """
+
+        self.__latest = None
+
+    def __scan(self) -> Snapshot:
+        hwnds = tuple(self.__enumerate_hwnds())
+
+        self.scans += 1
+        self.__latest = Snapshot(self.scans, hwnds, time.monotonic(), frozenset(hwnds))
+
+        return self.__latest
+
+
+@dataclass(frozen=True)
+class SnapshotDelta:
+    """ Difference between two snapshots: newly visible windows, hidden windows and Z-order change of the rest. """
+
+    added: tuple[int, ...]
+    removed: tuple[int, ...]
+    reordered: bool
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.reordered)
+
+
+def diff(previous: Snapshot | None, current: Snapshot) -> SnapshotDelta:
+    """ Compare snapshots in linear time using their membership sets. """
+
+    if previous is None:
+        return SnapshotDelta(current.hwnds, (), False)
+
+    if previous.generation == current.generation:
+        return SnapshotDelta((), (), False)
+
+    added = tuple(hwnd for hwnd in current.hwnds if hwnd not in previous)
+    removed = tuple(hwnd for hwnd in previous.hwnds if hwnd not in current)
+
+    kept_before = [hwnd for hwnd in previous.hwnds if hwnd in current] if removed else list(previous.hwnds)
+    kept_now = [hwnd for hwnd in current.hwnds if hwnd in previous] if added else list(current.hwnds)
+
+    return SnapshotDelta(added, removed, kept_before != kept_now)
@@ -0,0 +1,129 @@
+from modules.position import Rect, Direction
+
+from collections.abc import Hashable
+from bisect import bisect_left, insort
+import threading
+
+# Edge searched in each direction: (edge index in Rect, nearest is the greater edge value).
+_EDGES = {
+    Direction.LEFT: (0, True),
+    Direction.RIGHT: (2, False),
+    Direction.UP: (1, True),
+    Direction.DOWN: (3, False),
+}
+
+
+def _overlaps_horizontally(rect: Rect, other: Rect) -> bool:
+    return rect.left < other.right and other.left < rect.right
+
+
+class EdgeIndex:
+    """
+    Windows kept sorted by each of their edges. Nearest window in a direction is the one with the closest
+    edge of the same side beyond the reference rect (eg. greatest left edge smaller than reference's left edge),
+    found by a binary search. Updates cost one removal and one insertion per edge.
+    Windows above or below also have to overlap the reference horizontally: the search walks outwards from
+    the bisected position skipping windows that don't, so with many windows stacked beside the reference
+    a vertical lookup degrades to a linear scan (a handful of windows per screen in practice).
+    """
+
+    def __init__(self) -> None:
+        self.__rects: dict[int, Rect] = {}
+        self.__edges: dict[int, list[tuple[int, int]]] = {edge: [] for edge, _ in _EDGES.values()}
+
+    def __len__(self) -> int:
+        return len(self.__rects)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self.__rects
+
+    def update(self, key: int, rect: Rect) -> None:
+        previous = self.__rects.get(key)
+        if previous == rect:
+            return
+
+        if previous is not None:
+            self.remove(key)
+
+        self.__rects[key] = rect
+        for edge, entries in self.__edges.items():
+            insort(entries, (rect[edge], key))
+
+    def remove(self, key: int) -> None:
+        rect = self.__rects.pop(key, None)
+        if rect is None:
+            return
+
+        for edge, entries in self.__edges.items():
+            del entries[bisect_left(entries, (rect[edge], key))]
+
+    def nearest(self, direction: int, rect: Rect) -> int | None:
+        """ Closest window beyond rect's edge in the direction. Windows above or below have to overlap rect horizontally. """
+
+        edge, before = _EDGES[direction]
+        entries = self.__edges[edge]
+
+        if before:
+            positions = range(bisect_left(entries, (rect[edge],)) - 1, -1, -1)
+        else:
+            positions = range(bisect_left(entries, (rect[edge] + 1,)), len(entries))
+
+        vertical = direction in (Direction.UP, Direction.DOWN)
+
+        for position in positions:
+            key = entries[position][1]
+            if not vertical or _overlaps_horizontally(self.__rects[key], rect):
+                return key
+
+        return None
+
+    def farthest(self, direction: int) -> int | None:
+        """ Last window in the direction (eg. the window with greatest left edge for LEFT). """
+
+        edge, before = _EDGES[direction]
+        entries = self.__edges[edge]
+
+        if not entries:
+            return None
+
+        return entries[-1 if before else 0][1]
+
+
+class SpatialIndex:
+    """ Edge indexes of every screen and of the whole virtual desktop. """
+
+    def __init__(self) -> None:
+        self.desktop = EdgeIndex()
+        self.__screens: dict[Hashable, EdgeIndex] = {}
+        self.__screen_of: dict[int, Hashable] = {}
+        self.__lock = threading.Lock()
+
+    def update(self, key: int, rect: Rect, screen: Hashable) -> None:
+        with self.__lock:
+            previous = self.__screen_of.get(key)
+            if previous is not None and previous != screen:
+                self.__screens[previous].remove(key)
+
+            self.__screen_of[key] = screen
+            self.__screens.setdefault(screen, EdgeIndex()).update(key, rect)
+            self.desktop.update(key, rect)
+
+    def remove(self, key: int) -> None:
+        with self.__lock:
+            screen = self.__screen_of.pop(key, None)
+            if screen is not None:
+                self.__screens[screen].remove(key)
+
+            self.desktop.remove(key)
+
+    def nearest(self, direction: int, rect: Rect, screen: Hashable | None = None) -> int | None:
+        """ Nearest window in direction on the screen, or on the whole desktop if no screen is given. """
+
+        with self.__lock:
+            index = self.desktop if screen is None else self.__screens.get(screen)
+            return None if index is None else index.nearest(direction, rect)
+
+    def farthest(self, direction: int, screen: Hashable | None = None) -> int | None:
+        with self.__lock:
+            index = self.desktop if screen is None else self.__screens.get(screen)
+            return None if index is None else index.farthest(direction)
@@ -1,7 +1,7 @@
-from ctypes import windll
-import win32gui
-import win32con
-import ctypes
+from contextlib import contextmanager
+from collections.abc import Generator
+import atexit
+import time
 import sys
 import os
 
@@ -24,6 +24,64 @@ def add_to_startup() -> str:
     print("Added wingman to autostart.")
 
 
+def clear_probe_cache() -> None:
+    """ Remove all cached probing results, windows will be probed again. """
+
+    from modules import screen_test
+
+    screen_test.probe_cache.invalidate()
+    print("Cleared probe cache.")
+
+
+class StartupProfile:
+    """ Time spent in startup phases, counted from the start of the process. Reported with --startup-profile flag. """
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.started_at = time.perf_counter()
+        self.phases: list[tuple[str, float, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Generator[None, None, None]:
+        """ Measure the block as a phase. """
+
+        started_at = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self.phases.append((name, started_at - self.started_at, time.perf_counter() - started_at))
+
+    def report(self) -> None:
+        """ Print the phases (if enabled). """
+
+        if not self.enabled:
+            return
+
+        print(f"{'phase':<20} {'at ms':>9} {'took ms':>9}")
+        for name, at, took in self.phases:
+            print(f"{name:<20} {at * 1000:>9.1f} {took * 1000:>9.1f}")
+
+
+profile = StartupProfile("--startup-profile" in sys.argv)
+
+
+def start_profiler() -> None:
+    """ Sample all threads from the start, profile is written on exit (or when stopped by the hotkey). """
+
+    from modules import profiler
+
+    profiler.sampler.start()
+    atexit.register(profiler.sampler.stop)
+
+
 def execute_flags() -> None:
     if "--startup" in sys.argv:
         add_to_startup()
+
+    if "--clear-probe-cache" in sys.argv:
+        clear_probe_cache()
+
+    if "--profile" in sys.argv:
+        start_profiler()
@@ -0,0 +1,185 @@
+from modules.tracker import EventSource
+from modules.position import Rect
+from modules import tracing
+
+from collections.abc import Callable
+from typing import NamedTuple
+import sys
+import os
+
+# ShowWindow commands and GetWindowPlacement show states.
+SW_HIDE = 0
+SW_NORMAL = 1
+SW_SHOWMINIMIZED = 2
+SW_MAXIMIZE = 3
+SW_MINIMIZE = 6
+
+
+class MonitorInfo(NamedTuple):
+    handle: int
+    rect: Rect
+    work_area: Rect
+    dpi: int
+
+
+class SystemBackend:
+    """
+    Every call made to the operating system. Method names match NativeApi, so the backend can be
+    passed wherever narrower backends (moves, opacity, DWM) are expected.
+    """
+
+    # Windows.
+
+    def visible_hwnds(self) -> list[int]:
+        """ Handles of visible, not minimized, not cloaked windows with title bar in z-order. """
+
+        raise NotImplementedError
+
+    def window_rect(self, hwnd: int) -> Rect | None:
+        """ None if the window doesn't exist. """
+
+        raise NotImplementedError
+
+    def frame_bounds(self, hwnd: int) -> Rect:
+        raise NotImplementedError
+
+    def frame_bounds_many(self, hwnds: list[int]) -> dict[int, Rect]:
+        return {hwnd: self.frame_bounds(hwnd) for hwnd in hwnds}
+
+    def window_text(self, hwnd: int) -> str:
+        raise NotImplementedError
+
+    def placement(self, hwnd: int) -> tuple:
+        """ GetWindowPlacement format: (flags, showCmd, minpos, maxpos, normalpos) """
+
+        raise NotImplementedError
+
+    def is_iconic(self, hwnd: int) -> bool:
+        raise NotImplementedError
+
+    def is_window_visible(self, hwnd: int) -> bool:
+        raise NotImplementedError
+
+    def is_maximized(self, hwnd: int) -> bool:
+        raise NotImplementedError
+
+    def owner(self, hwnd: int) -> int:
+        raise NotImplementedError
+
+    def foreground_window(self) -> int:
+        raise NotImplementedError
+
+    # Actions.
+
+    def show_window(self, hwnd: int, command: int) -> None:
+        raise NotImplementedError
+
+    def focus(self, hwnd: int) -> None:
+        raise NotImplementedError
+
+    def move_window(self, hwnd: int, rect: Rect, repaint: bool = True) -> bool:
+        raise NotImplementedError
+
+    def begin_defer(self, count: int) -> int | None:
+        raise NotImplementedError
+
+    def defer_move(self, handle: int, hwnd: int, rect: Rect) -> int | None:
+        raise NotImplementedError
+
+    def end_defer(self, handle: int) -> bool:
+        raise NotImplementedError
+
+    # Probing.
+
+    def class_name(self, hwnd: int) -> str:
+        raise NotImplementedError
+
+    def process_executable(self, hwnd: int) -> str:
+        raise NotImplementedError
+
+    def dpi(self, hwnd: int) -> int:
+        raise NotImplementedError
+
+    def min_track_size(self, hwnd: int, timeout_ms: int) -> tuple[int, int] | None:
+        """ None if the window didn't answer in time. """
+
+        raise NotImplementedError
+
+    # Opacity.
+
+    def get_ex_style(self, hwnd: int) -> int:
+        raise NotImplementedError
+
+    def set_ex_style(self, hwnd: int, style: int) -> None:
+        raise NotImplementedError
+
+    def get_alpha(self, hwnd: int) -> int | None:
+        raise NotImplementedError
+
+    def set_alpha(self, hwnd: int, alpha: int) -> None:
+        raise NotImplementedError
+
+    # DWM.
+
+    def set_system_backdrop(self, hwnd: int, kind: int) -> bool:
+        raise NotImplementedError
+
+    def set_accent(self, hwnd: int, state: int) -> bool:
+        raise NotImplementedError
+
+    # Monitors.
+
+    def monitors(self) -> list[MonitorInfo]:
+        raise NotImplementedError
+
+    def monitor_from_rect(self, rect: Rect) -> int | None:
+        """ Monitor with the largest intersection with rect, None if rect is outside of all monitors. """
+
+        raise NotImplementedError
+
+    # Events.
+
+    def event_source(self) -> EventSource:
+        """ Source of window events for the tracker. """
+
+        raise NotImplementedError
+
+    def watch_displays(self, on_change: Callable[[], None], delay: float) -> None:
+        """ Call on_change after monitors, resolution, work area or DPI changed (bursts reported once). """
+
+        raise NotImplementedError
+
+
+def load() -> SystemBackend:
+    """ Live desktop on Windows. Simulated desktop only if it's requested with WINGMAN_BACKEND=simulated. """
+
+    if os.environ.get("WINGMAN_BACKEND") == "simulated":
+        from modules.simulated import SimulatedDesktop
+        return SimulatedDesktop.default()
+
+    if sys.platform != "win32":
+        raise RuntimeError("Wingman manages Windows desktops only. Set WINGMAN_BACKEND=simulated to use the simulated desktop.")
+
+    from modules.win32_backend import Win32Backend
+    from modules import native
+    return Win32Backend(native.load())
+
+
+backend: SystemBackend | None = None
+
+
+def install(new_backend: SystemBackend) -> SystemBackend:
+    """ Select the backend before importing modules that use it (eg. simulated desktop in benchmarks). """
+
+    global backend
+    backend = new_backend
+    return backend
+
+
+def get() -> SystemBackend:
+    """ Active backend, loaded on the first use if none was installed. Calls are traced if tracing is enabled. """
+
+    if backend is None:
+        install(tracing.traced_backend(load()))
+
+    return backend
@@ -0,0 +1,42 @@
+from modules.position import Rect, Direction
+
+from collections.abc import Hashable
+
+
+def _overlap(a_start: int, a_end: int, b_start: int, b_end: int) -> int:
+    return min(a_end, b_end) - max(a_start, b_start)
+
+
+def adjacency(rects: dict[Hashable, Rect], tolerance: int) -> dict[Hashable, dict[int, Hashable]]:
+    """
+    Find neighbours of every monitor in all four directions. Monitors are neighbours when their facing edges
+    are at most `tolerance` pixels apart and they share part of the edge (offset monitors included).
+    If several monitors touch the same side, the one sharing the longest part of the edge wins.
+    """
+
+    graph: dict[Hashable, dict[int, Hashable]] = {key: {} for key in rects}
+    best: dict[tuple[Hashable, int], int] = {}
+
+    def link(key: Hashable, direction: int, other: Hashable, shared: int) -> None:
+        if shared > best.get((key, direction), 0):
+            best[key, direction] = shared
+            graph[key][direction] = other
+
+    for key, rect in rects.items():
+        for other, other_rect in rects.items():
+            if other == key:
+                continue
+
+            # Other monitor on the right.
+            if abs(other_rect.left - rect.right) <= tolerance:
+                shared = _overlap(rect.top, rect.bottom, other_rect.top, other_rect.bottom)
+                link(key, Direction.RIGHT, other, shared)
+                link(other, Direction.LEFT, key, shared)
+
+            # Other monitor below.
+            if abs(other_rect.top - rect.bottom) <= tolerance:
+                shared = _overlap(rect.left, rect.right, other_rect.left, other_rect.right)
+                link(key, Direction.DOWN, other, shared)
+                link(other, Direction.UP, key, shared)
+
+    return graph
@@ -0,0 +1,311 @@
+from modules import settings
+from modules import logs
+
+from collections.abc import Callable
+from collections import deque
+from typing import Any
+import socketserver
+import threading
+import functools
+import bisect
+import atexit
+import json
+import time
+import sys
+import os
+
+# Upper bounds (ms) of histogram buckets, the last bucket is unbounded.
+BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class Histogram:
+    """ Latency distribution in fixed buckets. Percentiles are upper bounds of their buckets (capped by the worst sample). """
+
+    __slots__ = ("buckets", "count", "total", "worst")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.worst = max(self.worst, ms)
+
+    def percentile(self, fraction: float) -> float:
+        rank = fraction * self.count
+        seen = 0
+
+        for i, amount in enumerate(self.buckets):
+            seen += amount
+            if seen >= rank and amount:
+                return min(BUCKETS_MS[i], self.worst) if i < len(BUCKETS_MS) else self.worst
+
+        return 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p99_ms": self.percentile(0.99),
+            "worst_ms": self.worst,
+        }
+
+
+class _NoopSpan:
+    """ Returned while tracing is disabled. """
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "started_at", "parent")
+
+    def __init__(self, tracer: "Tracer", name: str) -> None:
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        stack = self.tracer._stack()
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        ms = (time.perf_counter() - self.started_at) * 1000
+        self.tracer._stack().pop()
+        self.tracer._finish(self, ms)
+
+
+class Tracer:
+    """
+    Spans (nested, per thread) and metrics: counters and latency histograms (one per span name).
+    While disabled, spans are a shared no-op object and counters return immediately.
+    """
+
+    def __init__(self, enabled: bool, recent_spans: int) -> None:
+        self.enabled = enabled
+        self.counters: dict[str, int] = {}
+        self.histograms: dict[str, Histogram] = {}
+        self.recent: deque[dict[str, Any]] = deque(maxlen=recent_spans)
+        self.started_at = time.time()
+
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+
+    def _stack(self) -> list[_Span]:
+        stack = getattr(self.__local, "stack", None)
+        if stack is None:
+            stack = self.__local.stack = []
+
+        return stack
+
+    def _finish(self, span: _Span, ms: float) -> None:
+        with self.__lock:
+            histogram = self.histograms.get(span.name)
+            if histogram is None:
+                histogram = self.histograms[span.name] = Histogram()
+
+            histogram.observe(ms)
+            self.recent.append({
+                "name": span.name,
+                "parent": span.parent,
+                "thread": threading.current_thread().name,
+                "at": time.time(),
+                "ms": round(ms, 4),
+            })
+
+    def span(self, name: str) -> _Span | _NoopSpan:
+        if not self.enabled:
+            return _NOOP_SPAN
+
+        return _Span(self, name)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        if not self.enabled:
+            return
+
+        with self.__lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self, spans: bool = True) -> dict[str, Any]:
+        """ JSON serializable state of all metrics (and recently finished spans). """
+
+        with self.__lock:
+            state = {
+                "at": time.time(),
+                "uptime": time.time() - self.started_at,
+                "counters": dict(self.counters),
+                "histograms": {name: histogram.as_dict() for name, histogram in self.histograms.items()},
+            }
+
+            if spans:
+                state["spans"] = list(self.recent)
+                self.recent.clear()
+
+        return state
+
+    def summary(self) -> str:
+        """ Human readable table of metrics. """
+
+        state = self.snapshot(spans=False)
+        lines = [f"{'span':<32} {'count':>7} {'mean ms':>9} {'p50 ms':>8} {'p99 ms':>8} {'worst ms':>9}"]
+
+        for name, histogram in sorted(state["histograms"].items(), key=lambda item: -item[1]["count"] * item[1]["mean_ms"]):
+            lines.append(
+                f"{name:<32} {histogram['count']:>7} {histogram['mean_ms']:>9.3f} "
+                f"{histogram['p50_ms']:>8.2f} {histogram['p99_ms']:>8.2f} {histogram['worst_ms']:>9.2f}"
+            )
+
+        lines.extend(f"{name:<32} {value:>7}" for name, value in sorted(state["counters"].items()))
+        return "\n".join(lines)
+
+
+class JsonExporter:
+    """ Appends a metrics snapshot as a JSON line every interval. The file is rolled over to `path.1` once it gets too big. """
+
+    def __init__(self, tracer: Tracer, path: str, interval: float, max_bytes: int) -> None:
+        self.tracer = tracer
+        self.path = path
+        self.interval = interval
+        self.max_bytes = max_bytes
+
+        threading.Thread(target=self.__run, daemon=True, name="wingman-trace-export").start()
+
+    def export(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            os.replace(self.path, self.path + ".1")
+
+        with open(self.path, "a") as file:
+            file.write(json.dumps(self.tracer.snapshot()) + "\n")
+
+    def __run(self) -> None:
+        while 1:
+            time.sleep(self.interval)
+
+            try:
+                self.export()
+            except OSError:
+                pass
+
+
+class _MetricsServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class SocketExporter:
+    """ Local TCP endpoint: every connection receives the current metrics snapshot as JSON. """
+
+    def __init__(self, tracer: Tracer, port: int) -> None:
+        exporter_tracer = tracer
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self) -> None:
+                self.request.sendall(json.dumps(exporter_tracer.snapshot(spans=False)).encode())
+
+        self.server = _MetricsServer(("127.0.0.1", port), Handler)
+
+        threading.Thread(target=self.server.serve_forever, daemon=True, name="wingman-trace-socket").start()
+
+
+class TracedBackend:
+    """ Proxy of the system backend: every call is a span `os.<method>` and counted as an OS call. """
+
+    def __init__(self, backend: Any) -> None:
+        self.__backend = backend
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.__backend, name)
+        if not callable(attribute) or name.startswith("_"):
+            return attribute
+
+        span_name = f"os.{name}"
+
+        @functools.wraps(attribute)
+        def call(*args, **kwargs):
+            tracer.count("os_calls")
+            with tracer.span(span_name):
+                return attribute(*args, **kwargs)
+
+        # Later lookups skip __getattr__.
+        setattr(self, name, call)
+        return call
+
+
+tracer = Tracer("--trace" in sys.argv, settings.TRACE_RECENT_SPANS)
+
+
+def span(name: str) -> _Span | _NoopSpan:
+    """ Context manager measuring the block. """
+
+    return tracer.span(name)
+
+
+def count(name: str, amount: int = 1) -> None:
+    tracer.count(name, amount)
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """ Measure every call of the decorated function. Functions decorated while tracing is disabled are left untouched. """
+
+    def decorate(func: Callable) -> Callable:
+        if not tracer.enabled:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def traced_backend(backend: Any) -> Any:
+    """ Backend with traced calls if tracing is enabled, the backend itself otherwise. """
+
+    return TracedBackend(backend) if tracer.enabled else backend
+
+
+def start() -> None:
+    """ Start configured exporters and print summary on exit. Does nothing if tracing is disabled. """
+
+    if not tracer.enabled:
+        return
+
+    exporter = JsonExporter(tracer, settings.TRACE_EXPORT_PATH, settings.TRACE_EXPORT_INTERVAL, settings.TRACE_EXPORT_MAX_BYTES)
+
+    if settings.TRACE_SOCKET_PORT:
+        try:
+            SocketExporter(tracer, settings.TRACE_SOCKET_PORT)
+        except OSError as error:
+            logs.system_log("Cannot serve metrics on port {}: {}", settings.TRACE_SOCKET_PORT, error, level=logs.WARNING)
+
+    atexit.register(_on_exit, exporter)
+
+
+def _on_exit(exporter: JsonExporter) -> None:
+    try:
+        exporter.export()
+    except OSError:
+        pass
+
+    print(tracer.summary())
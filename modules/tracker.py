@@ -0,0 +1,338 @@
+from modules.position import Rect
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from ctypes import wintypes
+import traceback
+import threading
+import ctypes
+
+
+class EventKind:
+    LOCATION = 0
+    DESTROY = 1
+    SHOW = 2
+    HIDE = 3
+    MINIMIZE = 4
+    RESTORE = 5
+    NAME = 6
+
+
+@dataclass
+class WindowEvent:
+    kind: int
+    hwnd: int
+    rect: Rect | None = None
+
+
+class EventSource:
+    """ Base interface for window events producers. Events are delivered to the tracker in batches. """
+
+    def start(self, emit: Callable[[list[WindowEvent]], None]) -> None:
+        raise NotImplementedError
+
+    def stop(self) -> None:
+        raise NotImplementedError
+
+
+class ScriptedEventSource(EventSource):
+    """ In-memory events source. Events are pushed manually and delivered on flush (no threads, no system calls). """
+
+    def __init__(self) -> None:
+        self.pending: list[WindowEvent] = []
+        self.__emit: Callable[[list[WindowEvent]], None] | None = None
+
+    def start(self, emit: Callable[[list[WindowEvent]], None]) -> None:
+        self.__emit = emit
+
+    def stop(self) -> None:
+        self.__emit = None
+
+    def push(self, kind: int, hwnd: int, rect: Rect | None = None) -> None:
+        """ Queue event to be delivered with the next flush. """
+
+        self.pending.append(WindowEvent(kind, hwnd, rect))
+
+    def flush(self) -> None:
+        """ Deliver all pending events as a single batch. """
+
+        if not self.pending or self.__emit is None:
+            return
+
+        batch, self.pending = self.pending, []
+        self.__emit(batch)
+
+    def play(self, batches: Iterable[list[WindowEvent]]) -> None:
+        """ Deliver prepared batches one after another. """
+
+        for batch in batches:
+            if self.__emit is not None:
+                self.__emit(batch)
+
+
+class WinEventHookSource(EventSource):
+    """
+    Receive window events from the system using SetWinEventHook subscription.
+    Hook thread only collects events, the dispatch thread waits for a short moment
+    after the first event so bursts (dragging, animations) are delivered as one batch.
+    """
+
+    EVENT_SYSTEM_MINIMIZESTART = 0x0016
+    EVENT_SYSTEM_MINIMIZEEND = 0x0017
+    EVENT_OBJECT_DESTROY = 0x8001
+    EVENT_OBJECT_SHOW = 0x8002
+    EVENT_OBJECT_HIDE = 0x8003
+    EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    OBJID_WINDOW = 0
+    CHILDID_SELF = 0
+    WM_QUIT = 0x0012
+
+    def __init__(self) -> None:
+        self.COALESCE_DELAY = 0.01
+        self.KINDS = {
+            self.EVENT_SYSTEM_MINIMIZESTART: EventKind.MINIMIZE,
+            self.EVENT_SYSTEM_MINIMIZEEND: EventKind.RESTORE,
+            self.EVENT_OBJECT_DESTROY: EventKind.DESTROY,
+            self.EVENT_OBJECT_SHOW: EventKind.SHOW,
+            self.EVENT_OBJECT_HIDE: EventKind.HIDE,
+            self.EVENT_OBJECT_LOCATIONCHANGE: EventKind.LOCATION,
+            self.EVENT_OBJECT_NAMECHANGE: EventKind.NAME,
+        }
+
+        self.__emit: Callable[[list[WindowEvent]], None] | None = None
+        self.__pending: list[WindowEvent] = []
+        self.__lock = threading.Lock()
+        self.__wake = threading.Event()
+        self.__running = False
+        self.__hook_thread_id: int | None = None
+        self.__callback = None
+
+    def start(self, emit: Callable[[list[WindowEvent]], None]) -> None:
+        self.__emit = emit
+        self.__running = True
+
+        threading.Thread(target=self.__hook_loop, daemon=True, name="wingman-winevents").start()
+        threading.Thread(target=self.__dispatch_loop, daemon=True, name="wingman-tracker").start()
+
+    def stop(self) -> None:
+        self.__running = False
+        self.__wake.set()
+
+        if self.__hook_thread_id is not None:
+            ctypes.windll.user32.PostThreadMessageW(self.__hook_thread_id, self.WM_QUIT, 0, 0)
+
+    def __on_event(self, _hook, event: int, hwnd: int, id_object: int, id_child: int, _thread, _time) -> None:
+        """ Raw hook callback. Keep it short - it runs inside the hook thread's message loop. """
+
+        if not hwnd or id_object != self.OBJID_WINDOW or id_child != self.CHILDID_SELF:
+            return
+
+        kind = self.KINDS.get(event)
+        if kind is None:
+            return
+
+        with self.__lock:
+            self.__pending.append(WindowEvent(kind, hwnd))
+
+        self.__wake.set()
+
+    def __hook_loop(self) -> None:
+        """ Install hooks and pump messages so the system can deliver events to this thread. """
+
+        user32 = ctypes.windll.user32
+        kernel32 = ctypes.windll.kernel32
+
+        WinEventProc = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND, wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+        )
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        user32.SetWinEventHook.argtypes = [
+            wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, WinEventProc, wintypes.DWORD, wintypes.DWORD, wintypes.DWORD
+        ]
+
+        # Keep the reference, otherwise the callback would be garbage collected.
+        self.__callback = WinEventProc(self.__on_event)
+        flags = self.WINEVENT_OUTOFCONTEXT | self.WINEVENT_SKIPOWNPROCESS
+
+        hooks = [
+            user32.SetWinEventHook(self.EVENT_SYSTEM_MINIMIZESTART, self.EVENT_SYSTEM_MINIMIZEEND, 0, self.__callback, 0, 0, flags),
+            user32.SetWinEventHook(self.EVENT_OBJECT_DESTROY, self.EVENT_OBJECT_NAMECHANGE, 0, self.__callback, 0, 0, flags),
+        ]
+
+        self.__hook_thread_id = kernel32.GetCurrentThreadId()
+        msg = wintypes.MSG()
+
+        while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+
+        for hook in hooks:
+            user32.UnhookWinEvent(hook)
+
+    def __dispatch_loop(self) -> None:
+        """ Wait for events and deliver them in batches. """
+
+        while self.__running:
+            self.__wake.wait()
+            self.__wake.clear()
+
+            # Let the burst finish before delivering it.
+            self.__wake.wait(self.COALESCE_DELAY)
+            self.__wake.clear()
+
+            with self.__lock:
+                batch, self.__pending = self.__pending, []
+
+            if batch and self.__emit is not None:
+                try:
+                    self.__emit(batch)
+                except Exception:
+                    traceback.print_exc()
+
+
+class _Subscription:
+    """ Callbacks and last known state of single tracked window. """
+
+    __slots__ = ("rect", "visible", "on_pos_changed", "on_killed", "on_visibility_changed", "on_name_changed")
+
+    def __init__(
+        self,
+        rect: Rect | None,
+        on_pos_changed: Callable[[Rect], None],
+        on_killed: Callable[[], None],
+        on_visibility_changed: Callable[[bool], None] | None,
+        on_name_changed: Callable[[], None] | None
+    ) -> None:
+        self.rect = rect
+        self.visible = True
+        self.on_pos_changed = on_pos_changed
+        self.on_killed = on_killed
+        self.on_visibility_changed = on_visibility_changed
+        self.on_name_changed = on_name_changed
+
+
+class WindowTracker:
+    """
+    Single dispatcher of window events for all registered windows.
+    Each delivered batch is coalesced to one final state per window, callbacks are called
+    in order of the window's first appearance in the batch: position update first, then visibility, then title.
+    Destroy event overrides all other events of the window.
+    """
+
+    def __init__(self, source: EventSource, get_rect: Callable[[int], Rect | None]) -> None:
+        self.source = source
+        self.__get_rect = get_rect
+        self.__subscriptions: dict[int, _Subscription] = {}
+        self.__lock = threading.Lock()
+        self.__started = False
+
+        self.received_events = 0
+        self.dispatched_callbacks = 0
+
+    def start(self) -> None:
+        """ Start receiving events from the source. """
+
+        if not self.__started:
+            self.__started = True
+            self.source.start(self.dispatch)
+
+    def stop(self) -> None:
+        if self.__started:
+            self.__started = False
+            self.source.stop()
+
+    def subscribe(
+        self,
+        hwnd: int,
+        on_pos_changed: Callable[[Rect], None],
+        on_killed: Callable[[], None],
+        on_visibility_changed: Callable[[bool], None] | None = None,
+        on_name_changed: Callable[[], None] | None = None,
+        rect: Rect | None = None
+    ) -> None:
+        """ Register window's callbacks. Previous subscription of the same handle is replaced. """
+
+        with self.__lock:
+            self.__subscriptions[hwnd] = _Subscription(rect, on_pos_changed, on_killed, on_visibility_changed, on_name_changed)
+
+    def unsubscribe(self, hwnd: int) -> None:
+        with self.__lock:
+            self.__subscriptions.pop(hwnd, None)
+
+    def is_tracked(self, hwnd: int) -> bool:
+        return hwnd in self.__subscriptions
+
+    def dispatch(self, events: list[WindowEvent]) -> None:
+        """ Coalesce batch of events and run subscribed callbacks. """
+
+        self.received_events += len(events)
+        subscriptions = self.__subscriptions
+
+        # hwnd -> [killed, moved, explicit rect, visibility, renamed]. Dict keeps order of the first appearance.
+        states: dict[int, list] = {}
+
+        for event in events:
+            if event.hwnd not in subscriptions:
+                continue
+
+            state = states.get(event.hwnd)
+            if state is None:
+                state = states[event.hwnd] = [False, False, None, None, False]
+
+            if event.kind == EventKind.DESTROY:
+                state[0] = True
+
+            elif event.kind == EventKind.LOCATION:
+                state[1] = True
+                if event.rect is not None:
+                    state[2] = event.rect
+
+            elif event.kind in (EventKind.SHOW, EventKind.RESTORE):
+                state[3] = True
+
+            elif event.kind in (EventKind.HIDE, EventKind.MINIMIZE):
+                state[3] = False
+
+            elif event.kind == EventKind.NAME:
+                state[4] = True
+
+        for hwnd, (killed, moved, rect, visible, renamed) in states.items():
+            subscription = subscriptions.get(hwnd)
+            if subscription is None:
+                continue
+
+            if killed:
+                self.__kill(hwnd, subscription)
+                continue
+
+            if moved:
+                if rect is None:
+                    rect = self.__get_rect(hwnd)
+
+                    if rect is None:
+                        self.__kill(hwnd, subscription)
+                        continue
+
+                if rect != subscription.rect:
+                    subscription.rect = rect
+                    self.dispatched_callbacks += 1
+                    subscription.on_pos_changed(rect)
+
+            if visible is not None and visible != subscription.visible:
+                subscription.visible = visible
+
+                if subscription.on_visibility_changed is not None:
+                    self.dispatched_callbacks += 1
+                    subscription.on_visibility_changed(visible)
+
+            if renamed and subscription.on_name_changed is not None:
+                self.dispatched_callbacks += 1
+                subscription.on_name_changed()
+
+    def __kill(self, hwnd: int, subscription: _Subscription) -> None:
+        self.unsubscribe(hwnd)
+        self.dispatched_callbacks += 1
+        subscription.on_killed()
@@ -0,0 +1,179 @@
+from modules.system import SystemBackend, MonitorInfo
+from modules.tracker import EventSource, WinEventHookSource
+from modules.native import NativeApi
+from modules.position import Rect
+
+from collections.abc import Callable
+import threading
+import win32api
+import win32gui
+import win32con
+import ctypes
+
+WM_DPICHANGED = 0x02E0
+SPI_SETWORKAREA = 0x002F
+MDT_EFFECTIVE_DPI = 0
+DEFAULT_DPI = 96
+
+
+class DisplayChangeListener:
+    """
+    Hidden top-level window receiving display change broadcasts (monitors, resolution, work area and DPI changes).
+    Bursts of changes are reported once, after they settle.
+    """
+
+    def __init__(self, on_change: Callable[[], None], delay: float) -> None:
+        self.__on_change = on_change
+        self.__delay = delay
+        self.__timer: threading.Timer | None = None
+        self.__lock = threading.Lock()
+
+        threading.Thread(target=self.__run, daemon=True, name="wingman-display").start()
+
+    def __run(self) -> None:
+        window_class = win32gui.WNDCLASS()
+        window_class.lpszClassName = "WingmanDisplayListener"
+        window_class.lpfnWndProc = self.__window_proc
+        window_class.hInstance = win32api.GetModuleHandle(None)
+
+        win32gui.CreateWindow(win32gui.RegisterClass(window_class), "", 0, 0, 0, 0, 0, 0, 0, window_class.hInstance, None)
+        win32gui.PumpMessages()
+
+    def __window_proc(self, hwnd, message, wparam, lparam):
+        if message in (win32con.WM_DISPLAYCHANGE, WM_DPICHANGED) or \
+           message == win32con.WM_SETTINGCHANGE and wparam == SPI_SETWORKAREA:
+            self.__schedule()
+
+        return win32gui.DefWindowProc(hwnd, message, wparam, lparam)
+
+    def __schedule(self) -> None:
+        with self.__lock:
+            if self.__timer is not None:
+                self.__timer.cancel()
+
+            self.__timer = threading.Timer(self.__delay, self.__on_change)
+            self.__timer.daemon = True
+            self.__timer.start()
+
+
+def monitor_dpi(handle) -> int:
+    """ Effective DPI of the monitor. """
+
+    dpi_x, dpi_y = ctypes.c_uint(0), ctypes.c_uint(0)
+
+    try:
+        if ctypes.windll.shcore.GetDpiForMonitor(int(handle), MDT_EFFECTIVE_DPI, ctypes.byref(dpi_x), ctypes.byref(dpi_y)) == 0:
+            return dpi_x.value
+
+    except (OSError, AttributeError):
+        pass
+
+    return DEFAULT_DPI
+
+
+class Win32Backend(SystemBackend):
+    """ Live desktop: hot paths go through bound NativeApi prototypes, the rest through pywin32. """
+
+    def __init__(self, api: NativeApi) -> None:
+        self.api = api
+
+    def visible_hwnds(self) -> list[int]:
+        return self.api.visible_hwnds()
+
+    def window_rect(self, hwnd: int) -> Rect | None:
+        return self.api.window_rect(hwnd)
+
+    def frame_bounds(self, hwnd: int) -> Rect:
+        return self.api.frame_bounds(hwnd)
+
+    def frame_bounds_many(self, hwnds: list[int]) -> dict[int, Rect]:
+        return self.api.frame_bounds_many(hwnds)
+
+    def window_text(self, hwnd: int) -> str:
+        return win32gui.GetWindowText(hwnd)
+
+    def placement(self, hwnd: int) -> tuple:
+        return win32gui.GetWindowPlacement(hwnd)
+
+    def is_iconic(self, hwnd: int) -> bool:
+        return bool(win32gui.IsIconic(hwnd))
+
+    def is_window_visible(self, hwnd: int) -> bool:
+        return bool(win32gui.IsWindowVisible(hwnd))
+
+    def is_maximized(self, hwnd: int) -> bool:
+        return self.api.is_maximized(hwnd)
+
+    def owner(self, hwnd: int) -> int:
+        return win32gui.GetWindow(hwnd, win32con.GW_OWNER)
+
+    def foreground_window(self) -> int:
+        return win32gui.GetForegroundWindow()
+
+    def show_window(self, hwnd: int, command: int) -> None:
+        win32gui.ShowWindow(hwnd, command)
+
+    def focus(self, hwnd: int) -> None:
+        # Stupid windows.
+        win32api.keybd_event(win32con.VK_MENU, 0, win32con.KEYEVENTF_KEYUP, 0)
+        win32gui.SetForegroundWindow(hwnd)
+
+    def move_window(self, hwnd: int, rect: Rect, repaint: bool = True) -> bool:
+        return self.api.move_window(hwnd, rect, repaint)
+
+    def begin_defer(self, count: int) -> int | None:
+        return self.api.begin_defer(count)
+
+    def defer_move(self, handle: int, hwnd: int, rect: Rect) -> int | None:
+        return self.api.defer_move(handle, hwnd, rect)
+
+    def end_defer(self, handle: int) -> bool:
+        return self.api.end_defer(handle)
+
+    def class_name(self, hwnd: int) -> str:
+        return self.api.class_name(hwnd)
+
+    def process_executable(self, hwnd: int) -> str:
+        return self.api.process_executable(hwnd)
+
+    def dpi(self, hwnd: int) -> int:
+        return self.api.dpi(hwnd)
+
+    def min_track_size(self, hwnd: int, timeout_ms: int) -> tuple[int, int] | None:
+        return self.api.min_track_size(hwnd, timeout_ms)
+
+    def get_ex_style(self, hwnd: int) -> int:
+        return self.api.get_ex_style(hwnd)
+
+    def set_ex_style(self, hwnd: int, style: int) -> None:
+        self.api.set_ex_style(hwnd, style)
+
+    def get_alpha(self, hwnd: int) -> int | None:
+        return self.api.get_alpha(hwnd)
+
+    def set_alpha(self, hwnd: int, alpha: int) -> None:
+        self.api.set_alpha(hwnd, alpha)
+
+    def set_system_backdrop(self, hwnd: int, kind: int) -> bool:
+        return self.api.set_system_backdrop(hwnd, kind)
+
+    def set_accent(self, hwnd: int, state: int) -> bool:
+        return self.api.set_accent(hwnd, state)
+
+    def monitors(self) -> list[MonitorInfo]:
+        monitors = []
+
+        for handle, *_ in win32api.EnumDisplayMonitors():
+            info = win32api.GetMonitorInfo(handle)
+            monitors.append(MonitorInfo(int(handle), Rect.from_list(info.get("Monitor")), Rect.from_list(info.get("Work")), monitor_dpi(handle)))
+
+        return monitors
+
+    def monitor_from_rect(self, rect: Rect) -> int | None:
+        return int(win32api.MonitorFromRect(rect.raw)) or None
+
+    def event_source(self) -> EventSource:
+        return WinEventHookSource()
+
+    def watch_displays(self, on_change: Callable[[], None], delay: float) -> None:
+        DisplayChangeListener(on_change, delay)
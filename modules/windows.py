@@ -1,58 +1,43 @@
+from modules.tracker import WindowTracker
 from modules.position import Rect, Direction
+from modules.snapshot import DesktopSnapshots, SnapshotDelta
+from modules.onboarding import OnboardingPipeline
+from modules.commands import LayoutActor, Command
+from modules.attributes import AttributeCache
+from modules.opacity import OpacityController
+from modules.spatial import SpatialIndex
+from modules.layout_store import LayoutStore, ScreenState, WindowState, match_windows
 from modules import screen_test
+from modules import commands
+from modules import attributes
 from modules import settings
 from modules import monitor
+from modules import system
 from modules import arrange
+from modules import layout
+from modules import opacity
+from modules import tracing
+from modules import moves
 from modules import blur
 from modules import logs
 
-from win32gui import EnumWindows, GetWindowText, IsWindowVisible, IsIconic
 from collections.abc import Callable
 from dataclasses import dataclass
-from threading import Thread
-import pywintypes
-import win32gui
-import win32api
-import win32con
-import ctypes
+from functools import partial
 import time
 
-user32 = ctypes.windll.user32
-kernel32 = ctypes.windll.kernel32
-
 _windows_cache: dict[int, "Window"] = {}
 
+# Visible windows by their edges, used by directional focus.
+spatial_index = SpatialIndex()
 
-class _WindowUpdatesMonitor:
-    """ Listen for window's position changes and report when it was killed. """
-
-    def __init__(self, hwnd: int, on_pos_changed: Callable[[Rect], None], on_killed: Callable[[], None]) -> None:
-        self.CHECK_FREQ = 0.1
-        self.hwnd = hwnd
-        self.__on_pos_changed = on_pos_changed
-        self.__on_killed = on_killed
-        self.__rect = self.__get_rect()
-
-        checker = Thread(target=self.threaded_checker, daemon=True)
-        checker.start()
-
-    def __get_rect(self) -> Rect:
-        return Rect.from_list(win32gui.GetWindowRect(self.hwnd))
-
-    def threaded_checker(self) -> None:
-        while 1:
-            time.sleep(self.CHECK_FREQ)
-
-            try:
-                new_rect = self.__get_rect()
-
-            except pywintypes.error:
-                return self.__on_killed()
-
-            if new_rect != self.__rect:
-                self.__on_pos_changed(new_rect)
-
-            self.__rect = new_rect
+# Created by start(), importing this module loads no system libraries and starts no threads.
+backend: system.SystemBackend | None = None
+window_tracker: WindowTracker | None = None
+layout_actor: LayoutActor | None = None
+layout_store: LayoutStore | None = None
+onboarding_pipeline: OnboardingPipeline | None = None
+desktop: DesktopSnapshots | None = None
 
 
 @dataclass
@@ -64,78 +49,191 @@ class Window:
     def __post_init__(self) -> None:
         _windows_cache[self.hwnd] = self
 
-        self.blur_bg: blur.BlurSlaveWindow | None = None
+        self.attributes = AttributeCache({
+            attributes.RECT: lambda: backend.window_rect(self.hwnd),
+            attributes.TITLE: lambda: backend.window_text(self.hwnd),
+            attributes.PLACEMENT: lambda: backend.placement(self.hwnd),
+            attributes.VISIBLE: self.__load_visibility,
+            attributes.FRAME: lambda: backend.frame_bounds(self.hwnd),
+            attributes.EXECUTABLE: lambda: backend.process_executable(self.hwnd),
+            attributes.CLASS_NAME: lambda: backend.class_name(self.hwnd),
+        })
+        self.attributes.set(attributes.RECT, self._rect)
+
+        self.blur_bg: blur.BlurEffect | None = None
         self.last_set_rect: Rect | None = None
-        self.opacity = 255
+        self.last_move_rect: Rect | None = None
         self.l_shift = 0
+        self.hidden = False
 
-        if not settings.BLUR_MODE_ONLY:
-            self.__fix_max_win()
-            self._bounding_error = screen_test.get_bounding_diff(self.hwnd)
-            self._min_w = screen_test.get_window_min_width(self.hwnd)
+        self.opacity_control = OpacityController(
+            self.hwnd, backend, settings.OPACITY_FRAME_INTERVAL, opacity.scheduler.schedule,
+            on_applied=self.__on_opacity_applied
+        )
 
-            if self.screen is not None:
-                if not self.screen.attach_window(self):
-                    if not arrange.attach_to_any_group(self):
-                        hide_win = self.screen.group.windows[0]
-                        hide_win.minimize()
-                        
-                        self.screen.attach_window(self)
-                        self.log(f"There was no group that could fit his window, replaced window: {hide_win.text}")
+        # Replaced by probing results once the window is onboarded.
+        self._bounding_error = (0, 0, 0, 0)
+        self._min_w = 0
 
-        _WindowUpdatesMonitor(self.hwnd, self.on_rect_update, self.on_window_killed)
+        window_tracker.subscribe(
+            self.hwnd, self.on_rect_update, self.on_window_killed, self.on_visibility_changed, self.on_name_changed, rect=self._rect
+        )
+        self.reindex()
 
     def __repr__(self) -> str:
         return f"<Win: {self.text}>"
 
-    def log(self, content: str) -> None:
-        """ Log message with this window's reference. """
+    @property
+    def opacity(self) -> int:
+        return self.opacity_control.alpha
+
+    def log(self, content: str, *args, level: int = logs.INFO) -> None:
+        """ Log message with this window's reference (formatted with args only if it's written). """
+
+        logs.window_log(self, content, *args, level=level)
+
+    def label(self) -> str:
+        """ Cached title, never calls the system (used by log writer). """
+
+        return self.attributes.peek(attributes.TITLE, "")
+
+    def identity(self) -> tuple[str, str, str]:
+        """ (executable, class, title) used to recognize the window after restart. """
 
-        logs.window_log(self, content)
+        return self.attributes.get(attributes.EXECUTABLE), self.attributes.get(attributes.CLASS_NAME), self.text
+
+    def __on_opacity_applied(self, alpha: int) -> None:
+        self.log("Updated opacity to: {}", alpha, level=logs.DEBUG)
+        layout_store.changed()
+
+    @tracing.traced("probe")
+    def probe(self) -> tuple[tuple[int, int, int, int], int]:
+        """ Measure window's bounding error and minimum width. (Runs on onboarding worker thread, results are applied on the layout thread.) """
+
+        return screen_test.probe_window(self.hwnd)
+
+    def prepare_probe(self) -> None:
+        """ Restore maximized window before it's measured. (Runs on the layout thread, the probe itself is read-only.) """
+
+        self.__fix_max_win()
+
+    def apply_probe(self, result: tuple[tuple[int, int, int, int], int]) -> None:
+        """ Store probed size limits. Group of already attached window (probed after the timeout) is rearranged. """
+
+        self._bounding_error, self._min_w = result
+
+        for group in arrange.Group.all_groups:
+            if self in group.windows:
+                group.rearrange()
+
+    def on_probe_timeout(self) -> None:
+        self.log("Probing timed out, attaching with default size limits.")
+
+    def attach_to_screen(self) -> None:
+        """ Attach window to it's screen's group, any other group or replace the first window in the screen's group. """
+
+        if self.screen is None:
+            return
+
+        if not self.screen.attach_window(self):
+            if not arrange.attach_to_any_group(self):
+                hide_win = self.screen.group.windows[0]
+                hide_win.minimize()
+
+                self.screen.attach_window(self)
+                self.log("There was no group that could fit his window, replaced window: {}", hide_win.label())
+
+    def reattach(self) -> None:
+        """ Bring back already initialized window that became visible again (without probing it again). """
+
+        self.__fix_max_win()
+        self._screen = monitor.get_screen(backend.monitor_from_rect(self.rect))
+        self.reindex()
+        self.attach_to_screen()
 
     def on_rect_update(self, rect: Rect) -> None:
         """ Standard position update callback. """
 
         self.rect = rect
+        self.attributes.invalidate(attributes.FRAME, attributes.PLACEMENT, attributes.VISIBLE)
 
         if self.blur_bg is not None:
             self.blur_bg.resize_to_window()
 
-        self._screen = monitor.get_screen(win32api.MonitorFromRect(self.rect.raw))
+        self._screen = monitor.get_screen(backend.monitor_from_rect(self.rect))
+        self.reindex()
+
+    def on_visibility_changed(self, visible: bool) -> None:
+        """ Shown, hidden, minimized or restored window callback. """
+
+        self.attributes.invalidate(attributes.VISIBLE, attributes.PLACEMENT)
+        self.hidden = not visible
+        self.reindex()
+
+    def reindex(self) -> None:
+        """ Update window's entry in the spatial index. Hidden windows are not indexed. """
+
+        if self.hidden:
+            spatial_index.remove(self.hwnd)
+        else:
+            spatial_index.update(self.hwnd, self.rect, self._screen)
+
+    def on_name_changed(self) -> None:
+        """ Window's title change callback. """
+
+        self.attributes.invalidate(attributes.TITLE)
+
+    def refresh(self) -> None:
+        """ Drop all cached attributes, they will be read from the system on the next access. """
+
+        self.attributes.invalidate()
 
     def on_window_killed(self) -> None:
         """ Standard window kill callback. """
 
         if self._screen:
-            self._screen.dettach_window(self)
+            layout_actor.call(partial(self._screen.dettach_window, self))
 
         if self.blur_bg is not None:
             self.blur_bg.destroy()
 
-        if self.hwnd in _windows_cache:
+        if _windows_cache.get(self.hwnd) is self:
             _windows_cache.pop(self.hwnd)
+            spatial_index.remove(self.hwnd)
 
+        desktop.invalidate()
         self.log("Window killed.")
 
     @property
     def text(self) -> str:
         """ Returns current window's title. """
 
-        return win32gui.GetWindowText(self.hwnd)
+        return self.attributes.get(attributes.TITLE)
 
     @property
     def rect(self) -> Rect:
-        self._rect = Rect.from_list(win32gui.GetWindowRect(self.hwnd))
-        return self._rect
+        return self.attributes.get(attributes.RECT)
 
     @rect.setter
     def rect(self, rect: Rect) -> None:
-        self._rect = rect
+        self.attributes.set(attributes.RECT, rect)
+
+    @property
+    def placement(self) -> tuple:
+        """ Window's placement in GetWindowPlacement format: (flags, showCmd, minpos, maxpos, normalpos) """
+
+        return self.attributes.get(attributes.PLACEMENT)
+
+    @property
+    def frame_bounds(self) -> Rect:
+        """ Real window's rect (including shadows etc.) """
+
+        return self.attributes.get(attributes.FRAME)
 
     @property
     def screen(self) -> monitor.Screen:
         if not self._screen:
-            self._screen = monitor.get_screen(win32api.MonitorFromRect(self.rect.raw))
+            self._screen = monitor.get_screen(backend.monitor_from_rect(self.rect))
 
         return self._screen
 
@@ -149,9 +247,17 @@ class Window:
 
     @property
     def is_visible(self) -> bool:
-        return bool(not win32gui.IsIconic(self.hwnd)) and \
-               win32gui.IsWindowVisible(self.hwnd) and \
-               win32gui.GetWindowPlacement(self.hwnd)[1] not in (win32con.SW_MINIMIZE, win32con.SW_HIDE)
+        return self.attributes.get(attributes.VISIBLE)
+
+    def __load_visibility(self) -> bool:
+        return not backend.is_iconic(self.hwnd) and \
+               backend.is_window_visible(self.hwnd) and \
+               self.placement[1] not in (system.SW_MINIMIZE, system.SW_HIDE)
+
+    def __invalidate_placement(self) -> None:
+        """ Drop attributes changed by ShowWindow call. """
+
+        self.attributes.invalidate(attributes.RECT, attributes.FRAME, attributes.PLACEMENT, attributes.VISIBLE)
 
     @property
     def minimum_width(self) -> int:
@@ -160,32 +266,49 @@ class Window:
 
         return settings.WINDOW_MIN_W
 
+    def rescale(self, factor: float) -> None:
+        """ Scale probed size limits after monitor's DPI change. """
+
+        self._min_w = round(self._min_w * factor)
+        self._bounding_error = tuple(round(value * factor) for value in self._bounding_error)
+        self.attributes.invalidate(attributes.RECT, attributes.FRAME)
+
+    def layout_item(self) -> layout.LayoutItem:
+        """ Layout solver's input describing this window. """
+
+        return layout.LayoutItem(self.minimum_width, self.l_shift, self._bounding_error)
+
     def __fix_max_win(self) -> None:
         """ Ensure window is not displayed in SW_MAXIMIZE mode as Microsoft couldn't do that. """
 
-        win32gui.ShowWindow(self.hwnd, win32con.SW_NORMAL)
-        self._rect = Rect.from_list(win32gui.GetWindowRect(self.hwnd))
+        if not backend.is_maximized(self.hwnd):
+            return
+
+        self.restore_normal()
 
         if self.blur_bg is not None:
             self.blur_bg.resize_to_window()
 
     def toogle_blur(self) -> None:
-        """ Toogle blur background slave window. """
+        """ Toogle blur using the first blur backend that accepts the window. """
 
         if self.blur_bg is None:
-            self.blur_bg = blur.BlurSlaveWindow(self)
-            self.opacity = settings.DEFAULT_OPACITY_ON_BLUR
-            self.__update_opacity()
-            
-            self.log("Enabled BlurBG.")
+            self.blur_bg = blur.apply(self, blur.backends)
+            if self.blur_bg is None:
+                return self.log("BlurBG is not supported.")
+
+            self.opacity_control.set(settings.DEFAULT_OPACITY_ON_BLUR)
+
+            self.log("Enabled BlurBG ({}).", type(self.blur_bg).__name__)
 
         else:
             self.blur_bg = self.blur_bg.destroy()
-            self.opacity = 255
-            self.__update_opacity()
+            self.opacity_control.set(opacity.MAX_OPACITY)
 
             self.log("Disabled BlurBG.")
 
+        layout_store.changed()
+
     def reset_shift(self) -> None:
         """ Reset window's border shift. """
 
@@ -196,8 +319,8 @@ class Window:
 
         group = self._screen.group
         
-        win32gui.ShowWindow(self.hwnd, win32con.SW_MINIMIZE)
-        self._rect = Rect.from_list(win32gui.GetWindowRect(self.hwnd))
+        backend.show_window(self.hwnd, system.SW_MINIMIZE)
+        self.__invalidate_placement()
 
         if self.blur_bg is not None:
             self.blur_bg.resize_to_window()
@@ -210,8 +333,8 @@ class Window:
     def maximize(self) -> None:
         """ Maximize window to take up entire screen. """
 
-        win32gui.ShowWindow(self.hwnd, win32con.SW_MAXIMIZE)
-        self._rect = Rect.from_list(win32gui.GetWindowRect(self.hwnd))
+        backend.show_window(self.hwnd, system.SW_MAXIMIZE)
+        self.__invalidate_placement()
 
         if self.blur_bg is not None:
             self.blur_bg.resize_to_window()
@@ -221,8 +344,8 @@ class Window:
     def unmaximize(self) -> None:
         """ If window is maximized, bring it back to group. If it's not maximized, minimize it. """
 
-        if win32gui.GetWindowPlacement(self.hwnd)[1] == win32con.SW_MAXIMIZE:
-            win32gui.ShowWindow(self.hwnd, win32con.SW_NORMAL)
+        if self.attributes.get(attributes.PLACEMENT, force=True)[1] == system.SW_MAXIMIZE:
+            self.restore_normal()
             self.screen.group.rearrange()
 
         else:
@@ -231,11 +354,10 @@ class Window:
     def focus(self) -> None:
         """ Switch system and keyboard focus to this window. """
 
-        # Stupid windows.
-        win32api.keybd_event(win32con.VK_MENU, 0, win32con.KEYEVENTF_KEYUP, 0)
-        win32gui.SetForegroundWindow(self.hwnd)
+        backend.focus(self.hwnd)
         self.log("Focused.")
 
+    @tracing.traced("draw_in_rect")
     def draw_in_rect(self, rect: Rect | None = None, restore: bool = False) -> Rect:
         """ Move to specified (or current) rectangle, apply bounding error fixes, returns real Rect after set. """
 
@@ -245,49 +367,39 @@ class Window:
         if restore:
             rect = self.last_set_rect
 
-        self.__fix_max_win()
-        win32gui.MoveWindow(
-            self.hwnd,
-            rect.left - self._bounding_error[0],
-            rect.top - self._bounding_error[1],
-            rect.w - self._bounding_error[2],
-            rect.h - self._bounding_error[3],
-            True
-        )
+        arrange.move_windows([(self, rect)])
+        return self.last_set_rect
 
-        if self.blur_bg is not None:
-            self.blur_bg.resize_to_window()
-        
-        exact_rect = Rect.from_RECT(screen_test.get_extended_frame_bounds(self.hwnd))
-        self.last_set_rect = exact_rect
-        
-        return exact_rect
+    def restore_normal(self) -> None:
+        """ Bring maximized window back to normal placement so it can be moved. """
 
-    def __update_opacity(self) -> None:
-        """ Apply window opacity. """
+        backend.show_window(self.hwnd, system.SW_NORMAL)
+        self.__invalidate_placement()
 
-        if self.opacity < 75:
-            self.opacity = 75
+    def on_moved(self, requested: Rect, frame: Rect | None) -> None:
+        """ Called with requested rect and window's real frame bounds after move transaction was committed. """
 
-        if self.opacity > 255:
-            self.opacity = 255
+        self.last_move_rect = requested
 
-        win32gui.SetWindowLong(self.hwnd, win32con.GWL_EXSTYLE, win32gui.GetWindowLong(self.hwnd, win32con.GWL_EXSTYLE) | win32con.WS_EX_LAYERED)
-        win32gui.SetLayeredWindowAttributes(self.hwnd, win32api.RGB(0, 0, 0), self.opacity, win32con.LWA_ALPHA)
+        # Real rect will be delivered by the tracker (window might have refused requested size).
+        self.attributes.invalidate(attributes.RECT, attributes.FRAME)
 
-        self.log(f"Updated opacity to: {self.opacity}")
+        if frame is not None:
+            self.attributes.set(attributes.FRAME, frame)
+            self.last_set_rect = frame
+
+        if self.blur_bg is not None:
+            self.blur_bg.resize_to_window()
 
     def decrease_opacity(self) -> None:
-        """ Decrease window's opacity by fixed value. """
+        """ Decrease window's opacity by fixed value. Wheel bursts are applied once per frame. """
 
-        self.opacity -= settings.OPACITY_VALUE_STEP
-        self.__update_opacity()
+        self.opacity_control.nudge(-settings.OPACITY_VALUE_STEP)
 
     def increase_opacity(self) -> None:
-        """ Increase window's opacity by fixed value. """
+        """ Increase window's opacity by fixed value. Wheel bursts are applied once per frame. """
 
-        self.opacity += settings.OPACITY_VALUE_STEP
-        self.__update_opacity()
+        self.opacity_control.nudge(settings.OPACITY_VALUE_STEP)
 
     def shift_left(self) -> None:
         """ Move this window to the left side of the group or to the other screen on the left. """
@@ -305,10 +417,13 @@ class Window:
     def resize_right(self) -> None:
         self.screen.group.resize_window(self, Direction.RIGHT)
 
-    def can_shrink(self) -> bool:
-        """ Check if this window can be shrinked to create space for other window in group. """
+    def can_shrink(self, width: int | None = None) -> bool:
+        """ Check if this window (currently or soon `width` wide) can be shrinked to create space for other window in group. """
 
-        return self.rect.w - settings.MARGIN_PX >= self.minimum_width
+        if width is None:
+            width = self.rect.w
+
+        return width - settings.MARGIN_PX >= self.minimum_width
 
 
 def load_window_hwnd(hwnd, force_reinit: bool = False) -> Window | None:
@@ -317,7 +432,9 @@ def load_window_hwnd(hwnd, force_reinit: bool = False) -> Window | None:
     force_reinit flag removes cached state and performs initialization.
     """
 
-    text = win32gui.GetWindowText(hwnd)
+    discovered_at = time.perf_counter()
+
+    text = backend.window_text(hwnd)
     if not text or text in settings.IGNORE_WIN_TEXT:
         return
 
@@ -330,51 +447,165 @@ def load_window_hwnd(hwnd, force_reinit: bool = False) -> Window | None:
 
     if settings.INGORE_CHILDREN:
         # Ensure the main app's window will be handled, not a child.
-        owner = win32gui.GetWindow(hwnd, win32con.GW_OWNER)
+        owner = backend.owner(hwnd)
         if owner != 0:
             return
 
-    rect = Rect.from_list(win32gui.GetWindowRect(hwnd))
-    screen = monitor.get_screen(win32api.MonitorFromRect(rect.raw))
+    rect = backend.window_rect(hwnd)
+    if rect is None:
+        return
+
+    screen = monitor.get_screen(backend.monitor_from_rect(rect))
 
     window = Window(
         hwnd, rect, screen
     )
+    window.attributes.set(attributes.TITLE, text)
+
+    onboarding_pipeline.record("classify", time.perf_counter() - discovered_at)
+
+    if not settings.BLUR_MODE_ONLY:
+        onboarding_pipeline.submit(window)
 
     return window
 
 
-def load_visible_windows(only_screen: monitor.Screen | None = None) -> list[Window]:
+def start() -> None:
+    """ Load the system backend, build screens and start the layout thread, onboarding and window events. """
+
+    global backend, window_tracker, layout_actor, layout_store, onboarding_pipeline, desktop
+
+    backend = system.get()
+    moves.start()
+    blur.start()
+    monitor.topology.ensure_loaded()
+
+    window_tracker = WindowTracker(backend.event_source(), backend.window_rect)
+    layout_actor = LayoutActor(arrange.batch, on_applied=_on_layout_applied)
+    layout_actor.register(commands.RESIZE, _resize)
+
+    layout_store = LayoutStore(settings.LAYOUT_SNAPSHOT_PATH, settings.LAYOUT_SAVE_DELAY, capture_layout, layout_actor.call)
+
+    onboarding_pipeline = OnboardingPipeline(
+        probe=lambda window: window.probe(),
+        apply=lambda window, result: window.apply_probe(result),
+        attach=lambda window: window.attach_to_screen() if _windows_cache.get(window.hwnd) is window else None,
+        on_timeout=lambda window: window.on_probe_timeout(),
+        batch=arrange.batch,
+        run=layout_actor.call,
+        workers=settings.ONBOARDING_WORKERS,
+        probe_timeout=settings.ONBOARDING_PROBE_TIMEOUT,
+        prepare=lambda window: window.prepare_probe()
+    )
+
+    desktop = DesktopSnapshots(backend.visible_hwnds, settings.SNAPSHOT_FRESHNESS)
+
+    layout_actor.start()
+    window_tracker.start()
+
+
+_saved_revision = arrange.Group.revision
+
+
+def _on_layout_applied() -> None:
+    """ Schedule saving only after drains that changed groups or moved windows (not after capturing itself). """
+
+    global _saved_revision
+
+    if arrange.Group.revision != _saved_revision:
+        _saved_revision = arrange.Group.revision
+        layout_store.changed()
+
+
+def capture_layout() -> list[ScreenState]:
+    """ Current order, shifts, opacity and blur of grouped windows per screen. (Runs on the layout thread.) """
+
+    return [
+        ScreenState(screen.rect.raw, [
+            WindowState(*window.identity(), window.l_shift, window.opacity, window.blur_bg is not None)
+            for window in screen.group.windows
+        ])
+        for screen in monitor.screens
+    ]
+
+
+def restore_layout(saved: list[ScreenState]) -> None:
     """
-    Returns array of initalized windows that are currently visible on the screen.
-    only_screen argument filters result to return only those windows that are displayed on selected screen.
+    Apply saved layout to onboarded windows: windows are moved to their saved screens (if they fit) and ordered,
+    shifts, opacity and blur are restored. Every group is arranged once. Saving starts afterwards.
+    (Runs on the layout thread.)
     """
 
-    class TITLEBARINFO(ctypes.Structure):
-        _fields_ = [
-            ("cbSize", ctypes.wintypes.DWORD),
-            ("rcTitleBar", ctypes.wintypes.RECT),
-            ("rgstate", ctypes.wintypes.DWORD * 6)
-        ]
+    screens = {screen.rect.raw: screen for screen in monitor.screens}
+    grouped = [window for group in arrange.Group.all_groups for window in group.windows]
+    placements: list[tuple[monitor.Screen, list[tuple[WindowState, Window]]]] = []
 
-    visible_windows: list[Window] = []
+    for screen_state in saved:
+        screen = screens.get(tuple(screen_state.rect))
+        if screen is None:
+            continue
+
+        pairs = match_windows(screen_state.windows, grouped, Window.identity)
+        placements.append((screen, pairs))
+
+        for _, window in pairs:
+            grouped.remove(window)
+
+    with arrange.batch():
+        # Free the slots first, so windows can swap screens even if groups are full.
+        homeless: list[Window] = []
+        for screen, pairs in placements:
+            for _, window in pairs:
+                if window not in screen.group.windows:
+                    window.screen.dettach_window(window)
+                    homeless.append(window)
+
+        for screen, pairs in placements:
+            group = screen.group
+            ordered: list[Window] = []
 
-    def callback(hwnd, _):
-        title_info = TITLEBARINFO()
-        title_info.cbSize = ctypes.sizeof(title_info)
-        ctypes.windll.user32.GetTitleBarInfo(hwnd, ctypes.byref(title_info))
+            for state, window in pairs:
+                if window in homeless:
+                    if len(group.windows) >= settings.MAX_WINS_IN_GROUP or not group.can_fit_window(window):
+                        continue
 
-        is_cloaked = ctypes.c_int(0)
-        ctypes.WinDLL("dwmapi").DwmGetWindowAttribute(hwnd, 14, ctypes.byref(is_cloaked), ctypes.sizeof(is_cloaked))
+                    homeless.remove(window)
+                    group.windows.append(window)
+                    window._screen = screen
 
-        if not IsIconic(hwnd) and IsWindowVisible(hwnd) and GetWindowText(hwnd) != '' and is_cloaked.value == 0:
-            if not (title_info.rgstate[0] & 0x00008000):
-                window = load_window_hwnd(hwnd)
+                if state.blur and window.blur_bg is None:
+                    window.toogle_blur()
 
-                if window:
-                    visible_windows.append(window)
+                window.l_shift = state.l_shift
+                if state.opacity != window.opacity:
+                    window.opacity_control.set(state.opacity)
 
-    EnumWindows(callback, None)
+                ordered.append(window)
+
+            group.windows[:] = ordered + [window for window in group.windows if window not in ordered]
+            group.rearrange()
+
+        for window in homeless:
+            window.attach_to_screen()
+
+    layout_store.armed = True
+    logs.system_log("Restored layout of {} screens.", len(placements))
+
+
+def load_visible_windows(only_screen: monitor.Screen | None = None) -> list[Window]:
+    """
+    Returns array of initalized windows that are currently visible on the screen.
+    only_screen argument filters result to return only those windows that are displayed on selected screen.
+    Uses the latest desktop snapshot if it is fresh enough.
+    """
+
+    visible_windows: list[Window] = []
+
+    for hwnd in desktop.latest():
+        window = load_window_hwnd(hwnd)
+
+        if window:
+            visible_windows.append(window)
 
     if only_screen is not None:
         return filter(lambda w: w.screen == only_screen, visible_windows)
@@ -382,113 +613,132 @@ def load_visible_windows(only_screen: monitor.Screen | None = None) -> list[Wind
     return visible_windows
 
 
-def get_focused_window() -> Window | None:
-    """ Return's currently focused window. """
+def apply_visible_delta(delta: SnapshotDelta) -> None:
+    """
+    Apply visible windows changes as a single batch: hidden windows are removed from groups,
+    newly visible windows are attached and every affected group is rearranged once.
+    """
 
-    global RECENT_FOCUSED
+    for hwnd in delta.removed:
+        spatial_index.remove(hwnd)
 
-    hwnd = win32gui.GetForegroundWindow()
-    if hwnd not in _windows_cache:
-        load_window_hwnd(hwnd)
+    for hwnd in delta.added:
+        win = _windows_cache.get(hwnd)
+        if win is not None:
+            win.reindex()
 
-    win = _windows_cache.get(hwnd)
-    if win is None:
-        return RECENT_FOCUSED
+    if settings.BLUR_MODE_ONLY:
+        for hwnd in delta.added:
+            load_window_hwnd(hwnd)
+        return
 
-    RECENT_FOCUSED = win
-    return win
+    with arrange.batch():
+        for hwnd in delta.removed:
+            win = _windows_cache.get(hwnd)
 
+            if win is not None:
+                # win.screen might be lost due to minimized rect.
+                for group in arrange.Group.all_groups:
+                    group.remove_window(win)
 
-RECENT_FOCUSED = get_focused_window()
+        for hwnd in delta.added:
+            win = _windows_cache.get(hwnd)
 
+            if win is None:
+                load_window_hwnd(hwnd)
 
-def shift_focus_left() -> None:
-    """ Move focus to the first window on the left. """
+            elif not any(win in group.windows for group in arrange.Group.all_groups):
+                win.reattach()
 
-    current = get_focused_window()
-    if current is None:
-        return
 
-    def _find_next_left_win(screen: monitor.Screen) -> Window | None:
-        candidate = None
+def _resize(command: Command) -> None:
+    """ Apply (coalesced) resize command: every step changes border shifts, the group is rearranged once. """
 
-        for window in load_visible_windows(screen):
-            if window.rect.left < current.rect.left:
-                if candidate is None:
-                    candidate = window
-                    continue
+    window = command.target
+    for _ in range(command.steps):
+        window.screen.group.resize_window(window, command.direction)
 
-                if window.rect.left > candidate.rect.left:
-                    candidate = window
 
-        return candidate
+def for_focused(action: Callable[[Window], None]) -> None:
+    """ Run action on the currently focused window right away (opacity and blur don't touch the layout). """
 
-    next_win = _find_next_left_win(current.screen)
-    if next_win is not None:
-        next_win.log("Shifted focus from another window on the right.")
-        return next_win.focus()
+    window = get_focused_window()
+    if window is not None:
+        action(window)
 
-    if not settings.OVERLAPPING_FOCUS_SHIFT:
-        return
 
-    left_screen = current.screen.left_monitor
-    if left_screen:
-        next_win = _find_next_left_win(left_screen)
-        if next_win is not None:
-            next_win.log("Shifted focus from another window on east.")
-            return next_win.focus()
+def submit_for_focused(action: Callable[[Window], None]) -> None:
+    """ Queue layout action on the currently focused window. """
 
-    rightmost = monitor.rightmost_screen()
-    if rightmost == current.screen:
-        return
+    window = get_focused_window()
+    if window is not None:
+        layout_actor.call(partial(action, window))
 
-    if rightmost.group.windows:
-        next_win = rightmost.group.windows[-1]
-        next_win.focus()
-        next_win.log("(Overlappingly) Shifted focus from another window.")
 
+def submit_resize(direction: Direction) -> None:
+    """ Queue resize of the currently focused window. Queued resizes of the same window are coalesced. """
 
-def shift_focus_right() -> None:
-    """ Move focus to the first window on the right. """
+    window = get_focused_window()
+    if window is not None:
+        layout_actor.submit(Command(commands.RESIZE, window, direction))
 
-    current = get_focused_window()
-    if current is None:
-        return
 
-    def _find_next_right_win(screen: monitor.Screen) -> Window | None:
-        candidate = None
+def get_focused_window() -> Window | None:
+    """ Return's currently focused window. """
+
+    global RECENT_FOCUSED
+
+    # Hotkeys are registered before start().
+    if backend is None:
+        return None
 
-        for window in load_visible_windows(screen):
-            if window.rect.right > current.rect.right:
-                if candidate is None:
-                    candidate = window
-                    continue
+    hwnd = backend.foreground_window()
+    if hwnd not in _windows_cache:
+        load_window_hwnd(hwnd)
 
-                if window.rect.right < candidate.rect.right:
-                    candidate = window
+    win = _windows_cache.get(hwnd)
+    if win is None:
+        return RECENT_FOCUSED
 
-        return candidate
+    RECENT_FOCUSED = win
+    return win
 
-    next_win = _find_next_right_win(current.screen)
-    if next_win is not None:
-        next_win.log("Shifted focus from another window on west.")
-        return next_win.focus()
 
-    if not settings.OVERLAPPING_FOCUS_SHIFT:
-        return
+RECENT_FOCUSED: Window | None = None
+
+
+_FOCUS_SOURCES = {
+    Direction.LEFT: "on the right",
+    Direction.RIGHT: "on the left",
+    Direction.UP: "below",
+    Direction.DOWN: "above",
+}
 
-    right_screen = current.screen.right_monitor
-    if right_screen:
-        next_win = _find_next_right_win(right_screen)
-        if next_win is not None:
-            next_win.log("Shifted focus from another window on west.")
-            return next_win.focus()
 
-    leftmost = monitor.leftmost_screen()
-    if leftmost == current.screen:
+def shift_focus(direction: int) -> None:
+    """
+    Move focus to the nearest window in the direction: on the same screen first, then on the whole desktop.
+    Horizontal shifts wrap around to the window on the opposite end of the desktop, unless the current
+    screen is already on that end.
+    """
+
+    current = get_focused_window()
+    if current is None:
         return
 
-    if leftmost.group.windows:
-        next_win = leftmost.group.windows[0]
+    rect = current.rect
+    next_win = _windows_cache.get(spatial_index.nearest(direction, rect, current.screen))
+
+    if next_win is None and settings.OVERLAPPING_FOCUS_SHIFT:
+        next_win = _windows_cache.get(spatial_index.nearest(direction, rect))
+
+        if next_win is None and direction in (Direction.LEFT, Direction.RIGHT):
+            edge_screen = monitor.rightmost_screen() if direction == Direction.LEFT else monitor.leftmost_screen()
+            if edge_screen == current.screen:
+                return
+
+            next_win = _windows_cache.get(spatial_index.farthest(direction, edge_screen))
+
+    if next_win is not None:
         next_win.focus()
-        next_win.log("(Overlappingly) Shifted focus from another window.")
+        next_win.log("Shifted focus from another window {}.", _FOCUS_SOURCES[direction])
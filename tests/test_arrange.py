@@ -0,0 +1,85 @@
+from modules.windows import Window
+from modules.position import Rect, Direction
+from modules import settings
+from modules import arrange
+from modules import layout
+
+import pytest
+
+SCREEN = Rect(0, 0, 1920, 1080)
+
+
+class StubWindow:
+    """ Group member with the real size limits logic, but without any system window behind it. """
+
+    minimum_width = Window.minimum_width
+    layout_item = Window.layout_item
+    can_shrink = Window.can_shrink
+
+    def __init__(self, hwnd: int, min_w: int) -> None:
+        self.hwnd = hwnd
+        self._min_w = min_w
+        self._bounding_error = (0, 0, 0, 0)
+        self.l_shift = 0
+        self.rect = SCREEN
+        self.is_visible = True
+
+    def log(self, *args, **kwargs) -> None:
+        pass
+
+
+@pytest.fixture
+def group(monkeypatch: pytest.MonkeyPatch) -> arrange.Group:
+    """ Group of two windows placed by the solver, nothing is moved until `place` is called. """
+
+    monkeypatch.setattr(arrange.Group, "all_groups", [])
+    monkeypatch.setattr(arrange.Group, "rearrange", lambda self: None)
+
+    group = arrange.Group(SCREEN)
+    group.windows = [StubWindow(1, settings.WINDOW_MIN_W), StubWindow(2, settings.WINDOW_MIN_W)]
+    place(group)
+    return group
+
+
+def place(group: arrange.Group) -> None:
+    """ What rearrange does to window rects. """
+
+    placements = layout.solve(group.screen_rect, settings.MARGIN_PX, [win.layout_item() for win in group.windows])
+    for window, placement in zip(group.windows, placements):
+        window.rect = placement.frame
+
+
+def test_burst_of_resizes_stops_at_the_same_shift_as_single_presses(group: arrange.Group) -> None:
+    left, right = group.windows
+
+    for _ in range(40):
+        group.resize_window(left, Direction.RIGHT)
+        place(group)
+
+    single = right.l_shift
+
+    right.l_shift = 0
+    place(group)
+
+    # Coalesced steps: the group is rearranged only after all of them.
+    for _ in range(40):
+        group.resize_window(left, Direction.RIGHT)
+    place(group)
+
+    assert right.l_shift == single
+    assert right.rect.w >= right.minimum_width
+    assert right.rect.w - settings.MARGIN_PX < right.minimum_width
+
+
+def test_first_press_back_after_a_burst_resizes(group: arrange.Group) -> None:
+    left, right = group.windows
+
+    for _ in range(40):
+        group.resize_window(left, Direction.RIGHT)
+    place(group)
+
+    width = left.rect.w
+    group.resize_window(left, Direction.LEFT)
+    place(group)
+
+    assert left.rect.w == width - settings.MARGIN_PX
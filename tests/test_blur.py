@@ -0,0 +1,72 @@
+from modules.blur import (
+    FakeDwm, NativeBlurBackend, CompanionBlurBackend, NativeBlur, BlurHost, select_backends, apply,
+    DWMSBT_TRANSIENTWINDOW, DWMSBT_AUTO, ACCENT_ENABLE_BLURBEHIND, ACCENT_DISABLED
+)
+
+from types import SimpleNamespace
+
+
+class StubCompanion:
+    """ Companion backend accepting every window without creating a Tk window. """
+
+    name = CompanionBlurBackend.name
+
+    def __init__(self) -> None:
+        self.attached: list[int] = []
+
+    def attach(self, window) -> str:
+        self.attached.append(window.hwnd)
+        return "companion"
+
+
+def test_auto_uses_companion_window() -> None:
+    native = NativeBlurBackend(FakeDwm())
+    companion = CompanionBlurBackend(BlurHost(1 / 60))
+
+    assert select_backends("auto", native, companion) == [companion]
+    assert select_backends("companion", native, companion) == [companion]
+    assert select_backends("native", native, companion) == [native, companion]
+
+
+def test_native_mode_falls_back_to_companion_for_rejected_window() -> None:
+    companion = StubCompanion()
+    dwm = FakeDwm(failing={1})
+    backends = select_backends("native", NativeBlurBackend(dwm), companion)
+
+    assert apply(SimpleNamespace(hwnd=1), backends) == "companion"
+    assert [call[0] for call in dwm.calls] == ["set_system_backdrop", "set_accent"]
+    assert companion.attached == [1]
+
+
+def test_native_prefers_system_backdrop() -> None:
+    dwm = FakeDwm()
+    effect = apply(SimpleNamespace(hwnd=1), [NativeBlurBackend(dwm)])
+
+    assert isinstance(effect, NativeBlur) and effect.backdrop
+    assert dwm.backdrops == {1: DWMSBT_TRANSIENTWINDOW}
+
+    effect.destroy()
+    assert dwm.backdrops == {1: DWMSBT_AUTO}
+
+
+def test_native_falls_back_to_accent() -> None:
+    dwm = FakeDwm(backdrop=False)
+    effect = apply(SimpleNamespace(hwnd=1), [NativeBlurBackend(dwm)])
+
+    assert isinstance(effect, NativeBlur) and not effect.backdrop
+    assert dwm.accents == {1: ACCENT_ENABLE_BLURBEHIND}
+
+    effect.destroy()
+    assert dwm.accents == {1: ACCENT_DISABLED}
+
+
+def test_rejected_window_falls_through_to_next_backend() -> None:
+    companion = StubCompanion()
+    effect = apply(SimpleNamespace(hwnd=1), [NativeBlurBackend(FakeDwm(failing={1})), companion])
+
+    assert effect == "companion"
+    assert companion.attached == [1]
+
+
+def test_no_backend_accepts_window() -> None:
+    assert apply(SimpleNamespace(hwnd=1), [NativeBlurBackend(FakeDwm(backdrop=False, accent=False))]) is None
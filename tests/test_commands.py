@@ -0,0 +1,59 @@
+from modules.commands import Command, LayoutActor, coalesce, RESIZE, CALL
+from modules.position import Direction
+
+from contextlib import contextmanager
+
+WINDOW = object()
+OTHER = object()
+
+
+def resize(target: object = WINDOW, direction: int = Direction.RIGHT) -> Command:
+    return Command(RESIZE, target, direction)
+
+
+def test_rapid_resizes_become_one_command() -> None:
+    commands = coalesce([resize() for _ in range(5)])
+
+    assert len(commands) == 1
+    assert commands[0].steps == 5
+    assert len(commands[0].created_at) == 5
+
+
+def test_other_command_breaks_the_run() -> None:
+    commands = coalesce([resize(), resize(), Command(CALL, action=lambda: None), resize(), resize(), resize()])
+
+    assert [(command.kind, command.steps) for command in commands] == [(RESIZE, 2), (CALL, 1), (RESIZE, 3)]
+
+
+def test_different_target_or_direction_is_not_merged() -> None:
+    commands = coalesce([resize(), resize(OTHER), resize(OTHER, Direction.LEFT), resize(OTHER, Direction.LEFT)])
+
+    assert [command.steps for command in commands] == [1, 1, 2]
+
+
+def test_calls_are_never_merged() -> None:
+    commands = coalesce([Command(CALL, action=lambda: None) for _ in range(3)])
+
+    assert [command.steps for command in commands] == [1, 1, 1]
+
+
+def test_drain_applies_coalesced_commands_in_one_batch() -> None:
+    events = []
+
+    @contextmanager
+    def batch():
+        events.append("begin")
+        yield
+        events.append("end")
+
+    actor = LayoutActor(batch, on_applied=lambda: events.append("applied"))
+    actor.register(RESIZE, lambda command: events.append(("resize", command.steps)))
+
+    for _ in range(5):
+        actor.submit(resize())
+    actor.call(lambda: events.append("call"))
+
+    assert actor.drain() == 2
+    assert events == ["begin", ("resize", 5), "call", "end", "applied"]
+    assert (actor.submitted, actor.applied) == (6, 2)
+    assert actor.stats()[RESIZE]["count"] == 5
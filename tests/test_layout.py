@@ -0,0 +1,54 @@
+from modules.layout import LayoutItem, solve
+from modules.position import Rect
+
+SCREEN = Rect(0, 0, 1920, 1080)
+MARGIN = 16
+
+
+def frames(items: list[LayoutItem]) -> list[Rect]:
+    return [placement.frame for placement in solve(SCREEN, MARGIN, items)]
+
+
+def test_empty_group() -> None:
+    assert solve(SCREEN, MARGIN, []) == []
+
+
+def test_equal_shares_without_overflow() -> None:
+    result = frames([LayoutItem(300), LayoutItem(300), LayoutItem(300)])
+
+    assert result[0].left == SCREEN.left + MARGIN
+    assert result[-1].right == SCREEN.right - MARGIN
+
+    for previous, frame in zip(result, result[1:]):
+        assert frame.left == previous.right + MARGIN
+
+    assert max(frame.w for frame in result) - min(frame.w for frame in result) <= MARGIN
+
+
+def test_shifted_border_never_overflows() -> None:
+    result = frames([LayoutItem(300, l_shift=-5000), LayoutItem(300), LayoutItem(300)])
+
+    assert result[-1].right == SCREEN.right - MARGIN
+    assert all(frame.left < frame.right for frame in result)
+
+
+def test_width_is_clamped_to_minimum() -> None:
+    result = frames([LayoutItem(800, l_shift=5000), LayoutItem(300)])
+
+    assert result[0].w == 800
+
+
+def test_reserved_space_caps_expanded_window() -> None:
+    items = [LayoutItem(300, l_shift=-5000), LayoutItem(500), LayoutItem(400)]
+    result = frames(items)
+
+    # Windows on the right keep at least their minimum widths.
+    assert result[1].w >= 500
+    assert result[2].w >= 400
+    assert result[0].right == SCREEN.right - MARGIN - (500 + MARGIN) - (400 + MARGIN)
+
+
+def test_window_rect_is_corrected_with_bounding_error() -> None:
+    placement = solve(SCREEN, MARGIN, [LayoutItem(300, bounding_error=(7, 0, -14, -7))])[0]
+
+    assert placement.window == Rect.from_xywh(placement.frame.left - 7, placement.frame.top, placement.frame.w + 14, placement.frame.h + 7)
@@ -0,0 +1,53 @@
+from modules.logs import RateLimiter
+from modules import logs
+
+import pytest
+
+
+@pytest.fixture
+def now(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    clock = [0.0]
+    monkeypatch.setattr(logs.time, "perf_counter", lambda: clock[0])
+    return clock
+
+
+def test_burst_passes_then_drops(now: list[float]) -> None:
+    limiter = RateLimiter(rate=1, burst=3)
+
+    assert [limiter.allow("msg")[0] for _ in range(5)] == [True, True, True, False, False]
+
+
+def test_tokens_refill_over_time(now: list[float]) -> None:
+    limiter = RateLimiter(rate=2, burst=2)
+    limiter.allow("msg")
+    limiter.allow("msg")
+    assert not limiter.allow("msg")[0]
+
+    now[0] += 0.5
+    assert limiter.allow("msg")[0]
+    assert not limiter.allow("msg")[0]
+
+    # Refill never exceeds the burst.
+    now[0] += 60
+    assert [limiter.allow("msg")[0] for _ in range(3)] == [True, True, False]
+
+
+def test_dropped_count_is_reported_once(now: list[float]) -> None:
+    limiter = RateLimiter(rate=1, burst=1)
+    limiter.allow("msg")
+    limiter.allow("msg")
+    limiter.allow("msg")
+
+    now[0] += 1
+    assert limiter.allow("msg") == (True, 2)
+
+    now[0] += 1
+    assert limiter.allow("msg") == (True, 0)
+
+
+def test_keys_have_separate_buckets(now: list[float]) -> None:
+    limiter = RateLimiter(rate=1, burst=1)
+
+    assert limiter.allow("a")[0]
+    assert not limiter.allow("a")[0]
+    assert limiter.allow("b")[0]
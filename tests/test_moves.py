@@ -0,0 +1,70 @@
+from modules.moves import MoveTransaction, MovePlanner, MoveRequest, RecordingMoveBackend
+from modules.position import Rect
+
+import pytest
+
+A = Rect(0, 0, 100, 100)
+B = Rect(100, 0, 200, 100)
+
+
+def test_moves_are_deferred_in_one_batch() -> None:
+    backend = RecordingMoveBackend()
+    transaction = MoveTransaction(backend)
+    transaction.add(1, A)
+    transaction.add(2, B)
+
+    frames = transaction.commit()
+
+    assert [call[0] for call in backend.calls] == ["begin", "defer", "defer", "end", "frame_bounds"]
+    assert frames == {1: A, 2: B}
+
+
+def test_failed_defer_falls_back_to_sequential_moves() -> None:
+    backend = RecordingMoveBackend()
+    backend.failing.add(1)
+
+    transaction = MoveTransaction(backend)
+    transaction.add(1, A)
+    transaction.add(2, B)
+    frames = transaction.commit()
+
+    assert ("end",) not in backend.calls
+    assert [call for call in backend.calls if call[0] == "move"] == [("move", 1, A), ("move", 2, B)]
+    assert frames == {1: A, 2: B}
+
+
+def test_frames_include_frame_offsets() -> None:
+    backend = RecordingMoveBackend()
+    backend.frame_offsets[1] = (7, 0, -14, -7)
+
+    transaction = MoveTransaction(backend)
+    transaction.add(1, A)
+
+    assert transaction.commit() == {1: Rect.from_xywh(7, 0, 86, 93)}
+
+
+def test_later_move_replaces_previous_one() -> None:
+    backend = RecordingMoveBackend()
+    transaction = MoveTransaction(backend)
+    transaction.add(1, A)
+    transaction.add(1, B)
+    transaction.commit()
+
+    assert backend.rects == {1: B}
+
+
+def test_transaction_commits_once() -> None:
+    transaction = MoveTransaction(RecordingMoveBackend())
+    transaction.commit()
+
+    with pytest.raises(AssertionError):
+        transaction.commit()
+
+
+def test_planner_skips_windows_already_in_place() -> None:
+    planner = MovePlanner(lambda hwnd: hwnd == 3)
+    plan = planner.plan([MoveRequest(1, A, A, A), MoveRequest(2, B, A, A), MoveRequest(3, A, None, B)])
+
+    assert [request.hwnd for request in plan.moves] == [2, 3]
+    assert plan.restore == [3]
+    assert (plan.stats.moved, plan.stats.skipped, plan.stats.restored) == (2, 1, 1)
@@ -0,0 +1,36 @@
+from modules.native import NativeApi
+
+
+class StubDll:
+    """ Every export is a no-op returning 0 unless overridden. """
+
+    def __init__(self, **exports) -> None:
+        self.__exports = exports
+
+    def __getattr__(self, name: str):
+        fn = self.__exports.get(name)
+        if fn is None:
+            def fn(*args) -> int:
+                return 0
+            self.__exports[name] = fn
+        return fn
+
+
+def _class_name(hwnd, buffer, size) -> int:
+    buffer.value = "Notepad"
+    return len(buffer.value)
+
+
+def test_user32_queries_work_without_kernel32() -> None:
+    user32 = StubDll(GetClassNameW=_class_name, GetDpiForWindow=lambda hwnd: 144)
+    api = NativeApi(user32, StubDll())
+
+    assert api.class_name(1) == "Notepad"
+    assert api.dpi(1) == 144
+    assert api.min_track_size(1, 50) is None
+
+
+def test_process_executable_is_empty_without_kernel32() -> None:
+    api = NativeApi(StubDll(), StubDll())
+
+    assert api.process_executable(1) == ""
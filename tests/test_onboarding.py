@@ -0,0 +1,59 @@
+from modules.onboarding import OnboardingPipeline
+
+from collections.abc import Callable
+from contextlib import nullcontext
+import threading
+
+
+class QueuedRunner:
+    """ Stands in for the layout actor: keeps actions until the test drains them. """
+
+    def __init__(self) -> None:
+        self.pending: list[Callable[[], None]] = []
+        self.lock = threading.Lock()
+
+    def __call__(self, action: Callable[[], None]) -> None:
+        with self.lock:
+            self.pending.append(action)
+
+    def drain(self) -> None:
+        with self.lock:
+            pending, self.pending = self.pending, []
+        for action in pending:
+            action()
+
+
+def test_prepare_runs_on_the_runner_before_the_probe() -> None:
+    runner = QueuedRunner()
+    events: list[str] = []
+    probed = threading.Event()
+
+    def probe(item: str) -> int:
+        events.append("probe")
+        probed.set()
+        return 1
+
+    pipeline = OnboardingPipeline(
+        probe=probe,
+        apply=lambda item, result: events.append("apply"),
+        attach=lambda item: events.append("attach"),
+        on_timeout=lambda item: None,
+        batch=nullcontext,
+        run=runner,
+        workers=1,
+        probe_timeout=5,
+        prepare=lambda item: events.append("prepare")
+    )
+
+    pipeline.submit("window")
+    assert not pipeline.wait_idle(0.05)
+    assert events == []
+
+    runner.drain()
+    assert probed.wait(1)
+
+    # Attach batch is handed over to the runner as well.
+    while not pipeline.wait_idle(0.01):
+        runner.drain()
+
+    assert events == ["prepare", "probe", "apply", "attach"]
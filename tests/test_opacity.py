@@ -0,0 +1,96 @@
+from modules.opacity import OpacityController, FakeOpacityBackend, MIN_OPACITY, MAX_OPACITY
+from modules.native import WS_EX_LAYERED
+
+from collections.abc import Callable
+
+FRAME = 1 / 60
+HWND = 1
+
+
+class ManualScheduler:
+    """ Keeps scheduled callbacks until the test runs them. """
+
+    def __init__(self) -> None:
+        self.pending: list[tuple[float, Callable[[], None]]] = []
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> None:
+        self.pending.append((delay, callback))
+
+    def run(self) -> None:
+        pending, self.pending = self.pending, []
+        for _, callback in pending:
+            callback()
+
+
+def make_controller(backend: FakeOpacityBackend, scheduler: ManualScheduler, now: list[float], applied: list[int] | None = None) -> OpacityController:
+    return OpacityController(HWND, backend, FRAME, scheduler.schedule, applied.append if applied is not None else None, clock=lambda: now[0])
+
+
+def test_burst_is_applied_once_per_frame() -> None:
+    backend = FakeOpacityBackend()
+    scheduler = ManualScheduler()
+    now = [0.0]
+    applied: list[int] = []
+    controller = make_controller(backend, scheduler, now, applied)
+
+    for _ in range(10):
+        controller.nudge(-5)
+
+    # The first notch is applied immediately, the rest waits for a single flush.
+    assert applied == [250]
+    assert len(scheduler.pending) == 1
+
+    now[0] += FRAME
+    scheduler.run()
+
+    assert applied == [250, 205]
+    assert backend.alphas[HWND] == 205
+    assert (controller.requested, controller.applied) == (10, 2)
+
+
+def test_layered_style_is_set_once() -> None:
+    backend = FakeOpacityBackend()
+    scheduler = ManualScheduler()
+    now = [0.0]
+    controller = make_controller(backend, scheduler, now)
+
+    controller.nudge(-5)
+    now[0] += FRAME
+    controller.nudge(-5)
+
+    assert backend.styles[HWND] & WS_EX_LAYERED
+    assert [call for call in backend.calls if call[0] == "set_ex_style"] == [("set_ex_style", HWND)]
+    assert [call for call in backend.calls if call[0] == "get_ex_style"] == [("get_ex_style", HWND)]
+
+
+def test_starting_alpha_is_read_from_layered_window() -> None:
+    backend = FakeOpacityBackend(styles={HWND: WS_EX_LAYERED}, alphas={HWND: 200})
+    controller = make_controller(backend, ManualScheduler(), [0.0])
+
+    controller.nudge(-5)
+
+    assert backend.alphas[HWND] == 195
+
+
+def test_target_is_clamped() -> None:
+    backend = FakeOpacityBackend()
+    scheduler = ManualScheduler()
+    now = [0.0]
+    controller = make_controller(backend, scheduler, now)
+
+    controller.set(0)
+    assert controller.alpha == MIN_OPACITY
+
+    now[0] += FRAME
+    controller.set(1000)
+    assert controller.alpha == MAX_OPACITY
+
+
+def test_unchanged_target_is_not_applied() -> None:
+    backend = FakeOpacityBackend()
+    controller = make_controller(backend, ManualScheduler(), [0.0])
+
+    controller.set(MAX_OPACITY)
+
+    assert controller.applied == 0
+    assert not [call for call in backend.calls if call[0] == "set_alpha"]
@@ -0,0 +1,95 @@
+from modules.probe_cache import ProbeCache, executable_version, make_key
+from modules import probe_cache
+
+from pathlib import Path
+import pytest
+import json
+import os
+
+TTL = 60
+BOUNDS = (7, 0, 7, 7)
+
+
+@pytest.fixture
+def now(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    clock = [1000.0]
+    monkeypatch.setattr(probe_cache.time, "time", lambda: clock[0])
+    return clock
+
+
+def test_entry_expires_after_ttl(tmp_path: Path, now: list[float]) -> None:
+    cache = ProbeCache(str(tmp_path / "probes.json"), TTL)
+    cache.put("app", 320, BOUNDS)
+
+    now[0] += TTL
+    assert cache.get("app").min_w == 320
+
+    now[0] += 1
+    assert cache.get("app") is None
+
+    # Expired entry is dropped from the file as well.
+    assert ProbeCache(cache.path, TTL).get("app") is None
+
+
+def test_entries_survive_reload(tmp_path: Path, now: list[float]) -> None:
+    path = str(tmp_path / "probes.json")
+    ProbeCache(path, TTL).put("app", 320, BOUNDS)
+
+    entry = ProbeCache(path, TTL).get("app")
+    assert (entry.min_w, entry.bounding_error) == (320, BOUNDS)
+
+
+def test_invalidate(tmp_path: Path, now: list[float]) -> None:
+    cache = ProbeCache(str(tmp_path / "probes.json"), TTL)
+    cache.put("a", 1, BOUNDS)
+    cache.put("b", 2, BOUNDS)
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+    cache.invalidate()
+    assert cache.get("b") is None
+
+
+def test_key_changes_with_dpi_and_executable_version(tmp_path: Path) -> None:
+    executable = tmp_path / "app.exe"
+    executable.write_bytes(b"v1")
+    os.utime(executable, ns=(1_000_000_000, 1_000_000_000))
+
+    key = make_key(str(executable), "AppClass", 96, executable_version(str(executable)))
+    assert make_key(str(executable), "AppClass", 144, executable_version(str(executable))) != key
+
+    executable.write_bytes(b"v2")
+    os.utime(executable, ns=(2_000_000_000, 2_000_000_000))
+    assert make_key(str(executable), "AppClass", 96, executable_version(str(executable))) != key
+
+
+def test_missing_executable_has_no_version() -> None:
+    assert executable_version("") == ""
+
+
+def test_corrupt_file_is_ignored_and_replaced(tmp_path: Path, now: list[float]) -> None:
+    path = tmp_path / "probes.json"
+    path.write_text("{not json")
+
+    cache = ProbeCache(str(path), TTL)
+    assert cache.get("app") is None
+
+    cache.put("app", 320, BOUNDS)
+    assert json.loads(path.read_text())["entries"]["app"]["min_w"] == 320
+
+
+def test_malformed_entries_are_skipped(tmp_path: Path, now: list[float]) -> None:
+    path = tmp_path / "probes.json"
+    path.write_text(json.dumps({
+        "version": probe_cache._VERSION,
+        "entries": {
+            "broken": {"min_w": "wide"},
+            "app": {"min_w": 320, "bounding_error": list(BOUNDS), "created_at": now[0]}
+        }
+    }))
+
+    cache = ProbeCache(str(path), TTL)
+    assert cache.get("broken") is None
+    assert cache.get("app").min_w == 320
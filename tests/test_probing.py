@@ -0,0 +1,30 @@
+from modules.probing import FakeProbeBackend, probe_min_width, STRATEGY_MINMAXINFO, STRATEGY_PHYSICAL
+
+
+def test_answered_minmaxinfo_is_used_without_touching_the_window() -> None:
+    backend = FakeProbeBackend(answers={1: 500}, physical={1: 480})
+
+    assert probe_min_width(backend, 1, 100) == (500, STRATEGY_MINMAXINFO)
+    assert backend.calls == [(STRATEGY_MINMAXINFO, 1)]
+
+
+def test_hung_window_is_probed_physically() -> None:
+    backend = FakeProbeBackend(physical={1: 480})
+
+    assert probe_min_width(backend, 1, 100) == (480, STRATEGY_PHYSICAL)
+    assert backend.calls == [(STRATEGY_MINMAXINFO, 1), (STRATEGY_PHYSICAL, 1)]
+
+
+def test_zero_minmaxinfo_is_an_answer_raised_to_the_floor() -> None:
+    backend = FakeProbeBackend(answers={1: 0, 2: -16}, physical={1: 320, 2: 320})
+
+    assert probe_min_width(backend, 1, 100, floor=480) == (480, STRATEGY_MINMAXINFO)
+    assert probe_min_width(backend, 2, 100, floor=480) == (480, STRATEGY_MINMAXINFO)
+    assert (STRATEGY_PHYSICAL, 1) not in backend.calls
+    assert (STRATEGY_PHYSICAL, 2) not in backend.calls
+
+
+def test_answer_above_the_floor_is_kept() -> None:
+    backend = FakeProbeBackend(answers={1: 700})
+
+    assert probe_min_width(backend, 1, 100, floor=480) == (700, STRATEGY_MINMAXINFO)
@@ -0,0 +1,136 @@
+from modules.simulated import SimulatedDesktop
+from modules.system import SW_MINIMIZE, SW_MAXIMIZE, SW_NORMAL, SW_HIDE
+from modules.tracker import EventKind
+from modules.position import Rect
+from modules import system
+
+import pytest
+
+RECT = Rect.from_xywh(100, 100, 800, 600)
+
+
+def kinds(desktop: SimulatedDesktop) -> list[tuple[int, int]]:
+    return [(event.kind, event.hwnd) for event in desktop.events.pending]
+
+
+def test_windows_are_listed_in_z_order() -> None:
+    desktop = SimulatedDesktop.default()
+    first = desktop.open_window("First")
+    second = desktop.open_window("Second")
+    third = desktop.open_window("Third")
+
+    assert desktop.visible_hwnds() == [third, second, first]
+    assert desktop.foreground_window() == third
+
+    desktop.focus(first)
+    assert desktop.visible_hwnds() == [first, third, second]
+
+    desktop.close_window(first)
+    assert desktop.visible_hwnds() == [third, second]
+    assert desktop.foreground_window() == third
+
+
+def test_minimized_hidden_and_cloaked_windows_are_not_visible() -> None:
+    desktop = SimulatedDesktop.default()
+    minimized = desktop.open_window("Minimized")
+    hidden = desktop.open_window("Hidden")
+    cloaked = desktop.open_window("Cloaked")
+    shown = desktop.open_window("Shown")
+
+    desktop.show_window(minimized, SW_MINIMIZE)
+    desktop.show_window(hidden, SW_HIDE)
+    desktop.windows[cloaked].cloaked = True
+
+    assert desktop.visible_hwnds() == [shown]
+    assert desktop.is_iconic(minimized)
+    assert not desktop.is_window_visible(hidden)
+
+    desktop.show_window(minimized, SW_NORMAL)
+    desktop.show_window(hidden, SW_NORMAL)
+    assert set(desktop.visible_hwnds()) == {minimized, hidden, shown}
+
+
+def test_visibility_changes_emit_events() -> None:
+    desktop = SimulatedDesktop.default()
+    hwnd = desktop.open_window("Window")
+    desktop.events.pending.clear()
+
+    desktop.show_window(hwnd, SW_MINIMIZE)
+    desktop.show_window(hwnd, SW_MINIMIZE)
+    desktop.show_window(hwnd, SW_NORMAL)
+    desktop.show_window(hwnd, SW_HIDE)
+
+    assert kinds(desktop) == [(EventKind.MINIMIZE, hwnd), (EventKind.RESTORE, hwnd), (EventKind.HIDE, hwnd)]
+
+
+def test_move_respects_minimum_size_and_reports_location() -> None:
+    desktop = SimulatedDesktop.default()
+    hwnd = desktop.open_window("Window", RECT, min_w=500)
+    desktop.events.pending.clear()
+
+    assert desktop.move_window(hwnd, Rect.from_xywh(0, 0, 300, 400))
+    assert desktop.window_rect(hwnd) == Rect.from_xywh(0, 0, 500, 400)
+    assert desktop.frame_bounds(hwnd) == Rect.from_xywh(7, 0, 486, 393)
+
+    # Moving to the same rect changes nothing.
+    assert desktop.move_window(hwnd, Rect.from_xywh(0, 0, 500, 400))
+    assert kinds(desktop) == [(EventKind.LOCATION, hwnd)]
+    assert desktop.calls["move_window"] == 2
+
+
+def test_hung_window_ignores_moves() -> None:
+    desktop = SimulatedDesktop.default()
+    hwnd = desktop.open_window("Hung", RECT, hung=True)
+
+    assert not desktop.move_window(hwnd, Rect.from_xywh(0, 0, 500, 400))
+    assert desktop.window_rect(hwnd) == RECT
+    assert desktop.min_track_size(hwnd, 100) is None
+
+
+def test_deferred_moves_are_applied_on_end() -> None:
+    desktop = SimulatedDesktop.default()
+    first = desktop.open_window("First", RECT)
+    second = desktop.open_window("Second", RECT)
+    target = Rect.from_xywh(0, 0, 900, 700)
+
+    handle = desktop.begin_defer(2)
+    handle = desktop.defer_move(handle, first, target)
+    handle = desktop.defer_move(handle, second, target)
+    assert desktop.window_rect(first) == RECT
+
+    assert desktop.end_defer(handle)
+    assert desktop.window_rect(first) == desktop.window_rect(second) == target
+
+
+def test_deferred_move_of_closed_window_fails_the_batch() -> None:
+    desktop = SimulatedDesktop.default()
+    hwnd = desktop.open_window("Window", RECT)
+    desktop.close_window(hwnd)
+
+    handle = desktop.begin_defer(1)
+    assert desktop.defer_move(handle, hwnd, RECT) is None
+    assert not desktop.end_defer(handle)
+
+
+def test_maximize_and_restore_keep_normal_rect() -> None:
+    desktop = SimulatedDesktop.default()
+    hwnd = desktop.open_window("Window", RECT)
+
+    desktop.show_window(hwnd, SW_MAXIMIZE)
+    assert desktop.is_maximized(hwnd)
+    assert desktop.frame_bounds(hwnd) == desktop.monitor_list[0].work_area
+
+    desktop.show_window(hwnd, SW_NORMAL)
+    assert not desktop.is_maximized(hwnd)
+    assert desktop.window_rect(hwnd) == RECT
+
+
+def test_simulated_backend_has_to_be_requested(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(system.sys, "platform", "linux")
+    monkeypatch.delenv("WINGMAN_BACKEND", raising=False)
+
+    with pytest.raises(RuntimeError):
+        system.load()
+
+    monkeypatch.setenv("WINGMAN_BACKEND", "simulated")
+    assert isinstance(system.load(), SimulatedDesktop)
@@ -0,0 +1,50 @@
+from modules.snapshot import DesktopSnapshots, Snapshot, diff
+
+
+def make_snapshot(generation: int, *hwnds: int) -> Snapshot:
+    return Snapshot(generation, hwnds, 0.0, frozenset(hwnds))
+
+
+def test_first_snapshot_adds_everything() -> None:
+    delta = diff(None, make_snapshot(1, 1, 2, 3))
+
+    assert delta.added == (1, 2, 3)
+    assert delta.removed == ()
+    assert not delta.reordered
+
+
+def test_same_generation_is_empty() -> None:
+    snapshot = make_snapshot(1, 1, 2)
+
+    assert not diff(snapshot, snapshot)
+
+
+def test_added_and_removed_keep_z_order() -> None:
+    delta = diff(make_snapshot(1, 1, 2, 3), make_snapshot(2, 4, 1, 3, 5))
+
+    assert delta.added == (4, 5)
+    assert delta.removed == (2,)
+    assert not delta.reordered
+
+
+def test_reorder_of_kept_windows_is_detected() -> None:
+    delta = diff(make_snapshot(1, 1, 2, 3), make_snapshot(2, 3, 1, 2))
+
+    assert delta.added == ()
+    assert delta.removed == ()
+    assert delta.reordered
+
+
+def test_reorder_is_detected_next_to_added_and_removed() -> None:
+    delta = diff(make_snapshot(1, 1, 2, 3), make_snapshot(2, 3, 4, 1))
+
+    assert delta.added == (4,)
+    assert delta.removed == (2,)
+    assert delta.reordered
+
+
+def test_unchanged_scan_is_empty() -> None:
+    desktop = DesktopSnapshots(lambda: [1, 2], freshness=0)
+    previous = desktop.refresh()
+
+    assert not diff(previous, desktop.refresh())
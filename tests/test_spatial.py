@@ -0,0 +1,105 @@
+from modules.spatial import EdgeIndex, SpatialIndex
+from modules.position import Rect, Direction
+
+LEFT_SCREEN = "left"
+RIGHT_SCREEN = "right"
+
+#  1 | 2 | 3     (top row, left screen: 1, 2; right screen: 3)
+#  4 |   | 5     (bottom row)
+RECTS = {
+    1: Rect(0, 0, 600, 500),
+    2: Rect(600, 0, 1200, 500),
+    3: Rect(1920, 0, 2500, 500),
+    4: Rect(0, 500, 600, 1000),
+    5: Rect(1920, 500, 2500, 1000),
+}
+SCREENS = {1: LEFT_SCREEN, 2: LEFT_SCREEN, 4: LEFT_SCREEN, 3: RIGHT_SCREEN, 5: RIGHT_SCREEN}
+
+
+def make_index() -> SpatialIndex:
+    index = SpatialIndex()
+    for key, rect in RECTS.items():
+        index.update(key, rect, SCREENS[key])
+
+    return index
+
+
+def test_horizontal_neighbours() -> None:
+    index = make_index()
+
+    assert index.nearest(Direction.RIGHT, RECTS[1]) == 2
+    assert index.nearest(Direction.RIGHT, RECTS[2]) == 3
+    assert index.nearest(Direction.LEFT, RECTS[3]) == 2
+    assert index.nearest(Direction.LEFT, RECTS[1]) is None
+
+
+def test_vertical_neighbours() -> None:
+    index = make_index()
+
+    assert index.nearest(Direction.DOWN, RECTS[1]) == 4
+    assert index.nearest(Direction.UP, RECTS[4]) == 1
+    assert index.nearest(Direction.DOWN, RECTS[3]) == 5
+    assert index.nearest(Direction.UP, RECTS[1]) is None
+
+
+def test_vertical_neighbour_has_to_overlap_horizontally() -> None:
+    index = make_index()
+
+    # Window 4 is the closest one below by edges, but it's not under window 2.
+    assert index.nearest(Direction.DOWN, RECTS[2]) is None
+
+    index.update(6, Rect(900, 800, 1400, 1000), LEFT_SCREEN)
+    assert index.nearest(Direction.DOWN, RECTS[2]) == 6
+
+
+def test_touching_windows_do_not_overlap() -> None:
+    index = EdgeIndex()
+    index.update(1, Rect(0, 0, 100, 100))
+    index.update(2, Rect(100, 100, 200, 200))
+
+    assert index.nearest(Direction.DOWN, Rect(0, 0, 100, 100)) is None
+
+
+def test_screen_edges() -> None:
+    index = make_index()
+
+    assert index.nearest(Direction.RIGHT, RECTS[2], LEFT_SCREEN) is None
+    assert index.nearest(Direction.LEFT, RECTS[3], RIGHT_SCREEN) is None
+    assert index.nearest(Direction.RIGHT, RECTS[1], LEFT_SCREEN) == 2
+
+
+def test_farthest_window_on_edge_screen() -> None:
+    index = make_index()
+
+    # Wrapping left from the leftmost screen lands on the right end of the rightmost screen.
+    assert index.farthest(Direction.LEFT, RIGHT_SCREEN) in (3, 5)
+    assert index.farthest(Direction.RIGHT, LEFT_SCREEN) in (1, 4)
+    assert index.farthest(Direction.LEFT, "unknown") is None
+
+
+def test_window_moved_to_other_screen() -> None:
+    index = make_index()
+    index.update(2, Rect(2500, 0, 3000, 500), RIGHT_SCREEN)
+
+    assert index.nearest(Direction.RIGHT, RECTS[1], LEFT_SCREEN) is None
+    assert index.nearest(Direction.RIGHT, RECTS[3], RIGHT_SCREEN) == 2
+
+
+def test_removed_window_is_not_found() -> None:
+    index = make_index()
+    index.remove(2)
+    index.remove(2)
+
+    assert index.nearest(Direction.RIGHT, RECTS[1]) == 3
+    assert len(index.desktop) == 4
+    assert 2 not in index.desktop
+
+
+def test_update_with_same_rect_keeps_single_entry() -> None:
+    index = EdgeIndex()
+    index.update(1, RECTS[1])
+    index.update(1, RECTS[1])
+    index.update(1, RECTS[2])
+
+    assert len(index) == 1
+    assert index.nearest(Direction.RIGHT, RECTS[1]) == 1
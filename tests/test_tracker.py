@@ -0,0 +1,167 @@
+from modules.tracker import WindowTracker, ScriptedEventSource, EventKind
+from modules.position import Rect
+
+A = Rect(0, 0, 100, 100)
+B = Rect(100, 0, 200, 100)
+C = Rect(200, 0, 300, 100)
+
+
+class Recorder:
+    """ Subscribes windows and records their callbacks in order. """
+
+    def __init__(self, tracker: WindowTracker) -> None:
+        self.tracker = tracker
+        self.calls: list[tuple] = []
+
+    def subscribe(self, hwnd: int, rect: Rect | None = None) -> None:
+        self.tracker.subscribe(
+            hwnd,
+            lambda rect: self.calls.append(("moved", hwnd, rect)),
+            lambda: self.calls.append(("killed", hwnd)),
+            lambda visible: self.calls.append(("visible", hwnd, visible)),
+            lambda: self.calls.append(("renamed", hwnd)),
+            rect=rect
+        )
+
+
+def make_tracker(rects: dict[int, Rect] | None = None) -> tuple[ScriptedEventSource, WindowTracker, Recorder]:
+    source = ScriptedEventSource()
+    rects = rects if rects is not None else {}
+    tracker = WindowTracker(source, rects.get)
+    tracker.start()
+    return source, tracker, Recorder(tracker)
+
+
+def test_events_are_dispatched_to_their_subscribers() -> None:
+    source, _, recorder = make_tracker()
+    recorder.subscribe(1, A)
+    recorder.subscribe(2, A)
+
+    source.push(EventKind.LOCATION, 1, B)
+    source.push(EventKind.HIDE, 2)
+    source.flush()
+    source.push(EventKind.SHOW, 2)
+    source.push(EventKind.DESTROY, 1)
+    source.flush()
+
+    assert recorder.calls == [("moved", 1, B), ("visible", 2, False), ("visible", 2, True), ("killed", 1)]
+
+
+def test_events_of_unknown_windows_are_ignored() -> None:
+    source, tracker, recorder = make_tracker()
+    recorder.subscribe(1, A)
+
+    source.push(EventKind.LOCATION, 3, B)
+    source.flush()
+
+    assert recorder.calls == []
+    assert tracker.received_events == 1
+
+
+def test_location_events_are_coalesced_to_the_final_rect() -> None:
+    source, tracker, recorder = make_tracker()
+    recorder.subscribe(1, A)
+
+    for rect in (B, C, B, C):
+        source.push(EventKind.LOCATION, 1, rect)
+    source.flush()
+
+    assert recorder.calls == [("moved", 1, C)]
+    assert tracker.dispatched_callbacks == 1
+
+
+def test_location_without_rect_reads_it_once() -> None:
+    rects = {1: B}
+    source, _, recorder = make_tracker(rects)
+    recorder.subscribe(1, A)
+
+    source.push(EventKind.LOCATION, 1)
+    source.push(EventKind.LOCATION, 1)
+    source.flush()
+
+    assert recorder.calls == [("moved", 1, B)]
+
+
+def test_unchanged_rect_and_visibility_are_not_reported() -> None:
+    source, _, recorder = make_tracker()
+    recorder.subscribe(1, A)
+
+    source.push(EventKind.LOCATION, 1, A)
+    source.push(EventKind.SHOW, 1)
+    source.flush()
+
+    assert recorder.calls == []
+
+
+def test_destroy_overrides_other_events() -> None:
+    source, tracker, recorder = make_tracker()
+    recorder.subscribe(1, A)
+
+    source.push(EventKind.LOCATION, 1, B)
+    source.push(EventKind.NAME, 1)
+    source.push(EventKind.DESTROY, 1)
+    source.flush()
+
+    assert recorder.calls == [("killed", 1)]
+    assert not tracker.is_tracked(1)
+
+
+def test_no_callbacks_after_destroy() -> None:
+    source, _, recorder = make_tracker()
+    recorder.subscribe(1, A)
+
+    source.push(EventKind.DESTROY, 1)
+    source.flush()
+    source.push(EventKind.LOCATION, 1, B)
+    source.push(EventKind.DESTROY, 1)
+    source.flush()
+
+    assert recorder.calls == [("killed", 1)]
+
+
+def test_vanished_window_is_killed() -> None:
+    source, _, recorder = make_tracker(rects={})
+    recorder.subscribe(1, A)
+
+    source.push(EventKind.LOCATION, 1)
+    source.flush()
+
+    assert recorder.calls == [("killed", 1)]
+
+
+def test_no_callbacks_after_unsubscribe() -> None:
+    source, tracker, recorder = make_tracker()
+    recorder.subscribe(1, A)
+    tracker.unsubscribe(1)
+
+    source.push(EventKind.LOCATION, 1, B)
+    source.push(EventKind.DESTROY, 1)
+    source.flush()
+
+    assert recorder.calls == []
+
+
+def test_callbacks_follow_first_appearance_and_fixed_order_per_window() -> None:
+    source, _, recorder = make_tracker()
+    recorder.subscribe(1, A)
+    recorder.subscribe(2, A)
+
+    source.push(EventKind.NAME, 2)
+    source.push(EventKind.MINIMIZE, 1)
+    source.push(EventKind.LOCATION, 2, B)
+    source.push(EventKind.LOCATION, 1, C)
+    source.flush()
+
+    # Window 2 appeared first. Per window: position, then visibility, then title.
+    assert recorder.calls == [("moved", 2, B), ("renamed", 2), ("moved", 1, C), ("visible", 1, False)]
+
+
+def test_stopped_source_delivers_nothing() -> None:
+    source, tracker, recorder = make_tracker()
+    recorder.subscribe(1, A)
+    tracker.stop()
+
+    source.push(EventKind.LOCATION, 1, B)
+    source.flush()
+
+    assert recorder.calls == []